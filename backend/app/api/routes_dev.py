@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.services.index_advisor import advise
+
+# Solo se registra con ENV=development (ver app/main.py)
+router = APIRouter(
+    prefix="/dev",
+    tags=["dev"],
+)
+
+
+@router.get("/index-advisor")
+def index_advisor(db: Session = Depends(get_db)):
+    """
+    Corre EXPLAIN QUERY PLAN sobre el SQL que generan las rutas de lectura
+    y marca los recorridos completos de tabla.
+    """
+    try:
+        return advise(db)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
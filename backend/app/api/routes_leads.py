@@ -1,10 +1,13 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core import fast_json
+from app.core.database import get_async_db, get_db
 from app.models.lead import Lead
 from app.models.listing import Listing
 from app.models.dealer import Dealer
@@ -60,58 +63,124 @@ def create_lead(lead_in: LeadCreate, db: Session = Depends(get_db)):
 # ------------------------------
 # ADMIN LIST PAGINATED
 # ------------------------------
-@router.get("/admin", response_model=LeadAdminPage)
-def list_leads_admin(
-    db: Session = Depends(get_db),
-    page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=200),
-):
-    base_query = db.query(Lead).order_by(Lead.created_at.desc())
+def lead_admin_rows_statement():
+    """
+    Leads con su listing y el nombre del dealer en una sola query
+    (LEFT JOIN: un lead sin listing o sin dealer también sale).
+    """
+    return (
+        select(Lead, Listing, Dealer.name)
+        .outerjoin(Listing, Listing.id == Lead.listing_id)
+        .outerjoin(Dealer, Dealer.id == Listing.dealer_id)
+        .order_by(Lead.created_at.desc())
+    )
 
-    total = base_query.count()
-    pages = (total + limit - 1) // limit if total > 0 else 1
-    if page > pages:
-        page = pages
 
-    leads = (
-        base_query.offset((page - 1) * limit)
-        .limit(limit)
-        .all()
+def _label(year, make, model, trim) -> str:
+    base = f"{year} {make} {model}".strip()
+    return f"{base} {trim or ''}".strip()
+
+
+def _listing_label(listing: Optional[Listing]) -> Optional[str]:
+    if not listing:
+        return None
+    return _label(listing.year, listing.make, listing.model, listing.trim)
+
+
+def lead_admin_out(l: Lead, listing: Optional[Listing], dealer_name: Optional[str]) -> LeadAdminOut:
+    """Fila de lead_admin_rows_statement() -> LeadAdminOut."""
+    return LeadAdminOut(
+        id=l.id,
+        buyer_name=l.buyer_name,
+        buyer_email=l.buyer_email,
+        buyer_phone=l.buyer_phone,
+        buyer_notes=l.buyer_notes,
+        listing_id=l.listing_id,
+        status=l.status,
+        created_at=l.created_at,
+        listing_label=_listing_label(listing),
+        dealer_name=dealer_name,
     )
 
-    items: List[LeadAdminOut] = []
 
-    for l in leads:
-        listing = db.query(Listing).filter(Listing.id == l.listing_id).first()
-        dealer = (
-            db.query(Dealer).filter(Dealer.id == listing.dealer_id).first()
-            if listing
-            else None
+def lead_admin_tuples_statement():
+    """
+    Igual que lead_admin_rows_statement() pero solo con las columnas que
+    usa LeadAdminOut: filas como tuplas, sin entidades ORM.
+    """
+    return (
+        select(
+            Lead.id,
+            Lead.buyer_name,
+            Lead.buyer_email,
+            Lead.buyer_phone,
+            Lead.buyer_notes,
+            Lead.listing_id,
+            Lead.status,
+            Lead.created_at,
+            Listing.id,
+            Listing.year,
+            Listing.make,
+            Listing.model,
+            Listing.trim,
+            Dealer.name,
         )
+        .outerjoin(Listing, Listing.id == Lead.listing_id)
+        .outerjoin(Dealer, Dealer.id == Listing.dealer_id)
+        .order_by(Lead.created_at.desc())
+    )
 
-        if listing:
-            base = f"{listing.year} {listing.make} {listing.model}".strip()
-            listing_label = f"{base} {listing.trim or ''}".strip()
-        else:
-            listing_label = None
 
-        items.append(
-            LeadAdminOut(
-                id=l.id,
-                buyer_name=l.buyer_name,
-                buyer_email=l.buyer_email,
-                buyer_phone=l.buyer_phone,
-                buyer_notes=l.buyer_notes,
-                listing_id=l.listing_id,
-                status=l.status,
-                created_at=l.created_at,
-                listing_label=listing_label,
-                dealer_name=dealer.name if dealer else None,
+def lead_admin_dict(row) -> dict:
+    """Fila de lead_admin_tuples_statement() -> dict con las claves de LeadAdminOut."""
+    (id_, name, email, phone, notes, listing_id, status, created_at,
+     listing_pk, year, make, model, trim, dealer_name) = row
+    return {
+        "id": id_,
+        "buyer_name": name,
+        "buyer_email": email,
+        "buyer_phone": phone,
+        "buyer_notes": notes,
+        "listing_id": listing_id,
+        "status": status,
+        "created_at": created_at,
+        "listing_label": None if listing_pk is None else _label(year, make, model, trim),
+        "dealer_name": dealer_name,
+    }
+
+
+@router.get("/admin", response_model=LeadAdminPage)
+async def list_leads_admin(
+    db: AsyncSession = Depends(get_async_db),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+):
+    total = await db.scalar(select(func.count()).select_from(Lead))
+    pages = (total + limit - 1) // limit if total > 0 else 1
+    if page > pages:
+        page = pages
+
+    if fast_json.enabled():
+        rows = (
+            await db.execute(
+                lead_admin_tuples_statement().offset((page - 1) * limit).limit(limit)
             )
+        ).all()
+        return fast_json.FastJSONResponse({
+            "items": [lead_admin_dict(row) for row in rows],
+            "total": total,
+            "page": page,
+            "pages": pages,
+        })
+
+    rows = (
+        await db.execute(
+            lead_admin_rows_statement().offset((page - 1) * limit).limit(limit)
         )
+    ).all()
 
     return LeadAdminPage(
-        items=items,
+        items=[lead_admin_out(*row) for row in rows],
         total=total,
         page=page,
         pages=pages,
@@ -173,19 +242,18 @@ def send_lead_to_dealer(lead_id: int, db: Session = Depends(get_db)):
 # ------------------------------
 # DETAIL
 # ------------------------------
-@router.get("/{lead_id}/detail", response_model=LeadDetailOut)
-def get_lead_detail(lead_id: int, db: Session = Depends(get_db)):
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead no existe")
-
-    listing = db.query(Listing).filter(Listing.id == lead.listing_id).first()
-    dealer = (
-        db.query(Dealer).filter(Dealer.id == listing.dealer_id).first()
-        if listing
-        else None
+def lead_detail_statement(lead_id: int):
+    """Lead + listing + dealer en una sola query."""
+    return (
+        select(Lead, Listing, Dealer)
+        .outerjoin(Listing, Listing.id == Lead.listing_id)
+        .outerjoin(Dealer, Dealer.id == Listing.dealer_id)
+        .where(Lead.id == lead_id)
     )
 
+
+def lead_detail_out(lead: Lead, listing: Optional[Listing], dealer: Optional[Dealer]) -> LeadDetailOut:
+    """Fila de lead_detail_statement() -> LeadDetailOut."""
     return LeadDetailOut(
         id=lead.id,
         buyer_name=lead.buyer_name,
@@ -209,6 +277,14 @@ def get_lead_detail(lead_id: int, db: Session = Depends(get_db)):
     )
 
 
+@router.get("/{lead_id}/detail", response_model=LeadDetailOut)
+async def get_lead_detail(lead_id: int, db: AsyncSession = Depends(get_async_db)):
+    row = (await db.execute(lead_detail_statement(lead_id))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Lead no existe")
+    return lead_detail_out(*row)
+
+
 # ------------------------------
 # TIMELINE / EVENTS
 # ------------------------------
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, Depends
-from typing import List
-from sqlalchemy.orm import Session
+import csv
+import io
+from typing import Iterator, List, Literal, Optional
 
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+
+from app.core import fast_json
+from app.core.database import SessionLocal, get_async_db, get_db
 from app.models.listing import Listing
-from app.schemas.listing import ListingIn, ScrapeUrlsRequest
-from app.services.scraper import scrape_and_save_listings
+from app.schemas.listing import ListingImportResult, ListingIn, ListingPage, ScrapeUrlsRequest
+from app.services.listing_snapshot import LISTING_COLUMNS, current_version, get_snapshot
+from app.services.topk import STREAM_BATCH_SIZE
+from app.services.listing_ingest import upsert_listings
+from app.services.scraper import scrape_urls
 
 router = APIRouter(
     prefix="/listings",
@@ -133,39 +143,234 @@ def _seed_demo_data(db: Session):
     db.commit()
 
 
+LISTINGS_PAGE_DEFAULT = 100
+LISTINGS_PAGE_MAX = 1000
+
+# Campos de ListingIn que salen de columnas (extra no tiene columna): lo que
+# puede pedir `fields` en GET /listings/
+LISTING_ITEM_FIELDS: List[str] = [name for name in ListingIn.model_fields if name != "extra"]
+
+
 @router.get("/demo", response_model=List[ListingIn])
 def get_demo_listings(db: Session = Depends(get_db)):
     """
-    Devuelve listings desde la BD.
+    Devuelve los primeros LISTINGS_PAGE_DEFAULT listings de la BD (para
+    recorrer todo: GET /listings/).
     Si la tabla está vacía, primero inserta 3 registros de prueba.
     """
-    existing = db.query(Listing).all()
-    if not existing:
+    # EXISTS: no hace falta cargar la tabla para saber si está vacía
+    if not db.query(db.query(Listing.id).exists()).scalar():
         _seed_demo_data(db)
-        existing = db.query(Listing).all()
 
-    return [_to_schema(l) for l in existing]
+    listings = db.query(Listing).order_by(Listing.id).limit(LISTINGS_PAGE_DEFAULT).all()
+    return [_to_schema(l) for l in listings]
+
 
+def _requested_columns(fields: Optional[str], allowed: List[str] = LISTING_COLUMNS) -> List[str]:
+    """Columnas pedidas en `fields` (coma separada), en ese orden; todas las de `allowed` si no viene."""
+    if not fields:
+        return list(allowed)
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in allowed]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Columnas desconocidas: {', '.join(unknown) or '(ninguna)'}",
+        )
+    return list(dict.fromkeys(names))
 
-@router.get("/", response_model=List[ListingIn])
-def list_all_listings(db: Session = Depends(get_db)):
+
+def listing_page_statement(
+    names: List[str],
+    limit: int,
+    after_id: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    max_miles: Optional[int] = None,
+    make: Optional[str] = None,
+    model: Optional[str] = None,
+    dealer_id: Optional[int] = None,
+):
     """
-    Devuelve todos los listings de la BD.
+    SELECT de una página de GET /listings/: solo las columnas `names`
+    (load_only), filtros como rangos/igualdades sobre columnas indexadas
+    (year/price/miles, make/model/year, dealer_id) y keyset por id: la
+    página siguiente empieza en id > after_id, sin OFFSET. Pide limit + 1
+    filas para saber si hay otra página.
     """
-    existing = db.query(Listing).all()
-    return [_to_schema(l) for l in existing]
+    stmt = select(Listing).options(load_only(*[getattr(Listing, n) for n in names]))
+    conditions = [
+        (after_id, lambda v: Listing.id > v),
+        (min_price, lambda v: Listing.price >= v),
+        (max_price, lambda v: Listing.price <= v),
+        (min_year, lambda v: Listing.year >= v),
+        (max_year, lambda v: Listing.year <= v),
+        (max_miles, lambda v: Listing.miles <= v),
+        (make, lambda v: Listing.make == v),
+        (model, lambda v: Listing.model == v),
+        (dealer_id, lambda v: Listing.dealer_id == v),
+    ]
+    for value, condition in conditions:
+        if value is not None:
+            stmt = stmt.where(condition(value))
+    return stmt.order_by(Listing.id).limit(limit + 1)
 
 
-@router.post("/from-urls", response_model=List[ListingIn])
-def import_from_urls(payload: ScrapeUrlsRequest, db: Session = Depends(get_db)):
+def listing_page(listings: List[Listing], names: List[str], limit: int) -> dict:
+    """
+    Resultado de listing_page_statement() -> dict con la forma de ListingPage.
+    Cada item lleva el id como string (como ListingIn) más los campos de
+    `names`; con todos los campos, también extra=None, igual que _to_schema.
+    """
+    has_more = len(listings) > limit
+    listings = listings[:limit]
+    names = [n for n in names if n != "id"]
+    full = len(names) == len(LISTING_ITEM_FIELDS) - 1
+    items = []
+    for l in listings:
+        item = {"id": str(l.id)}
+        for n in names:
+            item[n] = getattr(l, n)
+        if full:
+            item["extra"] = None
+        items.append(item)
+    return {
+        "items": items,
+        "next_cursor": str(listings[-1].id) if has_more else None,
+    }
+
+
+@router.get("/", response_model=ListingPage, response_model_exclude_unset=True)
+async def list_listings(
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(LISTINGS_PAGE_DEFAULT, ge=1, le=LISTINGS_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    fields: Optional[str] = Query(None, description="Campos de ListingIn separados por coma (por defecto todos); el id viene siempre"),
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_year: Optional[int] = None,
+    max_year: Optional[int] = None,
+    max_miles: Optional[int] = None,
+    make: Optional[str] = None,
+    model: Optional[str] = None,
+    dealer_id: Optional[int] = None,
+):
+    """
+    Listings paginados por id (keyset), con proyección de campos y filtros
+    simples. Los items son ListingIn (id como string); con `fields` solo
+    traen el id y los campos pedidos. Para bajar el inventario completo
+    (todas las columnas de la tabla): /listings/export.
+    """
+    names = _requested_columns(fields, LISTING_ITEM_FIELDS)
+    after_id = None
+    if cursor is not None:
+        if not cursor.isdigit():
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        after_id = int(cursor)
+
+    stmt = listing_page_statement(
+        names, limit, after_id,
+        min_price=min_price, max_price=max_price,
+        min_year=min_year, max_year=max_year, max_miles=max_miles,
+        make=make, model=model, dealer_id=dealer_id,
+    )
+    listings = (await db.execute(stmt)).scalars().all()
+    page = listing_page(listings, names, limit)
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(page)
+    return page
+
+
+def _export_batches(names: List[str]) -> Iterator[List[tuple]]:
     """
-    Recibe una lista de URLs, ejecuta el scraper para cada una,
-    guarda los resultados en la BD y devuelve los listings creados.
+    Filas de listings por lotes de STREAM_BATCH_SIZE, ordenadas por id, con
+    un cursor del lado del servidor (yield_per): nunca se tiene la tabla
+    entera en memoria. Abre su propia sesión porque se consume mientras se
+    envía la respuesta, después de que la ruta retornó.
     """
-    created: List[Listing] = []
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(*[Listing.__table__.c[n] for n in names])
+            .order_by(Listing.id)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for batch in db.execute(stmt).partitions():
+            yield batch
+    finally:
+        db.close()
 
-    for url in payload.urls:
-        scraped = scrape_and_save_listings(db, url)
-        created.extend(scraped)
 
-    return [_to_schema(l) for l in created]
+def _ndjson_chunks(names: List[str]) -> Iterator[bytes]:
+    for batch in _export_batches(names):
+        yield b"".join(fast_json.dumps(dict(zip(names, row))) + b"\n" for row in batch)
+
+
+def _csv_chunks(names: List[str]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(names)
+    for batch in _export_batches(names):
+        writer.writerows(batch)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    # solo cabecera si no hay filas
+    if buf.tell():
+        yield buf.getvalue()
+
+
+@router.get("/export")
+def export_listings(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    fields: Optional[str] = Query(None, description="Columnas separadas por coma (por defecto todas)"),
+):
+    """
+    Exporta todo el inventario en streaming (NDJSON o CSV) con memoria
+    constante, para jobs que lo descargan completo. `fields` limita las
+    columnas: ?fields=id,price,miles,year
+    """
+    names = _requested_columns(fields)
+    if format == "csv":
+        return StreamingResponse(
+            _csv_chunks(names),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="listings.csv"'},
+        )
+    return StreamingResponse(
+        _ndjson_chunks(names),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="listings.ndjson"'},
+    )
+
+
+@router.get("/snapshot")
+def get_listing_snapshot_info(db: Session = Depends(get_db)):
+    """
+    Info de depuración del snapshot en memoria: versión, filas, dealers.
+    """
+    info = get_snapshot(db).info()
+    info["current_version"] = current_version()
+    return info
+
+
+@router.post("/from-urls", response_model=ListingImportResult)
+def import_from_urls(payload: ScrapeUrlsRequest, db: Session = Depends(get_db)):
+    """
+    Recibe una lista de URLs, las descarga en paralelo (con tope global y
+    por dominio) y guarda todos los resultados en una sola transacción.
+    Reimportar es idempotente: los avisos ya importados (misma huella de
+    origen) se actualizan si cambiaron en vez de duplicarse. Devuelve los
+    conteos y todos los listings de la importación.
+    """
+    scraped = scrape_urls(payload.urls)
+    result = upsert_listings(db, [l for listings in scraped for l in listings])
+
+    return ListingImportResult(
+        inserted=result.inserted,
+        updated=result.updated,
+        unchanged=result.unchanged,
+        listings=[_to_schema(l) for l in result.listings],
+    )
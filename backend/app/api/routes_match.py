@@ -1,15 +1,49 @@
-from typing import List
+from typing import Any, Callable, List, Literal, Optional, TypeVar, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.database import get_db
+from app.core import fast_json
+from app.core.config import settings
+
+from app.core.database import SessionLocal, get_db
 from app.schemas.match import (
     MatchRequest,
     MatchResponse,
+    MatchBatchRequest,
+    MatchBatchResponse,
     ListingScoreOut,
 )
-from app.services.ahp import rank_listings_with_ahp
+from app.schemas.listing import (
+    ListingIn,
+    ListingScoreCompact,
+    MatchCompactResponse,
+    MatchRequest as AhpMatchRequest,
+    MatchResponse as AhpMatchResponse,
+)
+from app.services.ahp import rank_listings_batch
+from app.services.json_stream import BodyTooLarge, StreamJSONError, parse_object_stream
+from app.services.matching import (
+    compute_ahp_scores,
+    compute_ahp_scores_compact,
+    rank_inventory,
+    stream_ahp_scores,
+    weight_plan,
+)
+from app.services.listing_snapshot import current_version
+from app.services.match_cache import match_cache, match_cache_key
+from app.services.match_pages import (
+    InvalidCursor,
+    StaleCursor,
+    first_page,
+    next_page,
+    ranking_cache,
+)
+
+T = TypeVar("T")
 
 router = APIRouter(
     prefix="/match",
@@ -18,19 +52,220 @@ router = APIRouter(
 
 
 @router.post("/", response_model=MatchResponse)
-def match_cars(req: MatchRequest, db: Session = Depends(get_db)):
+async def match_cars(req: MatchRequest):
     """
     Endpoint que aplica el algoritmo tipo AHP a los listings.
     Devuelve un 'puntaje' de 0 a 100 para cada vehículo.
+
+    Paginación: limit_results es el tamaño de página; si hay más resultados
+    la respuesta trae next_cursor, que se reenvía tal cual en `cursor` (con
+    los mismos filtros/pesos) para pedir la página siguiente.
+
+    Un acierto del cache se responde en el event loop, sin tocar la BD ni
+    el threadpool. Si hay que calcular, el ranking (CPU) corre en el
+    threadpool con su propia sesión sync, para no frenar los demás requests.
+    """
+    if req.cursor:
+        try:
+            results_raw, next_cursor = await run_in_threadpool(_with_session, next_page, req)
+        except InvalidCursor as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except StaleCursor:
+            raise HTTPException(
+                status_code=409,
+                detail="Los listings cambiaron; vuelve a pedir la primera página",
+            )
+        return _respond(results_raw, next_cursor)
+
+    key = match_cache_key(
+        req.filters, req.weights, req.body_style_preference, req.limit_results
+    )
+    # la versión se toma antes de calcular (ver MatchCache.get_or_compute)
+    version = current_version()
+    page = match_cache.get(key)
+    if page is None:
+        page = await run_in_threadpool(_with_session, first_page, req)
+        match_cache.put(key, version, page)
+
+    results_raw, next_cursor = page
+    return _respond(results_raw, next_cursor)
+
+
+def _with_session(fn: Callable[..., T], *args: Any) -> T:
+    """fn(db, *args) con una sesión sync propia (para correr en el threadpool)."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+@router.get("/cache/stats")
+def match_cache_stats():
+    """
+    Contadores del cache de resultados de /match/ (hits, misses, tamaño...).
+    """
+    return match_cache.stats()
+
+
+@router.delete("/cache")
+def clear_match_cache():
+    match_cache.clear()
+    ranking_cache.clear()
+    return {"ok": True}
+
+
+@router.post("/batch", response_model=MatchBatchResponse)
+def match_cars_batch(req: MatchBatchRequest, db: Session = Depends(get_db)):
+    """
+    Evalúa muchos perfiles de comprador en una sola pasada por el inventario.
+    Devuelve una MatchResponse por request, en el mismo orden.
+    """
+    batch = rank_listings_batch(db=db, requests=req.requests)
+    return MatchBatchResponse(responses=[_to_response(r) for r in batch])
+
+
+@router.post("/ahp", response_model=Union[AhpMatchResponse, MatchCompactResponse])
+async def match_client_listings(
+    request: Request,
+    detail: bool = True,
+    limit: int = Query(0, ge=0),
+    source: Literal["body", "inventory"] = "body",
+    stream: bool = False,
+):
+    """
+    Ordena listings con el motor AHP jerárquico. El body es un MatchRequest
+    de schemas/listing.py.
+    - source=body: los listings enviados por el cliente (sin guardarlos).
+    - source=inventory: el inventario guardado (matching.rank_inventory,
+      sobre el snapshot); el body trae solo filtros e importancias.
+      Con stream=true lee la tabla por lotes en vez del snapshot y solo
+      retiene los `limit` mejores (matching.stream_ahp_scores).
+
+    El body se parsea a medida que llega: cada listing se valida apenas se
+    decodifica, con límite de bytes (AHP_MAX_BODY_BYTES) y de cantidad de
+    listings (AHP_MAX_LISTINGS).
+    - limit > 0: devuelve solo los `limit` mejores.
+    - detail=false: sin sub_scores por item; los pesos van una sola vez.
     """
-    results_raw = rank_listings_with_ahp(
-        db=db,
-        filters=req.filters,
-        weights=req.weights,
-        body_style_preference=req.body_style_preference,
-        limit_results=req.limit_results,
+    max_bytes = settings.AHP_MAX_BODY_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Body demasiado grande")
+
+    listings: List[ListingIn] = []
+    errors: List[Any] = []
+    seen = 0
+
+    def on_listing(item: Any) -> None:
+        nonlocal seen
+        index = seen
+        seen += 1
+        if seen > settings.AHP_MAX_LISTINGS:
+            raise HTTPException(status_code=413, detail="Demasiados listings")
+        try:
+            listings.append(ListingIn.model_validate(item))
+        except ValidationError as exc:
+            for err in exc.errors(include_url=False):
+                err["loc"] = ("body", "listings", index) + tuple(err["loc"])
+                errors.append(err)
+
+    try:
+        rest = await parse_object_stream(request.stream(), "listings", on_listing, max_bytes)
+    except BodyTooLarge:
+        raise HTTPException(status_code=413, detail="Body demasiado grande")
+    except StreamJSONError as exc:
+        raise HTTPException(status_code=400, detail=f"JSON inválido: {exc}")
+    if source == "inventory" and seen:
+        raise HTTPException(status_code=400, detail="Con source=inventory no se envían listings")
+    if stream and source != "inventory":
+        raise HTTPException(status_code=400, detail="stream=true solo aplica con source=inventory")
+
+    try:
+        req = AhpMatchRequest.model_validate({**rest, "listings": []})
+    except ValidationError as exc:
+        for err in exc.errors(include_url=False):
+            err["loc"] = ("body",) + tuple(err["loc"])
+            errors.append(err)
+    if errors:
+        raise RequestValidationError(errors)
+
+    if source == "inventory":
+        results = await run_in_threadpool(
+            _with_session,
+            stream_ahp_scores if stream else rank_inventory,
+            req.filters,
+            req.criteria_importance_main,
+            req.criteria_importance_sub,
+            limit,
+        )
+        if detail:
+            return AhpMatchResponse(results=results)
+        plan = weight_plan(req.criteria_importance_main, req.criteria_importance_sub)
+        return MatchCompactResponse(
+            results=[
+                ListingScoreCompact(id=r.listing.id, score=r.score, group_scores=r.group_scores)
+                for r in results
+            ],
+            weights_sub=dict(plan.weights_sub_global),
+            weights_groups=dict(plan.weights_groups),
+        )
+
+    if detail:
+        results = await run_in_threadpool(
+            compute_ahp_scores,
+            listings,
+            req.filters,
+            req.criteria_importance_main,
+            req.criteria_importance_sub,
+            limit,
+        )
+        return AhpMatchResponse(results=results)
+
+    plan, ranked = await run_in_threadpool(
+        compute_ahp_scores_compact,
+        listings,
+        req.filters,
+        req.criteria_importance_main,
+        req.criteria_importance_sub,
+        limit,
+    )
+    return MatchCompactResponse(
+        results=[
+            ListingScoreCompact(id=l.id, score=score, group_scores=group_scores)
+            for l, score, group_scores in ranked
+        ],
+        weights_sub=dict(plan.weights_sub_global),
+        weights_groups=dict(plan.weights_groups),
     )
 
+
+def _respond(results_raw: List[dict], next_cursor: Optional[str] = None):
+    """MatchResponse, o la misma respuesta ya codificada si FAST_SERIALIZATION."""
+    if fast_json.enabled():
+        return fast_json.FastJSONResponse(_to_response_dict(results_raw, next_cursor))
+    return _to_response(results_raw, next_cursor)
+
+
+# Claves de ListingScoreOut, en orden
+_SCORE_FIELDS = tuple(ListingScoreOut.model_fields)
+
+
+def _to_response_dict(results_raw: List[dict], next_cursor: Optional[str] = None) -> dict:
+    """
+    Igual que _to_response pero con dicts planos: los resultados del motor
+    ya tienen los tipos de ListingScoreOut, no hace falta validarlos.
+    """
+    items = [{name: r.get(name) for name in _SCORE_FIELDS} for r in results_raw]
+    return {
+        "total_candidates": len(results_raw),
+        "returned": len(items),
+        "results": items,
+        "next_cursor": next_cursor,
+    }
+
+
+def _to_response(results_raw: List[dict], next_cursor: Optional[str] = None) -> MatchResponse:
     total_candidates = len(results_raw)  # ya vienen filtrados y limitados en la función
 
     items: List[ListingScoreOut] = []
@@ -59,4 +294,5 @@ def match_cars(req: MatchRequest, db: Session = Depends(get_db)):
         total_candidates=total_candidates,
         returned=len(items),
         results=items,
+        next_cursor=next_cursor,
     )
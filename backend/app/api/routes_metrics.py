@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import query_metrics
+from app.services import http_cache, http_client, topk
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Histogramas por ruta (duración, tiempo en BD, queries), contadores del
+    ranking streaming (filas leídas y pico retenido), del cliente HTTP y
+    del cache de páginas del scraper, para Prometheus.
+    """
+    return PlainTextResponse(
+        query_metrics.render() + topk.render() + http_client.render() + http_cache.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
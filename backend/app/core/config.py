@@ -9,5 +9,54 @@ load_dotenv(ENV_PATH)
 class Settings:
     ENV: str = os.getenv("ENV", "development")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./autofinder.db")
+    # Vacío = la misma BD que DATABASE_URL con driver async (aiosqlite)
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+
+    # Motor por defecto de rank_listings_with_ahp: "python", "numpy", "sql",
+    # "stream" o "snapshot". /match/ no lo usa: pagina sobre el ranking
+    # completo del snapshot (services/match_pages.py)
+    MATCH_ENGINE: str = os.getenv("MATCH_ENGINE", "python")
+
+    # Cache de resultados de /match/ (0 entradas = desactivado)
+    MATCH_CACHE_SIZE: int = int(os.getenv("MATCH_CACHE_SIZE", "256"))
+    MATCH_CACHE_TTL: float = float(os.getenv("MATCH_CACHE_TTL", "300"))
+
+    # Rankings completos retenidos para paginar /match/ con cursor
+    MATCH_PAGE_CACHE_SIZE: int = int(os.getenv("MATCH_PAGE_CACHE_SIZE", "32"))
+    MATCH_PAGE_TTL: float = float(os.getenv("MATCH_PAGE_TTL", "120"))
+
+    # Scoring en paralelo sobre el snapshot (0 procesos = desactivado)
+    PARALLEL_SCORING_WORKERS: int = int(os.getenv("PARALLEL_SCORING_WORKERS", "0"))
+    PARALLEL_SCORING_MIN_ROWS: int = int(os.getenv("PARALLEL_SCORING_MIN_ROWS", "100000"))
+
+    # Respuestas de /match/, /listings/ y /leads/admin sin modelos Pydantic
+    # por fila ni revalidación (ver app/core/fast_json.py)
+    FAST_SERIALIZATION: bool = os.getenv("FAST_SERIALIZATION", "0").lower() in ("1", "true", "yes")
+
+    # Aviso de N+1: misma sentencia SQL más de N veces en un request
+    QUERY_REPEAT_WARN_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_WARN_THRESHOLD", "10"))
+
+    # Importación de URLs (POST /listings/from-urls): descargas simultáneas
+    # en total y contra un mismo dominio
+    SCRAPER_MAX_CONCURRENCY: int = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "8"))
+    SCRAPER_PER_DOMAIN_CONCURRENCY: int = int(os.getenv("SCRAPER_PER_DOMAIN_CONCURRENCY", "2"))
+    # Cliente HTTP del scraper (app/services/http_client.py): timeout por
+    # intento, reintentos en 429/5xx y backoff exponencial con jitter
+    SCRAPER_TIMEOUT: float = float(os.getenv("SCRAPER_TIMEOUT", "15"))
+    SCRAPER_MAX_RETRIES: int = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+    SCRAPER_BACKOFF_BASE: float = float(os.getenv("SCRAPER_BACKOFF_BASE", "0.5"))
+    SCRAPER_BACKOFF_MAX: float = float(os.getenv("SCRAPER_BACKOFF_MAX", "30"))
+    # Backend de BeautifulSoup para el scraper ("lxml", "html.parser", ...);
+    # vacío = lxml si está instalado
+    SCRAPER_HTML_PARSER: str = os.getenv("SCRAPER_HTML_PARSER", "")
+    # Cache en disco de páginas descargadas (app/services/http_cache.py):
+    # "on", "off" u "offline" (solo cache, sin red)
+    SCRAPER_CACHE_MODE: str = os.getenv("SCRAPER_CACHE_MODE", "on")
+    SCRAPER_CACHE_PATH: str = os.getenv("SCRAPER_CACHE_PATH", "./scraper_cache.db")
+    SCRAPER_CACHE_MAX_BYTES: int = int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+    # Límites de POST /match/ahp (listings enviados por el cliente)
+    AHP_MAX_BODY_BYTES: int = int(os.getenv("AHP_MAX_BODY_BYTES", str(50 * 1024 * 1024)))
+    AHP_MAX_LISTINGS: int = int(os.getenv("AHP_MAX_LISTINGS", "100000"))
 
 settings = Settings()
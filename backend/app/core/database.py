@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
@@ -14,8 +15,59 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_url(url: str) -> str:
+    """URL con driver async para la misma BD (sqlite -> aiosqlite)."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:"):
+        return "postgresql+asyncpg:" + url[len("postgresql:"):]
+    return url
+
+
+# Engine async para las rutas de solo lectura (async def): las consultas no
+# ocupan un hilo del threadpool de Starlette mientras esperan a la BD
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+
+def ensure_columns(bind=engine) -> None:
+    """
+    Agrega a las tablas existentes las columnas declaradas en los modelos
+    que les falten (ALTER TABLE ... ADD COLUMN). Como ensure_indexes, cubre
+    las BDs creadas antes de que se agregara la columna; solo sirve para
+    columnas nullable, que es como se agregan. Es idempotente.
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                conn.exec_driver_sql(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=bind.dialect)}"
+                )
+
+
+def ensure_indexes(bind=engine) -> None:
+    """
+    Crea los índices declarados en los modelos que aún no existan.
+    create_all solo los crea junto con tablas nuevas; esto cubre las BDs
+    ya existentes. Es idempotente (CREATE INDEX solo si falta).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 # Dependencia para FastAPI (inyectar sesión de DB)
 def get_db():
     db = SessionLocal()
@@ -23,3 +75,10 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Igual que get_db, para rutas async
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
@@ -0,0 +1,52 @@
+"""
+Serialización rápida para los endpoints de listas grandes (opt-in con
+FAST_SERIALIZATION=1).
+
+Con datos que ya vienen de la BD o del snapshot (confiables) las rutas
+arman dicts planos con las mismas claves que su response_model y los
+codifican directo: ni un modelo Pydantic por fila ni la segunda
+validación de response_model. El response_model se mantiene en la ruta
+para la documentación OpenAPI.
+
+Usa orjson si está instalado (pip install orjson); si no, el json de la
+librería estándar.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # opcional
+    orjson = None
+
+
+def enabled() -> bool:
+    return settings.FAST_SERIALIZATION
+
+
+def _default(obj: Any) -> Any:
+    # mismo formato que Pydantic para fechas (ISO 8601)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} no es serializable a JSON")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que codifica `content` tal cual con dumps()."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
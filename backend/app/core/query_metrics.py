@@ -0,0 +1,249 @@
+"""
+Métricas de SQL por request.
+
+Los eventos before/after_cursor_execute de SQLAlchemy (registrados sobre
+la clase Engine, así cubren el engine sync y el async) suman en el
+request en curso cuántas sentencias se ejecutaron y cuánto tardaron. El
+request en curso se guarda en un ContextVar: lo ven igual las rutas async
+que las sync (el threadpool de Starlette copia el contexto).
+
+Al terminar cada request:
+- si una misma forma de SQL (sin parámetros, con los IN (?, ?, ...)
+  colapsados) se repitió más de QUERY_REPEAT_WARN_THRESHOLD veces, se
+  loguea un warning con la sentencia: es la firma de un N+1;
+- se acumulan histogramas por ruta (duración, tiempo en BD, cantidad de
+  queries) que GET /metrics expone en formato de texto de Prometheus.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Contadores de SQL de un request."""
+
+    __slots__ = ("queries", "db_seconds", "shapes")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes: Counter = Counter()
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("query_metrics_current", default=None)
+
+
+# ---------------------------
+# Forma de las sentencias
+# ---------------------------
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """SQL normalizado: mismos espacios, IN (...) de largo 1 y sin literales numéricos."""
+    shape = _SPACES.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+# ---------------------------
+# Eventos de SQLAlchemy
+# ---------------------------
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_metrics_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_metrics_start")
+    if stats is None or not starts:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - starts.pop()
+    stats.shapes[statement] += 1
+
+
+# ---------------------------
+# Histogramas
+# ---------------------------
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+    def copy(self) -> "Histogram":
+        other = Histogram(self.buckets)
+        other.counts = list(self.counts)
+        other.total = self.total
+        other.sum = self.sum
+        return other
+
+
+_METRICS = (
+    ("http_request_duration_seconds", "Duración de los requests por ruta.", DURATION_BUCKETS),
+    ("http_request_db_seconds", "Tiempo en la BD por request, por ruta.", DURATION_BUCKETS),
+    ("http_request_db_queries", "Sentencias SQL por request, por ruta.", QUERY_BUCKETS),
+)
+
+_lock = threading.Lock()
+# (método, ruta) -> histogramas en el orden de _METRICS
+_histograms: Dict[Tuple[str, str], List[Histogram]] = {}
+# (método, ruta) -> requests con alguna sentencia repetida sobre el umbral
+_repeated: Counter = Counter()
+
+
+def record(method: str, route: str, duration: float, stats: RequestStats) -> None:
+    """Acumula un request terminado y avisa de las sentencias repetidas."""
+    key = (method, route)
+    # se normaliza al final: por request hay pocas sentencias distintas
+    shapes: Counter = Counter()
+    for statement, n in stats.shapes.items():
+        shapes[statement_shape(statement)] += n
+    repeated = [(shape, n) for shape, n in shapes.items() if n > settings.QUERY_REPEAT_WARN_THRESHOLD]
+
+    with _lock:
+        hists = _histograms.get(key)
+        if hists is None:
+            hists = _histograms[key] = [Histogram(buckets) for _, _, buckets in _METRICS]
+        hists[0].observe(duration)
+        hists[1].observe(stats.db_seconds)
+        hists[2].observe(stats.queries)
+        if repeated:
+            _repeated[key] += 1
+
+    for shape, n in repeated:
+        logger.warning(
+            "%s %s: la misma sentencia se ejecutó %d veces en un request (¿N+1?): %s",
+            method, route, n, shape,
+        )
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    return ",".join(f'{k}="{_label(v)}"' for k, v in labels.items())
+
+
+def histogram_lines(name: str, help_text: str, series: List[Tuple[Dict[str, str], Histogram]]) -> List[str]:
+    """Un histograma de Prometheus con una serie por juego de etiquetas."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, hist in series:
+        text = _labels(labels)
+        for upper, count in zip(hist.buckets, hist.counts):
+            lines.append(f'{name}_bucket{{{text},le="{_number(upper)}"}} {count}')
+        lines.append(f'{name}_bucket{{{text},le="+Inf"}} {hist.total}')
+        lines.append(f"{name}_sum{{{text}}} {_number(hist.sum)}")
+        lines.append(f"{name}_count{{{text}}} {hist.total}")
+    return lines
+
+
+def counter_lines(name: str, help_text: str, series: List[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Un contador de Prometheus con una serie por juego de etiquetas."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    for labels, value in series:
+        lines.append(f"{name}{{{_labels(labels)}}} {_number(value)}")
+    return lines
+
+
+def gauge_lines(name: str, help_text: str, series: List[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Un gauge de Prometheus con una serie por juego de etiquetas."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in series:
+        lines.append(f"{name}{{{_labels(labels)}}} {_number(value)}")
+    return lines
+
+
+def render() -> str:
+    """Todas las métricas en formato de texto de Prometheus (0.0.4)."""
+    with _lock:
+        items = sorted(
+            (key, [h.copy() for h in hists]) for key, hists in _histograms.items()
+        )
+        repeated = sorted(_repeated.items())
+
+    lines: List[str] = []
+    for i, (name, help_text, _) in enumerate(_METRICS):
+        lines += histogram_lines(name, help_text, [
+            ({"method": method, "route": route}, hists[i]) for (method, route), hists in items
+        ])
+    lines += counter_lines(
+        "http_requests_repeated_sql_total",
+        "Requests con una sentencia repetida más de QUERY_REPEAT_WARN_THRESHOLD veces.",
+        [({"method": method, "route": route}, count) for (method, route), count in repeated],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _repeated.clear()
+
+
+# ---------------------------
+# Middleware ASGI
+# ---------------------------
+
+class QueryMetricsMiddleware:
+    """
+    Middleware ASGI puro (no BaseHTTPMiddleware): las respuestas en
+    streaming siguen contando hasta que se envía el último chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            # la ruta ya resuelta (plantilla, no la URL: cardinalidad acotada)
+            route = getattr(scope.get("route"), "path", None) or "<sin ruta>"
+            record(scope["method"], route, time.perf_counter() - start, stats)
@@ -1,15 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import Base, engine
+from app.core.config import settings
+from app.core.database import Base, engine, ensure_columns, ensure_indexes
+from app.core.query_metrics import QueryMetricsMiddleware
 from app.api.routes_buyer import router as buyer_router
 from app.api.routes_match import router as match_router
 from app.api.routes_listings import router as listings_router
 from app.api.routes_leads import router as leads_router  # 👈 NUEVO
 from app.api.routes_dealers import router as dealers_router  # 👈 NUEVO
+from app.api.routes_metrics import router as metrics_router
 from app.api import routes_leads, routes_match  # 👈 añade routes_match
 
 Base.metadata.create_all(bind=engine)
+ensure_columns(engine)
+ensure_indexes(engine)
 
 app = FastAPI(
     title="Autofinder Backend",
@@ -29,6 +34,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Queries y tiempo de BD por request (ver GET /metrics)
+app.add_middleware(QueryMetricsMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "Backend Autofinder funcionando"}
@@ -38,4 +46,10 @@ app.include_router(match_router)
 app.include_router(listings_router)
 app.include_router(leads_router)   # 👈 NUEVO
 app.include_router(dealers_router)  # 👈 NUEVO
-app.include_router(routes_match.router)
\ No newline at end of file
+app.include_router(routes_match.router)
+app.include_router(metrics_router)
+
+if settings.ENV == "development":
+    from app.api.routes_dev import router as dev_router
+
+    app.include_router(dev_router)
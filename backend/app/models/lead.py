@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -27,3 +27,9 @@ class Lead(Base):
     # NUEVO: fecha de creación
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # listado admin (ORDER BY created_at DESC) y conteo de "hoy"
+        Index("ix_leads_created_at", "created_at"),
+        # leads de un dealer: listing_id IN (...) ORDER BY created_at
+        Index("ix_leads_listing_id_created_at", "listing_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -16,3 +16,8 @@ class LeadEvent(Base):
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     lead = relationship(Lead, backref="events")
+
+    __table_args__ = (
+        # timeline de un lead: WHERE lead_id = ? ORDER BY timestamp DESC
+        Index("ix_lead_events_lead_id_timestamp", "lead_id", "timestamp"),
+    )
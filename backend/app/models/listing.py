@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -42,3 +42,22 @@ class Listing(Base):
     make = Column(String, nullable=True)
     model = Column(String, nullable=True)
     trim = Column(String, nullable=True)
+
+    # Origen de los listings importados por el scraper (null en los cargados
+    # a mano). source_fingerprint identifica el aviso entre importaciones:
+    # ver app/services/listing_ingest.fingerprint
+    source_domain = Column(String, nullable=True)
+    source_url = Column(String, nullable=True)
+    vin = Column(String, nullable=True)
+    source_fingerprint = Column(String, nullable=True)
+
+    # Índices de las combinaciones de filtros más usadas (ver
+    # app/core/database.ensure_indexes, que los crea también en BDs existentes).
+    # (year, price, miles) cubre además las columnas de scoring de /match/.
+    __table_args__ = (
+        Index("ix_listings_year_price_miles", "year", "price", "miles"),
+        Index("ix_listings_price_miles", "price", "miles"),
+        Index("ix_listings_make_model_year", "make", "model", "year"),
+        Index("ix_listings_dealer_id", "dealer_id"),
+        Index("ux_listings_source_fingerprint", "source_fingerprint", unique=True),
+    )
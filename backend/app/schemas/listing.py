@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, create_model
 from typing import Optional, List, Dict, Any
 
 
@@ -97,5 +97,46 @@ class MatchRequest(BaseModel):
 class MatchResponse(BaseModel):
     results: List[ListingWithScore]
 
+
+class ListingScoreCompact(BaseModel):
+    """Resultado sin detalle (detail=false): sin sub_scores ni pesos repetidos."""
+    id: str
+    score: float
+    group_scores: Dict[str, float]
+
+
+class MatchCompactResponse(BaseModel):
+    results: List[ListingScoreCompact]
+    weights_sub: Dict[str, float]     # una sola vez para toda la respuesta
+    weights_groups: Dict[str, float]
+
 class ScrapeUrlsRequest(BaseModel):
-    urls: List[str]
\ No newline at end of file
+    urls: List[str]
+
+
+class ListingImportResult(BaseModel):
+    """Resultado de POST /listings/from-urls."""
+    inserted: int
+    updated: int
+    unchanged: int
+    listings: List[ListingIn]          # nuevos, actualizados e iguales
+
+
+# Item de GET /listings/: los campos de ListingIn, todos opcionales salvo
+# el id, para poder proyectar con `fields`. Sin `fields` viene igual que un
+# ListingIn; con `fields`, solo el id y los campos pedidos.
+ListingPageItem = create_model(
+    "ListingPageItem",
+    id=(str, ...),
+    **{
+        name: (Optional[f.annotation], None)
+        for name, f in ListingIn.model_fields.items()
+        if name != "id"
+    },
+)
+
+
+class ListingPage(BaseModel):
+    """Página de GET /listings/ (keyset por id)."""
+    items: List[ListingPageItem]
+    next_cursor: Optional[str] = None  # None si no hay más páginas
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # --------- FILTROS QUE VIENEN DEL FRONTEND ---------
@@ -35,7 +35,16 @@ class MatchRequest(BaseModel):
     filters: MatchFilters
     weights: MatchWeights
     body_style_preference: Optional[str] = None  # ej: "SUV", "Sedan"
-    limit_results: int = 20
+    limit_results: int = 20                      # tamaño de página
+    cursor: Optional[str] = None                 # next_cursor de la página anterior
+
+
+# Máximo de perfiles por llamada a /match/batch
+MAX_BATCH_REQUESTS = 200
+
+
+class MatchBatchRequest(BaseModel):
+    requests: List[MatchRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
 
 
 # --------- RESPUESTA HACIA EL FRONTEND ---------
@@ -66,3 +75,8 @@ class MatchResponse(BaseModel):
     total_candidates: int   # autos que pasaron los filtros
     returned: int           # autos devueltos (limit_results)
     results: List[ListingScoreOut]
+    next_cursor: Optional[str] = None  # None si no hay más páginas
+
+
+class MatchBatchResponse(BaseModel):
+    responses: List[MatchResponse]  # mismo orden que los requests
@@ -13,7 +13,7 @@ from sqlalchemy.orm import Session
 
 from app.core.database import SessionLocal
 from app.models.dealer import Dealer
-from app.models.listing import Listing
+from app.services.listing_ingest import bulk_insert_listings
 
 
 def _get_or_create_demo_dealer(db: Session) -> Dealer:
@@ -34,6 +34,26 @@ def _get_or_create_demo_dealer(db: Session) -> Dealer:
     return dealer
 
 
+def _to_row(item: dict) -> dict:
+    """
+    Los datos de abajo usan nombres de una versión anterior del modelo
+    (mileage, condition, ...); se pasan a las columnas actuales de listings.
+    """
+    return {
+        "dealer_id": item["dealer_id"],
+        "price": item["price"],
+        "miles": item["mileage"],
+        "year": item["year"],
+        "age_category": item["condition"],
+        "drivetrain": item["drivetrain"],
+        "seats": item["seats"],
+        "rows": item["rows"],
+        "make": item["make"],
+        "model": item["model"],
+        "trim": item["trim"],
+    }
+
+
 def seed_listings(db: Session) -> None:
     dealer = _get_or_create_demo_dealer(db)
 
@@ -43,7 +63,7 @@ def seed_listings(db: Session) -> None:
 
     demo_listings = [
         # SUVs 3 filas
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2016,
             make="Honda",
@@ -65,7 +85,7 @@ def seed_listings(db: Session) -> None:
             photo_url="https://example.com/pilot-2016.jpg",
             created_source="seed_script",
         ),
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2019,
             make="Honda",
@@ -88,7 +108,7 @@ def seed_listings(db: Session) -> None:
             photo_url="https://example.com/pilot-2019.jpg",
             created_source="seed_script",
         ),
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2020,
             make="Toyota",
@@ -110,7 +130,7 @@ def seed_listings(db: Session) -> None:
             photo_url="https://example.com/highlander-2020.jpg",
             created_source="seed_script",
         ),
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2021,
             make="Kia",
@@ -134,7 +154,7 @@ def seed_listings(db: Session) -> None:
             created_source="seed_script",
         ),
         # SUVs 2 filas
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2018,
             make="Honda",
@@ -156,7 +176,7 @@ def seed_listings(db: Session) -> None:
             photo_url="https://example.com/crv-2018.jpg",
             created_source="seed_script",
         ),
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2022,
             make="Toyota",
@@ -179,7 +199,7 @@ def seed_listings(db: Session) -> None:
             created_source="seed_script",
         ),
         # Sedanes
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2019,
             make="Honda",
@@ -199,7 +219,7 @@ def seed_listings(db: Session) -> None:
             photo_url="https://example.com/accord-2019.jpg",
             created_source="seed_script",
         ),
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2020,
             make="Toyota",
@@ -220,7 +240,7 @@ def seed_listings(db: Session) -> None:
             created_source="seed_script",
         ),
         # Pickup
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2017,
             make="Ford",
@@ -241,7 +261,7 @@ def seed_listings(db: Session) -> None:
             created_source="seed_script",
         ),
         # Compacto económico
-        Listing(
+        dict(
             dealer_id=dealer.id,
             year=2016,
             make="Toyota",
@@ -263,7 +283,8 @@ def seed_listings(db: Session) -> None:
         ),
     ]
 
-    db.add_all(demo_listings)
+    # un INSERT ... RETURNING para todas las filas, sin refresh por fila
+    bulk_insert_listings(db, [_to_row(item) for item in demo_listings])
     db.commit()
 
     print(f"Se han insertado {len(demo_listings)} listings de prueba para el dealer {dealer.name} (ID {dealer.id}).")
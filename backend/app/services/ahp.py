@@ -1,10 +1,36 @@
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+from sqlalchemy import case, func, literal, true
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.listing import Listing
 from app.models.dealer import Dealer
-from app.schemas.match import MatchFilters, MatchWeights
+from app.schemas.match import MatchFilters, MatchRequest, MatchWeights
+from app.services.listing_snapshot import ListingSnapshot, get_snapshot
+from app.services.parallel_scoring import Shard, map_shards, parallel_enabled, split
+from app.services.topk import STREAM_BATCH_SIZE, TopK, record_stream_run
+
+# Motores de scoring disponibles para rank_listings_with_ahp
+MATCH_ENGINES = ("python", "numpy", "sql", "stream", "snapshot")
+
+EPS = 1e-6
+
+# Columnas que usa el scoring y su valor si el modelo aún no las tiene
+# (mismo default que los getattr del motor python).
+_SCORING_COLUMNS: Dict[str, Any] = {
+    "price": None,
+    "miles": None,
+    "year": None,
+    "has_third_row": False,
+    "is_awd": False,
+    "condition": None,
+    "body_style": None,
+}
+
+# Tamaño de lote para los IN (...) al recuperar el top-K
+_IN_CHUNK = 500
 
 
 def _normalize_weights(weights: MatchWeights) -> Dict[str, float]:
@@ -29,24 +55,11 @@ def _normalize_weights(weights: MatchWeights) -> Dict[str, float]:
     return {k: v / total for k, v in raw.items()}
 
 
-def rank_listings_with_ahp(
-    db: Session,
-    filters: MatchFilters,
-    weights: MatchWeights,
-    body_style_preference: Optional[str] = None,
-    limit_results: int = 20,
-) -> List[Dict[str, Any]]:
+def _apply_hard_filters(query, filters: MatchFilters):
     """
-    Devuelve una lista de dicts con:
-      - info básica del listing
-      - score (0-1, NORMALIZADO entre los candidatos)
-      - score_100 (0-100)
-    Ordenados de mayor a menor score.
+    Aplica los filtros duros de MatchFilters a una query sobre Listing.
+    Solo filtra por columnas que existan en el modelo.
     """
-
-    # 1) Construir query base con filtros duros
-    query = db.query(Listing)
-
     if filters.min_price is not None and hasattr(Listing, "price"):
         query = query.filter(Listing.price >= filters.min_price)
     if filters.max_price is not None and hasattr(Listing, "price"):
@@ -69,6 +82,182 @@ def rank_listings_with_ahp(
     if filters.require_awd and hasattr(Listing, "is_awd"):
         query = query.filter(Listing.is_awd.is_(True))
 
+    return query
+
+
+def _result_row(c: Listing, raw_score: float, dealer_name: Optional[str]) -> Dict[str, Any]:
+    """
+    Dict de salida para un candidato (antes de añadir score/score_100).
+    """
+    return {
+        "listing_id": c.id,
+        "raw_score": raw_score,
+        "year": getattr(c, "year", None),
+        "make": getattr(c, "make", None),
+        "model": getattr(c, "model", None),
+        "trim": getattr(c, "trim", None),
+        "price": getattr(c, "price", None),
+        "miles": getattr(c, "miles", None),
+        "body_style": getattr(c, "body_style", None),
+        "condition": getattr(c, "condition", None),
+        "dealer_name": dealer_name,
+        "source": getattr(c, "source", None),
+        "url": getattr(c, "url", None),
+        "created_at": getattr(c, "created_at", None),
+    }
+
+
+def _dealer_names(db: Session, listings: List[Listing]) -> Dict[int, str]:
+    """
+    Nombres de dealer de los listings dados, en una sola query
+    (solo se llama con el top-K final, no por candidato).
+    """
+    dealer_ids = {c.dealer_id for c in listings if getattr(c, "dealer_id", None) is not None}
+    if not dealer_ids:
+        return {}
+    rows = db.query(Dealer.id, Dealer.name).filter(Dealer.id.in_(dealer_ids)).all()
+    return {dealer_id: name for dealer_id, name in rows}
+
+
+def _fetch_listings(db: Session, ids: List[int]) -> Dict[int, Listing]:
+    """Carga los Listing de `ids` (en lotes) indexados por id."""
+    by_id: Dict[int, Listing] = {}
+    for start in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[start:start + _IN_CHUNK]
+        for c in db.query(Listing).filter(Listing.id.in_(chunk)).all():
+            by_id[c.id] = c
+    return by_id
+
+
+def _present_scoring_columns() -> List[str]:
+    """Columnas de _SCORING_COLUMNS que existen en el modelo Listing."""
+    return [name for name in _SCORING_COLUMNS if hasattr(Listing, name)]
+
+
+def rank_listings_with_ahp(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str] = None,
+    limit_results: int = 20,
+    engine: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Devuelve una lista de dicts con:
+      - info básica del listing
+      - score (0-1, NORMALIZADO entre los candidatos)
+      - score_100 (0-100)
+    Ordenados de mayor a menor score.
+
+    `engine` elige el motor de cálculo ("python", "numpy", "sql", "stream" o
+    "snapshot"); si es None se usa settings.MATCH_ENGINE. Todos devuelven los
+    mismos scores y orden; a igual score, por id ascendente.
+    """
+    engine = (engine or settings.MATCH_ENGINE).lower()
+    if engine not in MATCH_ENGINES:
+        raise ValueError(f"Motor de matching desconocido: {engine!r}")
+
+    if engine == "numpy":
+        return _rank_numpy(db, filters, weights, body_style_preference, limit_results)
+    if engine == "sql":
+        return _rank_sql(db, filters, weights, body_style_preference, limit_results)
+    if engine == "stream":
+        return _rank_stream(db, filters, weights, body_style_preference, limit_results)
+    if engine == "snapshot":
+        return _rank_snapshot(db, filters, weights, body_style_preference, limit_results)
+    return _rank_python(db, filters, weights, body_style_preference, limit_results)
+
+
+# ============================================================
+#   MOTOR "python": un objeto ORM a la vez
+# ============================================================
+
+def _norm_minimize(value, v_min, v_max) -> float:
+    """
+    Criterio a minimizar (precio, millas):
+    menor valor => score más alto (cercano a 1).
+    """
+    if value is None or v_min is None or v_max is None or v_max == v_min:
+        return 0.5
+    return (v_max - value) / (v_max - v_min + EPS)
+
+
+def _norm_maximize(value, v_min, v_max) -> float:
+    """
+    Criterio a maximizar (año):
+    mayor valor => score más alto.
+    """
+    if value is None or v_min is None or v_max is None or v_max == v_min:
+        return 0.5
+    return (value - v_min) / (v_max - v_min + EPS)
+
+
+def _raw_score(
+    values: Dict[str, Any],
+    bounds: Dict[str, Any],
+    w: Dict[str, float],
+    filters: MatchFilters,
+    body_style_preference: Optional[str],
+) -> float:
+    """
+    Score bruto de un candidato (antes de reescalar 0-1).
+    `values` trae las columnas de _SCORING_COLUMNS y `bounds` los
+    min/max de precio, millas y año de todos los candidatos.
+    """
+    s_price = _norm_minimize(values["price"], bounds["p_min"], bounds["p_max"])
+    s_miles = _norm_minimize(values["miles"], bounds["m_min"], bounds["m_max"])
+    s_year = _norm_maximize(values["year"], bounds["y_min"], bounds["y_max"])
+
+    s_third = 1.0 if values["has_third_row"] else 0.0
+    s_awd = 1.0 if values["is_awd"] else 0.0
+
+    cond_val = values["condition"]
+    if filters.conditions and cond_val in filters.conditions:
+        s_condition = 1.0
+    elif filters.conditions:
+        s_condition = 0.0
+    else:
+        s_condition = 0.5  # sin preferencia clara
+
+    body_style = values["body_style"]
+    if body_style_preference and body_style:
+        if body_style.lower() == body_style_preference.lower():
+            s_body = 1.0
+        else:
+            s_body = 0.0
+    else:
+        s_body = 0.5
+
+    # Score bruto: suma ponderada según pesos normalizados
+    return (
+        w["price"] * s_price
+        + w["mileage"] * s_miles
+        + w["year"] * s_year
+        + w["third_row"] * s_third
+        + w["awd"] * s_awd
+        + w["condition"] * s_condition
+        + w["body_style"] * s_body
+    )
+
+
+def _rescale(raw_score: float, s_min: float, s_max: float) -> float:
+    """Re-escala un score bruto a [0,1] entre los candidatos."""
+    if s_max == s_min:
+        # todos tienen mismo score: dejar todo a 0.5
+        return 0.5
+    return (raw_score - s_min) / (s_max - s_min + EPS)
+
+
+def _rank_python(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    # 1) Construir query base con filtros duros
+    query = _apply_hard_filters(db.query(Listing), filters)
+
     candidates: List[Listing] = query.all()
     total_candidates = len(candidates)
 
@@ -83,122 +272,825 @@ def rank_listings_with_ahp(
     miles_list = [c.miles for c in candidates if getattr(c, "miles", None) is not None]
     years = [c.year for c in candidates if getattr(c, "year", None) is not None]
 
-    p_min = min(prices) if prices else None
-    p_max = max(prices) if prices else None
-    m_min = min(miles_list) if miles_list else None
-    m_max = max(miles_list) if miles_list else None
-    y_min = min(years) if years else None
-    y_max = max(years) if years else None
+    bounds = {
+        "p_min": min(prices) if prices else None,
+        "p_max": max(prices) if prices else None,
+        "m_min": min(miles_list) if miles_list else None,
+        "m_max": max(miles_list) if miles_list else None,
+        "y_min": min(years) if years else None,
+        "y_max": max(years) if years else None,
+    }
 
-    eps = 1e-6
+    # 4) Calcular score bruto por candidato (antes de reescalar 0-1)
+    scored: List[Tuple[Listing, float]] = []
+    for c in candidates:
+        values = {name: getattr(c, name, default) for name, default in _SCORING_COLUMNS.items()}
+        scored.append((c, _raw_score(values, bounds, w, filters, body_style_preference)))
 
-    def norm_minimize(value, v_min, v_max) -> float:
-        """
-        Criterio a minimizar (precio, millas):
-        menor valor => score más alto (cercano a 1).
-        """
-        if value is None or v_min is None or v_max is None or v_max == v_min:
-            return 0.5
-        return (v_max - value) / (v_max - v_min + eps)
+    # 5) Re-escalar los scores a [0,1] entre los candidatos
+    raw_values = [raw_score for _, raw_score in scored]
+    s_min = min(raw_values)
+    s_max = max(raw_values)
 
-    def norm_maximize(value, v_min, v_max) -> float:
-        """
-        Criterio a maximizar (año):
-        mayor valor => score más alto.
-        """
-        if value is None or v_min is None or v_max is None or v_max == v_min:
-            return 0.5
-        return (value - v_min) / (v_max - v_min + eps)
+    ranked = [(c, raw_score, _rescale(raw_score, s_min, s_max)) for c, raw_score in scored]
+
+    # 6) Ordenar de mayor a menor score normalizado; a igual score, por id
+    #    (no depende del orden en que la BD devolvió las filas)
+    ranked.sort(key=lambda x: (-x[2], x[0].id))
+
+    if limit_results > 0:
+        ranked = ranked[:limit_results]
 
+    # 7) Dict de salida solo para el top-K, con los dealers en una query
+    names = _dealer_names(db, [c for c, _, _ in ranked])
     results: List[Dict[str, Any]] = []
+    for c, raw_score, norm in ranked:
+        r = _result_row(c, raw_score, names.get(c.dealer_id))
+        r["score"] = norm
+        r["score_100"] = int(round(norm * 100))
+        results.append(r)
 
-    # 4) Calcular score bruto por candidato (antes de reescalar 0-1)
-    for c in candidates:
-        price_val = getattr(c, "price", None)
-        miles_val = getattr(c, "miles", None)
-        year_val = getattr(c, "year", None)
+    return results
 
-        s_price = norm_minimize(price_val, p_min, p_max)
-        s_miles = norm_minimize(miles_val, m_min, m_max)
-        s_year = norm_maximize(year_val, y_min, y_max)
 
-        has_third = getattr(c, "has_third_row", False)
-        s_third = 1.0 if has_third else 0.0
+# ============================================================
+#   MOTOR "numpy": columnas en arrays, scoring vectorizado
+# ============================================================
 
-        is_awd = getattr(c, "is_awd", False)
-        s_awd = 1.0 if is_awd else 0.0
+def _load_scoring_columns(db: Session, filters: MatchFilters) -> Dict[str, np.ndarray]:
+    """
+    Ejecuta la query filtrada trayendo solo id + columnas de scoring
+    (tuplas, sin objetos ORM) y las devuelve como arrays por columna.
+    """
+    present = _present_scoring_columns()
+    query = _apply_hard_filters(
+        db.query(Listing.id, *[getattr(Listing, name) for name in present]),
+        filters,
+    )
+    rows = query.all()
 
-        cond_val = getattr(c, "condition", None)
-        if filters.conditions and cond_val in filters.conditions:
-            s_condition = 1.0
-        elif filters.conditions:
-            s_condition = 0.0
+    columns: Dict[str, np.ndarray] = {"id": np.array([r[0] for r in rows], dtype=np.int64)}
+    n = len(rows)
+    for name, default in _SCORING_COLUMNS.items():
+        if name in present:
+            idx = present.index(name) + 1
+            values = [r[idx] for r in rows]
         else:
-            s_condition = 0.5  # sin preferencia clara
-
-        body_style = getattr(c, "body_style", None)
-        if body_style_preference and body_style:
-            if body_style.lower() == body_style_preference.lower():
-                s_body = 1.0
-            else:
-                s_body = 0.0
+            values = [default] * n
+        if name in ("price", "miles", "year"):
+            # None -> NaN para poder detectarlo en vectorizado
+            columns[name] = np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
         else:
-            s_body = 0.5
-
-        # Score bruto: suma ponderada según pesos normalizados
-        raw_score = (
-            w["price"] * s_price
-            + w["mileage"] * s_miles
-            + w["year"] * s_year
-            + w["third_row"] * s_third
-            + w["awd"] * s_awd
-            + w["condition"] * s_condition
-            + w["body_style"] * s_body
+            columns[name] = np.array(values, dtype=object)
+    return columns
+
+
+def _column_bounds(values: np.ndarray) -> Tuple[Optional[float], Optional[float]]:
+    """(min, max) ignorando NaN; (None, None) si no hay valores."""
+    present = values[~np.isnan(values)]
+    if len(present) == 0:
+        return None, None
+    return present.min(), present.max()
+
+
+def _norm_array(
+    values: np.ndarray,
+    minimize: bool,
+    bounds: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> np.ndarray:
+    """
+    Versión vectorizada de norm_minimize / norm_maximize.
+    Los None (NaN) y el caso min == max quedan en 0.5.
+    `bounds` fija el (min, max) en vez de tomarlo de `values` (shards).
+    """
+    present = ~np.isnan(values)
+    v_min, v_max = bounds if bounds is not None else _column_bounds(values)
+    if v_min is None:
+        return np.full(values.shape, 0.5)
+    if v_max == v_min:
+        return np.full(values.shape, 0.5)
+    if minimize:
+        scores = (v_max - values) / (v_max - v_min + EPS)
+    else:
+        scores = (values - v_min) / (v_max - v_min + EPS)
+    return np.where(present, scores, 0.5)
+
+
+def _score_columns(
+    columns: Dict[str, np.ndarray],
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula (raw_score, score normalizado 0-1) para todos los candidatos.
+    Mismas fórmulas y mismo orden de operaciones que el motor python,
+    así que los floats salen idénticos.
+    """
+    raw = _raw_columns(columns, filters, weights, body_style_preference)
+    return raw, _rescale_array(raw)
+
+
+def _raw_columns(
+    columns: Dict[str, np.ndarray],
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    bounds: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+) -> np.ndarray:
+    """
+    Score bruto de cada candidato. Sin `bounds`, los min/max de precio,
+    millas y año salen de las mismas columnas; con `bounds` (min/max
+    globales) se puede puntuar un subconjunto de candidatos.
+    """
+    bounds = bounds or {}
+    w = _normalize_weights(weights)
+
+    s_price = _norm_array(columns["price"], minimize=True, bounds=bounds.get("price"))
+    s_miles = _norm_array(columns["miles"], minimize=True, bounds=bounds.get("miles"))
+    s_year = _norm_array(columns["year"], minimize=False, bounds=bounds.get("year"))
+
+    s_third = np.array([1.0 if v else 0.0 for v in columns["has_third_row"]])
+    s_awd = np.array([1.0 if v else 0.0 for v in columns["is_awd"]])
+
+    n = len(columns["id"])
+    if filters.conditions:
+        allowed = filters.conditions
+        s_condition = np.array([1.0 if v in allowed else 0.0 for v in columns["condition"]])
+    else:
+        s_condition = np.full(n, 0.5)
+
+    if body_style_preference:
+        pref = body_style_preference.lower()
+        s_body = np.array(
+            [(1.0 if v.lower() == pref else 0.0) if v else 0.5 for v in columns["body_style"]]
         )
+    else:
+        s_body = np.full(n, 0.5)
+
+    raw = (
+        w["price"] * s_price
+        + w["mileage"] * s_miles
+        + w["year"] * s_year
+        + w["third_row"] * s_third
+        + w["awd"] * s_awd
+        + w["condition"] * s_condition
+        + w["body_style"] * s_body
+    )
+
+    return raw
+
+
+def _rescale_array(raw: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de _rescale."""
+    s_min = raw.min()
+    s_max = raw.max()
+    if s_max == s_min:
+        return np.full(len(raw), 0.5)
+    return (raw - s_min) / (s_max - s_min + EPS)
+
+
+def _rank_numpy(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    columns = _load_scoring_columns(db, filters)
+    if len(columns["id"]) == 0:
+        return []
+
+    raw, norm = _score_columns(columns, filters, weights, body_style_preference)
+
+    # De mayor a menor score; a igual score, por id (como el motor python)
+    order = np.lexsort((columns["id"], -norm))
+    if limit_results > 0:
+        order = order[:limit_results]
+
+    # Solo se materializan objetos ORM para el top-K
+    by_id = _fetch_listings(db, [int(i) for i in columns["id"][order]])
+
+    names = _dealer_names(db, list(by_id.values()))
+
+    results: List[Dict[str, Any]] = []
+    for pos in order:
+        c = by_id[int(columns["id"][pos])]
+        r = _result_row(c, float(raw[pos]), names.get(c.dealer_id))
+        score = float(norm[pos])
+        r["score"] = score
+        r["score_100"] = int(round(score * 100))
+        results.append(r)
+
+    return results
 
-        dealer_name = None
-        if getattr(c, "dealer_id", None) is not None:
-            dealer = db.query(Dealer).filter(Dealer.id == c.dealer_id).first()
-            if dealer:
-                dealer_name = dealer.name
-
-        results.append(
-            {
-                "listing_id": c.id,
-                "raw_score": raw_score,
-                "year": getattr(c, "year", None),
-                "make": getattr(c, "make", None),
-                "model": getattr(c, "model", None),
-                "trim": getattr(c, "trim", None),
-                "price": getattr(c, "price", None),
-                "miles": getattr(c, "miles", None),
-                "body_style": getattr(c, "body_style", None),
-                "condition": getattr(c, "condition", None),
-                "dealer_name": dealer_name,
-                "source": getattr(c, "source", None),
-                "url": getattr(c, "url", None),
-                "created_at": getattr(c, "created_at", None),
-            }
+
+# ============================================================
+#   MOTOR "sql": filtros, score y top-K dentro de la BD
+# ============================================================
+
+def _sql_norm(col, v_min, v_max, minimize: bool):
+    """
+    Expresión SQL equivalente a norm_minimize / norm_maximize.
+    """
+    if minimize:
+        expr = (v_max - col) / (v_max - v_min + EPS)
+    else:
+        expr = (col - v_min) / (v_max - v_min + EPS)
+    return case(
+        (col.is_(None) | v_min.is_(None) | (v_max == v_min), 0.5),
+        else_=expr,
+    )
+
+
+def _sql_flag(name: str):
+    """1.0 si la columna booleana es verdadera; 0.0 si no existe en el modelo."""
+    if not hasattr(Listing, name):
+        return literal(0.0)
+    return case((getattr(Listing, name).is_(True), 1.0), else_=0.0)
+
+
+def _sql_raw_score(
+    stats,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+):
+    """
+    Construye el score bruto (suma ponderada) como expresión SQL.
+    `stats` es la subquery agregada con los min/max de los candidatos.
+    """
+    w = _normalize_weights(weights)
+
+    s_price = _sql_norm(Listing.price, stats.c.p_min, stats.c.p_max, minimize=True)
+    s_miles = _sql_norm(Listing.miles, stats.c.m_min, stats.c.m_max, minimize=True)
+    s_year = _sql_norm(Listing.year, stats.c.y_min, stats.c.y_max, minimize=False)
+    s_third = _sql_flag("has_third_row")
+    s_awd = _sql_flag("is_awd")
+
+    if not filters.conditions:
+        s_condition = literal(0.5)
+    elif hasattr(Listing, "condition"):
+        s_condition = case((Listing.condition.in_(filters.conditions), 1.0), else_=0.0)
+    else:
+        # la columna no existe: ningún candidato cumple (None not in conditions)
+        s_condition = literal(0.0)
+
+    if body_style_preference and hasattr(Listing, "body_style"):
+        s_body = case(
+            (
+                Listing.body_style.is_(None) | (Listing.body_style == ""),
+                0.5,
+            ),
+            (func.lower(Listing.body_style) == body_style_preference.lower(), 1.0),
+            else_=0.0,
         )
+    else:
+        s_body = literal(0.5)
 
-    # 5) Re-escalar los scores a [0,1] entre los candidatos
-    raw_values = [r["raw_score"] for r in results]
-    s_min = min(raw_values)
-    s_max = max(raw_values)
+    # Mismo orden de suma que el motor python para obtener los mismos floats
+    return (
+        w["price"] * s_price
+        + w["mileage"] * s_miles
+        + w["year"] * s_year
+        + w["third_row"] * s_third
+        + w["awd"] * s_awd
+        + w["condition"] * s_condition
+        + w["body_style"] * s_body
+    )
 
-    for r in results:
-        if s_max == s_min:
-            # todos tienen mismo score: dejar todo a 0.5
-            norm = 0.5
-        else:
-            norm = (r["raw_score"] - s_min) / (s_max - s_min + eps)
+
+def _rank_sql(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    # 1) min/max de los candidatos en una subquery agregada
+    stats = _apply_hard_filters(
+        db.query(
+            func.min(Listing.price).label("p_min"),
+            func.max(Listing.price).label("p_max"),
+            func.min(Listing.miles).label("m_min"),
+            func.max(Listing.miles).label("m_max"),
+            func.min(Listing.year).label("y_min"),
+            func.max(Listing.year).label("y_max"),
+        ),
+        filters,
+    ).subquery("stats")
+
+    # 2) score bruto por candidato
+    raw_expr = _sql_raw_score(stats, filters, weights, body_style_preference)
+    scored = (
+        _apply_hard_filters(
+            db.query(Listing.id.label("listing_id"), raw_expr.label("raw_score")),
+            filters,
+        )
+        .join(stats, true())
+        .subquery("scored")
+    )
+
+    # 3) min/max del score bruto con ventanas (se evalúan antes del LIMIT),
+    #    ORDER BY score DESC LIMIT k en la BD
+    query = (
+        db.query(
+            Listing,
+            scored.c.raw_score,
+            func.min(scored.c.raw_score).over(),
+            func.max(scored.c.raw_score).over(),
+        )
+        .join(scored, Listing.id == scored.c.listing_id)
+        .order_by(scored.c.raw_score.desc(), Listing.id)
+    )
+    if limit_results > 0:
+        query = query.limit(limit_results)
+
+    rows = query.all()
+    names = _dealer_names(db, [c for c, _, _, _ in rows])
+
+    results: List[Dict[str, Any]] = []
+    for c, raw_score, s_min, s_max in rows:
+        norm = _rescale(raw_score, s_min, s_max)
+        r = _result_row(c, raw_score, names.get(c.dealer_id))
+        r["score"] = norm
+        r["score_100"] = int(round(norm * 100))
+        results.append(r)
+
+    return results
+
+
+# ============================================================
+#   MOTOR "stream": cursor por lotes + heap de tamaño k
+# ============================================================
+
+def _candidate_bounds(db: Session, filters: MatchFilters) -> Dict[str, Any]:
+    """
+    Cuenta los candidatos y obtiene min/max de precio, millas y año
+    en una sola query agregada.
+    """
+    row = _apply_hard_filters(
+        db.query(
+            func.count(Listing.id).label("n"),
+            func.min(Listing.price).label("p_min"),
+            func.max(Listing.price).label("p_max"),
+            func.min(Listing.miles).label("m_min"),
+            func.max(Listing.miles).label("m_max"),
+            func.min(Listing.year).label("y_min"),
+            func.max(Listing.year).label("y_max"),
+        ),
+        filters,
+    ).one()
+    return dict(row._mapping)
+
+
+def _rank_stream(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    bounds = _candidate_bounds(db, filters)
+    if not bounds["n"]:
+        return []
+
+    w = _normalize_weights(weights)
+
+    present = _present_scoring_columns()
+    query = _apply_hard_filters(
+        db.query(Listing.id, *[getattr(Listing, name) for name in present]),
+        filters,
+    ).yield_per(STREAM_BATCH_SIZE)
+
+    # Solo se retienen (raw_score, id) de los k mejores; el min/max del
+    # score bruto para el reescalado se lleva en una pasada. La clave lleva
+    # -id: a igual score gana el id menor, lleguen en el orden que lleguen
+    top = TopK(limit_results)
+    s_min = s_max = None
+    defaults = dict(_SCORING_COLUMNS)
+    for row in query:
+        values = dict(defaults)
+        values.update(zip(present, row[1:]))
+        raw_score = _raw_score(values, bounds, w, filters, body_style_preference)
+        if s_min is None or raw_score < s_min:
+            s_min = raw_score
+        if s_max is None or raw_score > s_max:
+            s_max = raw_score
+        top.push((raw_score, -row[0]), row[0])
+
+    record_stream_run("ahp", top.seen, top.peak)
+
+    ranked = top.items()
+    by_id = _fetch_listings(db, [listing_id for _, listing_id in ranked])
+    names = _dealer_names(db, list(by_id.values()))
+
+    results: List[Dict[str, Any]] = []
+    for (raw_score, _), listing_id in ranked:
+        c = by_id[listing_id]
+        norm = _rescale(raw_score, s_min, s_max)
+        r = _result_row(c, raw_score, names.get(c.dealer_id))
         r["score"] = norm
         r["score_100"] = int(round(norm * 100))
+        results.append(r)
+
+    return results
+
+
+# ============================================================
+#   MOTOR "snapshot": scoring numpy sobre el snapshot en memoria
+# ============================================================
+
+def _snapshot_mask(snap: ListingSnapshot, filters: MatchFilters) -> np.ndarray:
+    """
+    Equivalente vectorizado de _apply_hard_filters sobre el snapshot.
+    Los NaN (NULL) no pasan las comparaciones, igual que en SQL.
+    """
+    mask = np.ones(snap.size, dtype=bool)
+
+    if filters.min_price is not None and "price" in snap.columns:
+        mask &= snap.numeric("price") >= filters.min_price
+    if filters.max_price is not None and "price" in snap.columns:
+        mask &= snap.numeric("price") <= filters.max_price
+
+    if filters.min_year is not None and "year" in snap.columns:
+        mask &= snap.numeric("year") >= filters.min_year
+    if filters.max_year is not None and "year" in snap.columns:
+        mask &= snap.numeric("year") <= filters.max_year
+
+    if filters.max_miles is not None and "miles" in snap.columns:
+        mask &= snap.numeric("miles") <= filters.max_miles
+
+    if filters.conditions and "condition" in snap.columns:
+        allowed = set(filters.conditions)
+        mask &= np.array([v in allowed for v in snap.columns["condition"]], dtype=bool)
+
+    if filters.require_third_row and "has_third_row" in snap.columns:
+        mask &= np.array([v is True for v in snap.columns["has_third_row"]], dtype=bool)
+
+    if filters.require_awd and "is_awd" in snap.columns:
+        mask &= np.array([v is True for v in snap.columns["is_awd"]], dtype=bool)
+
+    return mask
+
+
+def _rank_snapshot(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    snap = get_snapshot(db)
+    mask = _snapshot_mask(snap, filters)
+    if parallel_enabled(int(mask.sum())):
+        return _rank_snapshot_parallel(snap, mask, filters, weights, body_style_preference, limit_results)
+
+    positions, raw, norm = _snapshot_scores(snap, filters, weights, body_style_preference, mask)
+    if len(positions) == 0:
+        return []
+    return _snapshot_results(snap, positions, raw, norm, limit_results)
+
+
+def _gather_scoring_columns(
+    n: int,
+    available: Any,
+    numeric: Callable[[str], np.ndarray],
+    objects: Callable[[str], np.ndarray],
+) -> Dict[str, np.ndarray]:
+    """
+    Columnas de _SCORING_COLUMNS para n candidatos: precio/millas/año como
+    float64 y el resto como objetos (o su default si la columna no existe).
+    """
+    columns: Dict[str, np.ndarray] = {"id": objects("id")}
+    for name, default in _SCORING_COLUMNS.items():
+        if name in ("price", "miles", "year"):
+            columns[name] = numeric(name) if name in available else np.full(n, np.nan)
+        elif name in available:
+            columns[name] = objects(name)
+        else:
+            columns[name] = np.array([default] * n, dtype=object)
+    return columns
+
+
+def _snapshot_scores(
+    snap: ListingSnapshot,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(positions, raw, norm) de los candidatos del snapshot, en orden de fila."""
+    if mask is None:
+        mask = _snapshot_mask(snap, filters)
+    positions = np.flatnonzero(mask)
+    if len(positions) == 0:
+        return positions, np.empty(0), np.empty(0)
+
+    columns = _gather_scoring_columns(
+        len(positions),
+        snap.columns,
+        lambda name: snap.numeric(name)[positions],
+        lambda name: snap.columns[name][positions],
+    )
+    raw, norm = _score_columns(columns, filters, weights, body_style_preference)
+    return positions, raw, norm
+
+
+def _rank_snapshot_parallel(
+    snap: ListingSnapshot,
+    mask: np.ndarray,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    """
+    Igual que el motor snapshot pero repartiendo los candidatos entre
+    procesos (services/parallel_scoring.py). Los min/max de precio, millas
+    y año se calculan aquí sobre todos los candidatos; cada shard devuelve
+    su top-K por score bruto y el min/max de sus scores para reescalar.
+    """
+    bounds = {
+        name: _column_bounds(snap.numeric(name)[mask]) if name in snap.columns else (None, None)
+        for name in ("price", "miles", "year")
+    }
+    parts = map_shards(
+        _score_snapshot_shard,
+        split(snap, mask, ["id", *_present_scoring_columns()]),
+        filters,
+        weights,
+        body_style_preference,
+        bounds,
+        limit_results,
+    )
+
+    s_min = min(p[0] for p in parts)
+    s_max = max(p[1] for p in parts)
+    # el reescalado es monótono: ordenar por bruto (empates por fila) da
+    # el mismo orden que el sort estable por score normalizado
+    merged = sorted((item for p in parts for item in p[2]), key=lambda t: (-t[0], t[1]))
+    if limit_results > 0:
+        merged = merged[:limit_results]
+
+    raw = np.array([r for r, _ in merged], dtype=np.float64)
+    positions = np.array([pos for _, pos in merged], dtype=np.int64)
+    if s_max == s_min:
+        norm = np.full(len(raw), 0.5)
+    else:
+        norm = (raw - s_min) / (s_max - s_min + EPS)
+    return _snapshot_rows(snap, positions, raw, norm)
+
+
+def _score_snapshot_shard(
+    shard: Shard,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    bounds: Dict[str, Tuple[Optional[float], Optional[float]]],
+    limit_results: int,
+) -> Tuple[float, float, List[Tuple[float, int]]]:
+    """En un worker: (min, max, top-K [(raw, fila)]) de los candidatos del shard."""
+    view = shard.open()
+    positions = view.positions
+    columns = _gather_scoring_columns(
+        len(positions),
+        view.desc.kinds,
+        view.numeric,
+        lambda name: np.array(view.values(name), dtype=object),
+    )
+    raw = _raw_columns(columns, filters, weights, body_style_preference, bounds)
+
+    order = np.lexsort((positions, -raw))
+    if limit_results > 0:
+        order = order[:limit_results]
+    top = list(zip(raw[order].tolist(), positions[order].tolist()))
+    return float(raw.min()), float(raw.max()), top
 
-    # 6) Ordenar de mayor a menor score normalizado
-    results.sort(key=lambda x: x["score"], reverse=True)
 
+def _snapshot_results(
+    snap: ListingSnapshot,
+    positions: np.ndarray,
+    raw: np.ndarray,
+    norm: np.ndarray,
+    limit_results: int,
+) -> List[Dict[str, Any]]:
+    """
+    Ordena (estable) y arma los dicts del top-K a partir del snapshot.
+    `positions[i]` es la fila del snapshot del candidato i.
+    """
+    order = np.argsort(-norm, kind="stable")
     if limit_results > 0:
-        results = results[:limit_results]
+        order = order[:limit_results]
+    return _snapshot_rows(snap, positions[order], raw[order], norm[order])
+
+
+def _snapshot_rows(
+    snap: ListingSnapshot,
+    positions: np.ndarray,
+    raw: np.ndarray,
+    norm: np.ndarray,
+) -> List[Dict[str, Any]]:
+    """Dicts de salida para filas del snapshot ya ordenadas."""
+    # Todo sale del snapshot: ninguna query a la BD
+    results: List[Dict[str, Any]] = []
+    for pos, raw_score, norm_score in zip(positions, raw, norm):
+        c = snap.record(int(pos))
+        r = _result_row(c, float(raw_score), snap.dealer_names.get(c.dealer_id))
+        score = float(norm_score)
+        r["score"] = score
+        r["score_100"] = int(round(score * 100))
+        results.append(r)
 
     return results
+
+
+# ============================================================
+#   RANKING COMPLETO: base de la paginación por cursor
+# ============================================================
+
+class RankedListings:
+    """
+    Ranking completo de un request sobre una versión del snapshot, sin
+    materializar dicts: solo arrays ordenados de mayor a menor score
+    (empates por id ascendente, el mismo orden que los demás motores).
+    """
+
+    def __init__(self, snap: ListingSnapshot, positions: np.ndarray, raw: np.ndarray, norm: np.ndarray):
+        order = np.argsort(-norm, kind="stable")
+        self.snap = snap
+        self.version = snap.version
+        self.positions = positions[order]
+        self.raw = raw[order]
+        self.norm = norm[order]
+        self.ids = snap.columns["id"][self.positions].astype(np.int64)
+        self._neg_norm = -self.norm
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def index_after(self, score: float, listing_id: int) -> int:
+        """
+        Índice del primer elemento que va después de (score, listing_id)
+        en el orden del ranking (búsqueda binaria, no recorre lo anterior).
+        """
+        lo = int(np.searchsorted(self._neg_norm, -score, side="left"))
+        hi = int(np.searchsorted(self._neg_norm, -score, side="right"))
+        # dentro del grupo de empate los ids van en orden ascendente
+        return lo + int(np.searchsorted(self.ids[lo:hi], listing_id, side="right"))
+
+    def page(self, start: int, size: int) -> List[Dict[str, Any]]:
+        end = len(self) if size <= 0 else start + size
+        return _snapshot_rows(
+            self.snap,
+            self.positions[start:end],
+            self.raw[start:end],
+            self.norm[start:end],
+        )
+
+
+def rank_all_listings(
+    db: Session,
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str] = None,
+) -> RankedListings:
+    """Ranking completo (todos los candidatos) sobre el snapshot vigente."""
+    snap = get_snapshot(db)
+    positions, raw, norm = _snapshot_scores(snap, filters, weights, body_style_preference)
+    return RankedListings(snap, positions, raw, norm)
+
+
+# ============================================================
+#   BATCH: muchos MatchRequest contra una sola pasada
+# ============================================================
+
+def _category_codes(snap: ListingSnapshot, name: str) -> Tuple[np.ndarray, List[Any]]:
+    """Códigos por valor distinto de una columna (todo None si no existe)."""
+    if name in snap.columns:
+        return snap.factorized(name)
+    return np.zeros(snap.size, dtype=np.int64), [None]
+
+
+def _flag_feature(snap: ListingSnapshot, name: str) -> np.ndarray:
+    if name not in snap.columns:
+        return np.zeros(snap.size)
+    return np.array([1.0 if v else 0.0 for v in snap.columns[name]])
+
+
+def rank_listings_batch(db: Session, requests: List[MatchRequest]) -> List[List[Dict[str, Any]]]:
+    """
+    Puntúa muchos MatchRequest contra el inventario en una sola pasada.
+
+    Las columnas se leen una vez del snapshot. Cada sub-score es afín en una
+    columna (precio, millas, año), un indicador (3ª fila, AWD) o un one-hot
+    de categoría (condition, body_style), así que con min/max calculados
+    sobre el subconjunto filtrado de cada request, todos los scores brutos
+    salen de un único producto de matrices: features (n x p) @ coef (p x R).
+
+    Los scores coinciden con rank_listings_with_ahp salvo redondeo de punto
+    flotante (el producto suma en otro orden).
+    """
+    if not requests:
+        return []
+
+    snap = get_snapshot(db)
+    n = snap.size
+
+    # --- Matriz de features, compartida por todos los requests ---
+    numeric = {}
+    missing = {}
+    for name in ("price", "miles", "year"):
+        values = snap.numeric(name) if name in snap.columns else np.full(n, np.nan)
+        missing[name] = np.isnan(values)
+        numeric[name] = np.where(missing[name], 0.0, values)
+
+    cond_codes, cond_categories = _category_codes(snap, "condition")
+    body_codes, body_categories = _category_codes(snap, "body_style")
+
+    blocks = [
+        np.ones(n),                              # 0: constante
+        numeric["price"], missing["price"],      # 1, 2
+        numeric["miles"], missing["miles"],      # 3, 4
+        numeric["year"], missing["year"],        # 5, 6
+        _flag_feature(snap, "has_third_row"),    # 7
+        _flag_feature(snap, "is_awd"),           # 8
+    ]
+    cond_offset = len(blocks)
+    body_offset = cond_offset + len(cond_categories)
+    n_features = body_offset + len(body_categories)
+
+    features = np.zeros((n, n_features))
+    for j, column in enumerate(blocks):
+        features[:, j] = column
+    features[np.arange(n), cond_offset + cond_codes] = 1.0
+    features[np.arange(n), body_offset + body_codes] = 1.0
+
+    # --- Coeficientes: una columna por request ---
+    masks = [_snapshot_mask(snap, req.filters) for req in requests]
+    coef = np.zeros((n_features, len(requests)))
+
+    for j, (req, mask) in enumerate(zip(requests, masks)):
+        w = _normalize_weights(req.weights)
+
+        for name, key, col, minimize in (
+            ("price", "price", 1, True),
+            ("miles", "mileage", 3, True),
+            ("year", "year", 5, False),
+        ):
+            present = mask & ~missing[name]
+            if not present.any():
+                coef[0, j] += w[key] * 0.5
+                continue
+            v_min = numeric[name][present].min()
+            v_max = numeric[name][present].max()
+            if v_max == v_min:
+                coef[0, j] += w[key] * 0.5
+                continue
+            d = v_max - v_min + EPS
+            if minimize:
+                # w * (v_max - v) / d
+                const, slope = w[key] * v_max / d, -w[key] / d
+            else:
+                # w * (v - v_min) / d
+                const, slope = -w[key] * v_min / d, w[key] / d
+            coef[0, j] += const
+            coef[col, j] = slope
+            # los None valen 0.5: anula la parte afín y suma w * 0.5
+            coef[col + 1, j] = w[key] * 0.5 - const
+
+        coef[7, j] = w["third_row"]
+        coef[8, j] = w["awd"]
+
+        conditions = req.filters.conditions
+        for k, value in enumerate(cond_categories):
+            if conditions:
+                coef[cond_offset + k, j] = w["condition"] * (1.0 if value in conditions else 0.0)
+            else:
+                coef[cond_offset + k, j] = w["condition"] * 0.5
+
+        pref = req.body_style_preference
+        for k, value in enumerate(body_categories):
+            if pref and value:
+                s_body = 1.0 if value.lower() == pref.lower() else 0.0
+            else:
+                s_body = 0.5
+            coef[body_offset + k, j] = w["body_style"] * s_body
+
+    raw_all = features @ coef
+
+    # --- Reescalado y top-K por request, sobre su subconjunto ---
+    responses: List[List[Dict[str, Any]]] = []
+    for j, (req, mask) in enumerate(zip(requests, masks)):
+        positions = np.flatnonzero(mask)
+        if len(positions) == 0:
+            responses.append([])
+            continue
+        raw = raw_all[positions, j]
+        responses.append(
+            _snapshot_results(snap, positions, raw, _rescale_array(raw), req.limit_results)
+        )
+
+    return responses
@@ -0,0 +1,170 @@
+"""
+Compilador de filtros duros para el motor jerárquico (matching.py).
+
+compile_filters() convierte un MatchFilters en un CompiledFilter una vez
+por request: los valores permitidos quedan normalizados en frozensets y
+los chequeos se ordenan por selectividad (el que más descarta, primero).
+Misma semántica que matching._passes_filters: un valor None en el
+listing nunca lo descarta.
+"""
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.schemas.listing import MatchFilters
+
+# Tamaño de la muestra para estimar la selectividad de cada chequeo
+SELECTIVITY_SAMPLE = 256
+
+# Orden por defecto si no hay muestra: marca/modelo/trim suelen ser los
+# más selectivos y los rangos numéricos los más baratos
+_STATIC_ORDER = ("make", "model", "trim", "drivetrain", "age_category", "min_year", "max_year", "rows")
+
+
+class _Check:
+    """Un chequeo individual: versión escalar y versión vectorizada."""
+
+    def __init__(self, name: str, test: Callable[[Any], bool], mask: Callable[[Any], np.ndarray]):
+        self.name = name
+        self.test = test
+        self.mask = mask
+
+
+def _membership(name: str, attr: str, allowed: frozenset, upper: bool = False) -> _Check:
+    if upper:
+        def test(l) -> bool:
+            v = getattr(l, attr)
+            return v is None or v.upper() in allowed
+    else:
+        def test(l) -> bool:
+            v = getattr(l, attr)
+            return v is None or v.lower() in allowed
+
+    def mask(snap) -> np.ndarray:
+        # una evaluación por valor distinto, luego indexado por código
+        codes, categories = snap.factorized(attr)
+        ok = np.array(
+            [
+                v is None or (v.upper() if upper else v.lower()) in allowed
+                for v in categories
+            ],
+            dtype=bool,
+        )
+        return ok[codes]
+
+    return _Check(name, test, mask)
+
+
+class CompiledFilter:
+    """
+    Predicado precompilado. `test(l)` evalúa un listing (o cualquier objeto
+    con los mismos atributos); `mask(snap)` evalúa todas las filas de un
+    ListingSnapshot de una vez.
+    """
+
+    def __init__(self, checks: List[_Check]):
+        self.checks = checks
+        tests = tuple(c.test for c in checks)
+
+        if not tests:
+            self.test: Callable[[Any], bool] = lambda l: True
+        elif len(tests) == 1:
+            self.test = tests[0]
+        else:
+            def test(l) -> bool:
+                for t in tests:
+                    if not t(l):
+                        return False
+                return True
+            self.test = test
+
+    @property
+    def order(self) -> Tuple[str, ...]:
+        return tuple(c.name for c in self.checks)
+
+    def filter(self, listings: Sequence[Any]) -> List[Any]:
+        test = self.test
+        return [l for l in listings if test(l)]
+
+    def mask(self, snap) -> np.ndarray:
+        result = np.ones(snap.size, dtype=bool)
+        for c in self.checks:
+            result &= c.mask(snap)
+        return result
+
+
+def _build_checks(filters: MatchFilters) -> List[_Check]:
+    checks: List[_Check] = []
+
+    # Edad: new/used/cpo
+    if filters.age_categories_allowed:
+        allowed = frozenset(x.lower() for x in filters.age_categories_allowed)
+        checks.append(_membership("age_category", "age_category", allowed))
+
+    # Año (el año no es opcional en ListingIn)
+    if filters.min_year is not None:
+        min_year = filters.min_year
+        checks.append(_Check(
+            "min_year",
+            lambda l: l.year >= min_year,
+            lambda snap: snap.numeric("year") >= min_year,
+        ))
+    if filters.max_year is not None:
+        max_year = filters.max_year
+        checks.append(_Check(
+            "max_year",
+            lambda l: l.year <= max_year,
+            lambda snap: snap.numeric("year") <= max_year,
+        ))
+
+    # Filas de asientos
+    if filters.required_rows is not None:
+        required = filters.required_rows
+
+        def rows_mask(snap) -> np.ndarray:
+            rows = snap.numeric("rows")
+            return np.isnan(rows) | (rows >= required)
+
+        checks.append(_Check(
+            "rows",
+            lambda l: l.rows is None or l.rows >= required,
+            rows_mask,
+        ))
+
+    # Tracción (AWD/4x4/etc.)
+    if filters.required_drivetrains:
+        allowed = frozenset(d.upper() for d in filters.required_drivetrains)
+        checks.append(_membership("drivetrain", "drivetrain", allowed, upper=True))
+
+    # Marca / modelo / trim
+    if filters.allowed_makes:
+        checks.append(_membership("make", "make", frozenset(m.lower() for m in filters.allowed_makes)))
+    if filters.allowed_models:
+        checks.append(_membership("model", "model", frozenset(m.lower() for m in filters.allowed_models)))
+    if filters.allowed_trims:
+        checks.append(_membership("trim", "trim", frozenset(t.lower() for t in filters.allowed_trims)))
+
+    return checks
+
+
+def compile_filters(filters: Optional[MatchFilters], sample: Optional[Sequence[Any]] = None) -> CompiledFilter:
+    """
+    Compila `filters` en un único predicado.
+    Si se pasa `sample` (p. ej. los listings a filtrar), la tasa de paso
+    de cada chequeo se estima sobre sus primeros SELECTIVITY_SAMPLE
+    elementos y los chequeos se ordenan de más a menos selectivo.
+    """
+    if filters is None:
+        return CompiledFilter([])
+
+    checks = _build_checks(filters)
+
+    if sample is not None and len(checks) > 1:
+        head = sample[:SELECTIVITY_SAMPLE]
+        rates = {c.name: sum(1 for l in head if c.test(l)) for c in checks}
+        checks.sort(key=lambda c: (rates[c.name], _STATIC_ORDER.index(c.name)))
+    else:
+        checks.sort(key=lambda c: _STATIC_ORDER.index(c.name))
+
+    return CompiledFilter(checks)
@@ -0,0 +1,223 @@
+"""
+Cache en disco de las páginas que descarga el scraper.
+
+Por URL se guarda el cuerpo, su sha256, ETag y Last-Modified, y los
+listings que salieron de parsearlo (como dicts de columnas). Con eso
+scraper.fetch_listings:
+
+- manda If-None-Match / If-Modified-Since, y con un 304 devuelve los
+  listings guardados sin descargar ni parsear la página;
+- si el servidor no valida pero el cuerpo llega idéntico (mismo hash),
+  tampoco vuelve a parsear;
+- en modo "offline" no sale a la red: responde solo desde el cache
+  (para tests y benchmarks reproducibles).
+
+Es un único archivo SQLite (SCRAPER_CACHE_PATH) con tope de tamaño
+(SCRAPER_CACHE_MAX_BYTES): al pasarlo se borran las entradas usadas
+hace más tiempo (LRU). SCRAPER_CACHE_MODE: "on", "off" u "offline".
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.query_metrics import counter_lines
+
+# subirlo cuando cambie lo que devuelven los parsers: invalida los
+# listings guardados (el cuerpo se conserva y se vuelve a parsear)
+PARSED_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    body BLOB NOT NULL,
+    parsed TEXT,
+    parsed_version INTEGER,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_pages_last_used ON pages (last_used);
+"""
+
+
+@dataclass
+class CachedPage:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    body: bytes
+    parsed: Optional[List[Dict[str, Any]]]  # None: hay que volver a parsear el cuerpo
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+# ---------------------------
+# Conexión
+# ---------------------------
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+
+# "revalidated" (304), "unchanged" (mismo hash), "offline", "miss", "stored", "evicted"
+_counts: Counter = Counter()
+
+
+def mode() -> str:
+    return (settings.SCRAPER_CACHE_MODE or "on").lower()
+
+
+def enabled() -> bool:
+    return mode() != "off" and bool(settings.SCRAPER_CACHE_PATH)
+
+
+def offline() -> bool:
+    return enabled() and mode() == "offline"
+
+
+def _connection() -> sqlite3.Connection:
+    """Conexión al archivo de SCRAPER_CACHE_PATH (se reabre si cambió). Llamar con _lock."""
+    global _conn, _conn_path
+    if _conn is None or _conn_path != settings.SCRAPER_CACHE_PATH:
+        if _conn is not None:
+            _conn.close()
+        _conn = sqlite3.connect(settings.SCRAPER_CACHE_PATH, check_same_thread=False)
+        _conn.executescript(_SCHEMA)
+        _conn_path = settings.SCRAPER_CACHE_PATH
+    return _conn
+
+
+def close() -> None:
+    global _conn, _conn_path
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+        _conn = _conn_path = None
+
+
+# ---------------------------
+# Lectura / escritura
+# ---------------------------
+
+def lookup(url: str) -> Optional[CachedPage]:
+    """Entrada de `url`, o None si no hay (o el cache está apagado)."""
+    if not enabled():
+        return None
+    with _lock:
+        row = _connection().execute(
+            "SELECT etag, last_modified, content_hash, body, parsed, parsed_version FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            _counts["miss"] += 1
+    if row is None:
+        return None
+    etag, last_modified, content_hash, body, parsed, parsed_version = row
+    return CachedPage(
+        url=url,
+        etag=etag,
+        last_modified=last_modified,
+        content_hash=content_hash,
+        body=body,
+        parsed=json.loads(parsed) if parsed is not None and parsed_version == PARSED_VERSION else None,
+    )
+
+
+def hit(page: CachedPage, kind: str) -> None:
+    """Marca la entrada como usada ahora (LRU) y cuenta el acierto."""
+    with _lock:
+        _counts[kind] += 1
+        conn = _connection()
+        conn.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), page.url))
+        conn.commit()
+
+
+def store(
+    url: str,
+    body: bytes,
+    content_hash: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    parsed: Optional[List[Dict[str, Any]]],
+) -> None:
+    """Guarda (o reemplaza) la página y sus listings; después aplica el tope de tamaño."""
+    if not enabled():
+        return
+    parsed_json = json.dumps(parsed) if parsed is not None else None
+    size = len(body) + len(parsed_json or "") + len(url)
+    if size > settings.SCRAPER_CACHE_MAX_BYTES:
+        return
+    with _lock:
+        conn = _connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO pages "
+            "(url, etag, last_modified, content_hash, body, parsed, parsed_version, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, content_hash, body, parsed_json, PARSED_VERSION, size, time.time()),
+        )
+        _counts["stored"] += 1
+        _evict(conn)
+        conn.commit()
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Borra las entradas menos usadas hasta quedar bajo SCRAPER_CACHE_MAX_BYTES. Llamar con _lock."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+    excess = total - settings.SCRAPER_CACHE_MAX_BYTES
+    if excess <= 0:
+        return
+    doomed = []
+    for url, size in conn.execute("SELECT url, size FROM pages ORDER BY last_used"):
+        doomed.append((url,))
+        excess -= size
+        if excess <= 0:
+            break
+    conn.executemany("DELETE FROM pages WHERE url = ?", doomed)
+    _counts["evicted"] += len(doomed)
+
+
+def clear() -> None:
+    if not enabled():
+        return
+    with _lock:
+        conn = _connection()
+        conn.execute("DELETE FROM pages")
+        conn.commit()
+
+
+def info() -> Dict[str, Any]:
+    """Entradas, bytes y contadores (aciertos por tipo, fallos, desalojos)."""
+    if not enabled():
+        return {"mode": "off"}
+    with _lock:
+        entries, size = _connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()
+        counts = dict(_counts)
+    return {"mode": mode(), "entries": entries, "bytes": size, **counts}
+
+
+def render() -> str:
+    """Contadores del cache en formato de texto de Prometheus."""
+    with _lock:
+        counts = sorted(_counts.items())
+    return "\n".join(counter_lines(
+        "scraper_cache_events_total",
+        "Consultas al cache del scraper por resultado (revalidated, unchanged, offline, miss, stored, evicted).",
+        [({"event": event}, n) for event, n in counts],
+    )) + "\n"
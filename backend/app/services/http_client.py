@@ -0,0 +1,217 @@
+"""
+Cliente HTTP compartido del scraper.
+
+Una sola requests.Session para todo el proceso: las conexiones quedan
+abiertas (keep-alive) y se reutilizan entre páginas del mismo host, en
+vez de un handshake TCP + TLS por URL. El pool de urllib3 tiene como
+mucho SCRAPER_PER_DOMAIN_CONCURRENCY conexiones por host y bloquea si se
+piden más (pool_block), así que el tope por dominio también vale para
+quien llame a get() fuera de scraper.scrape_urls.
+
+get() reintenta los errores de conexión, los 429 y los 5xx con backoff
+exponencial y jitter ("full jitter": espera al azar entre 0 y
+base * 2^intento), salvo que la respuesta traiga Retry-After, que manda.
+Ninguna espera pasa de SCRAPER_BACKOFF_MAX segundos.
+
+Por host se cuentan requests, reintentos y errores, y un histograma de
+latencia de cada intento; render() los da en formato Prometheus y
+GET /metrics los incluye.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+from app.core.config import settings
+from app.core.query_metrics import DURATION_BUCKETS, Histogram, counter_lines, histogram_lines
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# hosts distintos con pool de conexiones abierto a la vez
+POOL_HOSTS = 32
+
+
+# ---------------------------
+# Sesión compartida
+# ---------------------------
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _new_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=max(1, settings.SCRAPER_PER_DOMAIN_CONCURRENCY),
+        pool_block=True,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _new_session()
+    return _session
+
+
+def close() -> None:
+    """Cierra las conexiones abiertas (la próxima llamada crea otra sesión)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+# ---------------------------
+# Contadores por host
+# ---------------------------
+
+class HostStats:
+    __slots__ = ("requests", "retries", "errors", "latency")
+
+    def __init__(self):
+        self.requests = 0  # intentos, incluidos los reintentos
+        self.retries = 0
+        self.errors = 0    # intentos sin respuesta (conexión, timeout)
+        self.latency = Histogram(DURATION_BUCKETS)
+
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, HostStats] = {}
+
+
+def _record(host: str, seconds: float, error: bool = False, retry: bool = False) -> None:
+    with _stats_lock:
+        stats = _stats.get(host)
+        if stats is None:
+            stats = _stats[host] = HostStats()
+        stats.requests += 1
+        stats.errors += error
+        stats.retries += retry
+        stats.latency.observe(seconds)
+
+
+def host_stats() -> Dict[str, dict]:
+    """host -> requests, reintentos, errores y latencia media/total en segundos."""
+    with _stats_lock:
+        return {
+            host: {
+                "requests": s.requests,
+                "retries": s.retries,
+                "errors": s.errors,
+                "latency_sum": s.latency.sum,
+                "latency_avg": s.latency.sum / s.latency.total if s.latency.total else 0.0,
+            }
+            for host, s in _stats.items()
+        }
+
+
+def render() -> str:
+    """Contadores por host en formato de texto de Prometheus."""
+    with _stats_lock:
+        items = sorted((host, s.requests, s.retries, s.errors, s.latency.copy()) for host, s in _stats.items())
+
+    lines: List[str] = []
+    lines += histogram_lines(
+        "scraper_http_request_duration_seconds", "Latencia de cada intento del scraper, por host.",
+        [({"host": host}, latency) for host, _, _, _, latency in items],
+    )
+    lines += counter_lines(
+        "scraper_http_requests_total", "Intentos del scraper (incluye reintentos), por host.",
+        [({"host": host}, n) for host, n, _, _, _ in items],
+    )
+    lines += counter_lines(
+        "scraper_http_retries_total", "Reintentos del scraper (429, 5xx, conexión), por host.",
+        [({"host": host}, n) for host, _, n, _, _ in items],
+    )
+    lines += counter_lines(
+        "scraper_http_errors_total", "Intentos del scraper sin respuesta, por host.",
+        [({"host": host}, n) for host, _, _, n, _ in items],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+# ---------------------------
+# GET con reintentos
+# ---------------------------
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, settings.SCRAPER_BACKOFF_BASE * (2 ** attempt))
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    """Segundos pedidos en Retry-After (número o fecha HTTP); None si no viene o no se entiende."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def get(
+    url: str,
+    headers: Optional[Mapping[str, str]] = None,
+    timeout: Optional[float] = None,
+    max_retries: Optional[int] = None,
+) -> requests.Response:
+    """
+    GET por la sesión compartida, con reintentos. Devuelve la última
+    respuesta (puede ser un 429/5xx si se agotaron los reintentos) o
+    propaga el último error de conexión/timeout.
+    """
+    host = urlparse(url).netloc.lower()
+    timeout = settings.SCRAPER_TIMEOUT if timeout is None else timeout
+    max_retries = settings.SCRAPER_MAX_RETRIES if max_retries is None else max_retries
+    session = get_session()
+
+    attempt = 0
+    while True:
+        last = attempt >= max_retries
+        start = time.perf_counter()
+        try:
+            resp = session.get(url, headers=headers, timeout=timeout)
+        except (ConnectionError, Timeout):
+            _record(host, time.perf_counter() - start, error=True, retry=not last)
+            if last:
+                raise
+            delay = _backoff(attempt)
+        else:
+            retry = resp.status_code in RETRY_STATUSES and not last
+            _record(host, time.perf_counter() - start, retry=retry)
+            if not retry:
+                return resp
+            delay = _retry_after(resp)
+            if delay is None:
+                delay = _backoff(attempt)
+            resp.close()
+
+        time.sleep(min(delay, settings.SCRAPER_BACKOFF_MAX))
+        attempt += 1
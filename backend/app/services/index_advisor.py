@@ -0,0 +1,160 @@
+"""
+Asesor de índices (solo desarrollo, SQLite).
+
+Ejecuta las rutas de lectura con datos de muestra de la BD, captura el SQL
+que realmente emiten y corre EXPLAIN QUERY PLAN sobre cada sentencia.
+Marca los recorridos completos de tabla ("SCAN <tabla>" sin índice) y los
+ordenamientos en B-tree temporal.
+
+Nada se escribe: la sesión se revierte al terminar.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.dealer import Dealer
+from app.models.lead import Lead
+from app.models.listing import Listing
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services.ahp import rank_listings_with_ahp
+
+# "SCAN listings" a secas = recorrido completo; con "USING ... INDEX" va por índice
+_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+def _sample_ids(db: Session) -> Dict[str, Optional[int]]:
+    return {
+        "lead_id": db.query(Lead.id).order_by(Lead.id).limit(1).scalar(),
+        "dealer_id": db.query(Dealer.id).order_by(Dealer.id).limit(1).scalar(),
+    }
+
+
+def _scenarios(ids: Dict[str, Optional[int]]) -> List[Tuple[str, Callable[[Session], Any]]]:
+    """(ruta, llamada) de las rutas de lectura a analizar."""
+    # import local: las rutas importan servicios y no al revés
+    from app.api import routes_dealers, routes_leads, routes_listings
+
+    match_filters = MatchFilters(min_year=2015, max_price=30000, max_miles=80000)
+    weights = MatchWeights()
+
+    # las rutas async se reproducen ejecutando sus mismas sentencias en la sesión sync
+    scenarios: List[Tuple[str, Callable[[Session], Any]]] = [
+        ("GET /leads/admin", lambda db: db.execute(
+            routes_leads.lead_admin_rows_statement().offset(0).limit(20)
+        ).all()),
+        ("GET /leads/admin/summary", lambda db: routes_leads.get_leads_summary(db=db)),
+        ("GET /dealers/", lambda db: routes_dealers.list_dealers(db=db)),
+    ]
+    for engine in ("python", "numpy", "sql", "stream"):
+        scenarios.append((
+            f"POST /match/ (engine={engine})",
+            lambda db, engine=engine: rank_listings_with_ahp(
+                db, match_filters, weights, limit_results=20, engine=engine
+            ),
+        ))
+    scenarios.append((
+        "GET /listings/ (filtros, página 2)",
+        lambda db: db.execute(routes_listings.listing_page_statement(
+            ["id", "price", "miles", "year"], 100, after_id=100,
+            min_year=2015, max_price=30000, make="Toyota",
+        )).all(),
+    ))
+    scenarios.append((
+        "listings por (make, model, year)",
+        lambda db: db.query(Listing.id)
+        .filter(Listing.make == "Toyota", Listing.model == "RAV4", Listing.year >= 2018)
+        .all(),
+    ))
+    if ids["lead_id"] is not None:
+        lead_id = ids["lead_id"]
+        scenarios += [
+            ("GET /leads/{id}/detail", lambda db: db.execute(
+                routes_leads.lead_detail_statement(lead_id)
+            ).first()),
+            ("GET /leads/{id}/events", lambda db: routes_leads.get_lead_events(lead_id=lead_id, db=db)),
+        ]
+    if ids["dealer_id"] is not None:
+        dealer_id = ids["dealer_id"]
+        scenarios.append((
+            "GET /leads/dealer/{id}",
+            lambda db: routes_leads.get_dealer_leads(dealer_id=dealer_id, db=db),
+        ))
+    return scenarios
+
+
+def _capture(db: Session, call: Callable[[Session], Any]) -> Tuple[List[Tuple[str, Any]], Optional[str]]:
+    """
+    Ejecuta `call` y devuelve las sentencias (sql, params) emitidas y el
+    error, si la ruta falló (lo capturado hasta ese punto sigue sirviendo).
+    """
+    conn = db.connection()
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    error = None
+    try:
+        call(db)
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)
+    return statements, error
+
+
+def explain(db: Session, statement: str, parameters: Any = ()) -> Dict[str, Any]:
+    """Plan de una sentencia y sus problemas detectados."""
+    rows = db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    plan = [r[-1] for r in rows]
+
+    full_scans = []
+    temp_sorts = 0
+    for detail in plan:
+        m = _FULL_SCAN.match(detail)
+        # subqueries y CTEs también aparecen como "SCAN <alias>": solo cuentan tablas
+        if m and m.group(1) in Base.metadata.tables:
+            full_scans.append(m.group(1))
+        if detail.startswith("USE TEMP B-TREE"):
+            temp_sorts += 1
+
+    return {
+        "sql": statement,
+        "plan": plan,
+        "full_scans": full_scans,
+        "temp_sorts": temp_sorts,
+    }
+
+
+def advise(db: Session) -> Dict[str, Any]:
+    """
+    Informe por ruta: cada sentencia distinta con su plan. `flagged` lista
+    las rutas con algún recorrido completo de tabla.
+    """
+    if db.bind.dialect.name != "sqlite":
+        raise ValueError("El asesor de índices solo soporta SQLite")
+
+    report: Dict[str, Dict[str, Any]] = {}
+    flagged: List[str] = []
+    try:
+        for route, call in _scenarios(_sample_ids(db)):
+            statements, error = _capture(db, call)
+            seen = set()
+            entries = []
+            for statement, parameters in statements:
+                if statement in seen:
+                    continue
+                seen.add(statement)
+                entries.append(explain(db, statement, parameters))
+            report[route] = {"error": error, "queries": entries}
+            if any(e["full_scans"] for e in entries):
+                flagged.append(route)
+    finally:
+        db.rollback()
+
+    return {"flagged": flagged, "routes": report}
@@ -0,0 +1,139 @@
+"""
+Parser JSON incremental para bodies grandes.
+
+Lee un objeto JSON de nivel superior a medida que llegan los chunks del
+request y entrega uno a uno los elementos de un array concreto (p. ej.
+"listings") sin construir antes el árbol completo ni guardar todo el
+texto: lo ya consumido se descarta del buffer.
+
+Solo usa json.JSONDecoder.raw_decode de la librería estándar.
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Callable, Dict
+
+
+class BodyTooLarge(Exception):
+    """El body superó el límite de bytes configurado."""
+
+
+class StreamJSONError(ValueError):
+    """El body no es un objeto JSON válido."""
+
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    def __init__(self, chunks: AsyncIterator[bytes], max_bytes: int):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.buf = ""
+        self.pos = 0
+        self.ended = False
+
+    async def _fill(self) -> bool:
+        """Lee otro chunk. False si el stream terminó."""
+        if self.ended:
+            return False
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.ended = True
+            self.buf += self._decoder.decode(b"", final=True)
+            return False
+        self.received += len(chunk)
+        if self.received > self.max_bytes:
+            raise BodyTooLarge(self.received)
+        # descartar lo ya consumido antes de crecer el buffer
+        self.buf = self.buf[self.pos:] + self._decoder.decode(chunk)
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """Siguiente carácter que no sea espacio ('' al final)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not await self._fill():
+                return ""
+
+    async def expect(self, ch: str) -> None:
+        if await self.peek() != ch:
+            raise StreamJSONError(f"se esperaba {ch!r} en la posición {self.received}")
+        self.pos += 1
+
+    async def value(self) -> Any:
+        """Decodifica el siguiente valor JSON completo."""
+        await self.peek()
+        while True:
+            try:
+                obj, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                if not await self._fill():
+                    raise StreamJSONError(str(exc)) from exc
+                continue
+            # un número al final del buffer puede estar cortado: pedir más
+            if end == len(self.buf) and not self.ended:
+                if await self._fill():
+                    continue
+            self.pos = end
+            return obj
+
+
+async def parse_object_stream(
+    chunks: AsyncIterator[bytes],
+    array_key: str,
+    on_item: Callable[[Any], None],
+    max_bytes: int,
+) -> Dict[str, Any]:
+    """
+    Parsea un objeto JSON desde `chunks`. Cada elemento de `array_key`
+    se entrega a `on_item` apenas se decodifica; el resto de claves se
+    devuelven en un dict.
+    """
+    reader = _Reader(chunks, max_bytes)
+    rest: Dict[str, Any] = {}
+
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        reader.pos += 1
+    else:
+        while True:
+            key = await reader.value()
+            if not isinstance(key, str):
+                raise StreamJSONError("las claves del objeto deben ser strings")
+            await reader.expect(":")
+
+            if key == array_key and await reader.peek() == "[":
+                reader.pos += 1
+                if await reader.peek() == "]":
+                    reader.pos += 1
+                else:
+                    while True:
+                        on_item(await reader.value())
+                        ch = await reader.peek()
+                        reader.pos += 1
+                        if ch == "]":
+                            break
+                        if ch != ",":
+                            raise StreamJSONError(f"se esperaba ',' o ']' en {array_key!r}")
+            else:
+                rest[key] = await reader.value()
+
+            ch = await reader.peek()
+            reader.pos += 1
+            if ch == "}":
+                break
+            if ch != ",":
+                raise StreamJSONError("se esperaba ',' o '}'")
+
+    if await reader.peek() != "":
+        raise StreamJSONError("contenido extra después del objeto JSON")
+    return rest
@@ -0,0 +1,219 @@
+"""
+Ingesta de listings: inserción en bloque e importación idempotente.
+
+Cada aviso importado lleva un source_fingerprint estable: un hash del
+dominio de origen más, por orden de preferencia, la URL del aviso, el
+VIN o (si no hay nada mejor) make/model/year/miles. upsert_listings usa
+esa huella para que reimportar la misma página no duplique el
+inventario: inserta los avisos nuevos, actualiza los que cambiaron y no
+toca los iguales.
+
+bulk_insert_listings escribe muchas filas con un INSERT ... RETURNING id
+por lote, sin objetos ORM ni un SELECT de refresh por fila; lo usan
+upsert_listings y los scripts de seed.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse, urlunparse
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.listing import Listing
+from app.services import listing_snapshot
+
+# Columnas que no son datos del aviso: no cuentan para "cambió" ni se
+# pisan al actualizar (dealer_id lo asigna un admin, no el scraper)
+_NOT_DATA = {"id", "dealer_id", "source_fingerprint"}
+DATA_FIELDS = [c.key for c in Listing.__table__.columns if c.key not in _NOT_DATA]
+
+# huellas por SELECT ... IN (...) (bajo el tope de parámetros de SQLite)
+LOOKUP_CHUNK = 500
+
+# columnas que escribe bulk_insert_listings (el id lo pone la BD)
+INSERT_COLUMNS = [c.key for c in Listing.__table__.columns if c.key != "id"]
+
+
+@dataclass
+class IngestResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    # todos los listings de la importación (nuevos, actualizados e iguales),
+    # ya con id, en el orden de entrada y sin repetidos. Los nuevos no
+    # quedan en la Session (se insertan con bulk_insert_listings)
+    listings: List[Listing] = field(default_factory=list)
+
+
+# ---------------------------
+# Inserción en bloque
+# ---------------------------
+
+def listing_row(listing: Listing) -> Dict[str, Any]:
+    """Valores de un Listing (no persistido) como fila para bulk_insert_listings."""
+    return {name: getattr(listing, name) for name in INSERT_COLUMNS}
+
+
+def bulk_insert_listings(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserta filas de listings (dicts columna -> valor; las columnas que
+    falten quedan en NULL) con insert().returning(id): SQLAlchemy las manda
+    como INSERT ... VALUES (...), (...) RETURNING id por lotes, y devuelve
+    los ids en el orden de `rows`. Sin objetos ORM ni refresh por fila.
+    Las filas no deben traer id.
+
+    No hace commit: las filas entran en la transacción de `db`. Como un
+    insert de Core no pasa por los eventos de la Session, las filas se
+    registran en el snapshot (listing_snapshot.record_inserts), que las
+    suma al hacer commit.
+    """
+    if not rows:
+        return []
+    values = [{name: row.get(name) for name in INSERT_COLUMNS} for row in rows]
+    table = Listing.__table__
+    # SQLite no tiene columna centinela implícita: con sort_by_parameter_order
+    # SQLAlchemy mandaría un INSERT por fila. Sin él van en lotes, y basta
+    # ordenar los ids: dentro de la transacción (que tiene el lock de
+    # escritura) SQLite asigna max(id) + 1 a cada fila en el orden de VALUES.
+    ordered = db.get_bind().dialect.name != "sqlite"
+    ids = db.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=ordered),
+        values,
+    ).scalars().all()
+    if not ordered:
+        ids = sorted(ids)
+    for row, listing_id in zip(values, ids):
+        row["id"] = listing_id
+    listing_snapshot.record_inserts(db, values)
+    return list(ids)
+
+
+# ---------------------------
+# Huella de origen
+# ---------------------------
+
+def _normalize_url(url: str) -> str:
+    """Sin query ni fragmento, host en minúsculas y sin www., sin / final."""
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    return urlunparse(("", host, parsed.path.rstrip("/"), "", "", ""))
+
+
+def fingerprint(listing: Listing) -> Optional[str]:
+    """
+    Huella de origen del aviso, o None si no tiene source_domain (no vino
+    del scraper). La URL va antes que el VIN porque la página de
+    resultados solo trae el link al detalle y el detalle trae los dos:
+    así el mismo aviso da la misma huella desde ambas páginas.
+    """
+    domain = (listing.source_domain or "").lower()
+    if not domain:
+        return None
+    if listing.source_url:
+        key = f"url|{_normalize_url(listing.source_url)}"
+    elif listing.vin:
+        key = f"vin|{listing.vin.strip().upper()}"
+    else:
+        values = (listing.make, listing.model, listing.year, listing.miles)
+        key = "attrs|" + "|".join(str(v).strip().lower() if v is not None else "" for v in values)
+    return hashlib.sha1(f"{domain}|{key}".encode("utf-8")).hexdigest()
+
+
+# ---------------------------
+# Upsert
+# ---------------------------
+
+def _existing_by_fingerprint(db: Session, fingerprints: List[str]) -> Dict[str, Listing]:
+    found: Dict[str, Listing] = {}
+    for start in range(0, len(fingerprints), LOOKUP_CHUNK):
+        chunk = fingerprints[start:start + LOOKUP_CHUNK]
+        for listing in db.scalars(select(Listing).where(Listing.source_fingerprint.in_(chunk))):
+            found[listing.source_fingerprint] = listing
+    return found
+
+
+def _merge(target: Listing, incoming: Listing) -> bool:
+    """
+    Copia a `target` los datos de `incoming` que cambiaron. Los None del
+    scraper no borran datos: si el aviso se completó por otro lado, se
+    conserva. Devuelve si hubo algún cambio.
+    """
+    changed = False
+    for name in DATA_FIELDS:
+        value = getattr(incoming, name)
+        if value is not None and getattr(target, name) != value:
+            setattr(target, name, value)
+            changed = True
+    return changed
+
+
+def _upsert(db: Session, listings: List[Listing]) -> IngestResult:
+    result = IngestResult()
+
+    # huella -> primer listing con esa huella en la importación; los
+    # repetidos (p.ej. el mismo aviso en resultados y en detalle) se le
+    # fusionan. Sin huella (no vienen del scraper) = siempre nuevos.
+    incoming: Dict[str, Listing] = {}
+    for listing in listings:
+        listing.source_fingerprint = listing.source_fingerprint or fingerprint(listing)
+        fp = listing.source_fingerprint
+        if fp is not None:
+            if fp in incoming:
+                _merge(incoming[fp], listing)
+            else:
+                incoming[fp] = listing
+
+    existing = _existing_by_fingerprint(db, list(incoming))
+    stored: Dict[str, Listing] = {}
+    new: List[Listing] = [l for l in listings if l.source_fingerprint is None]
+    for fp, listing in incoming.items():
+        current = existing.get(fp)
+        if current is None:
+            new.append(listing)
+            stored[fp] = listing
+            continue
+        if _merge(current, listing):
+            result.updated += 1
+        else:
+            result.unchanged += 1
+        stored[fp] = current
+
+    for listing, listing_id in zip(new, bulk_insert_listings(db, [listing_row(l) for l in new])):
+        listing.id = listing_id
+    db.commit()
+    result.inserted = len(new)
+
+    # el commit expiró los existentes: se recargan todos en un SELECT por
+    # lote en vez de uno por fila al leerlos
+    reused = [fp for fp, listing in stored.items() if listing is existing.get(fp)]
+    _existing_by_fingerprint(db, reused)
+
+    seen = set()
+    for listing in listings:
+        target = listing if listing.source_fingerprint is None else stored[listing.source_fingerprint]
+        if id(target) not in seen:
+            seen.add(id(target))
+            result.listings.append(target)
+    return result
+
+
+def upsert_listings(db: Session, listings: List[Listing]) -> IngestResult:
+    """
+    Guarda listings importados en una transacción: inserta los de huella
+    nueva, actualiza los que ya existían si algún dato cambió y cuenta
+    los iguales. Si otra importación insertó la misma huella en paralelo
+    (choque con el índice único), se reintenta una vez: la segunda pasada
+    ya los encuentra y los trata como existentes.
+    """
+    if not listings:
+        return IngestResult()
+    try:
+        return _upsert(db, listings)
+    except IntegrityError:
+        db.rollback()
+        return _upsert(db, listings)
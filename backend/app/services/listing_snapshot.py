@@ -0,0 +1,246 @@
+"""
+Snapshot en memoria de la tabla listings, orientado a lectura.
+
+Guarda cada columna como un array (más un mapa dealer_id -> nombre) para
+que /match no tenga que recargar la tabla en cada request.
+
+Se mantiene al día con eventos de la Session de SQLAlchemy: cualquier
+commit que inserte, modifique o borre Listing/Dealer incrementa un contador
+de versión monotónico. Los inserts puros se añaden al snapshot (patch);
+updates y deletes lo invalidan y se reconstruye en la siguiente lectura.
+
+Los inserts en bloque con insert() de Core no disparan esos eventos: se
+registran con record_inserts() (ver listing_ingest.bulk_insert_listings).
+
+Ojo: el snapshot es por proceso. Escrituras hechas por otro proceso
+(otro worker de uvicorn, scripts de seed) no se ven hasta llamar a
+invalidate() o reiniciar.
+"""
+
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.dealer import Dealer
+from app.models.listing import Listing
+from app.schemas.listing import ListingIn
+
+# Columnas de la tabla, en orden
+LISTING_COLUMNS: List[str] = [c.key for c in Listing.__table__.columns]
+
+
+class ListingSnapshot:
+    """
+    Vista inmutable de la tabla listings en una versión dada.
+    `columns` tiene un array object por columna (valores Python tal cual)
+    ordenados por id; `numeric(name)` devuelve la versión float64 (None -> NaN).
+    """
+
+    def __init__(self, version: int, columns: Dict[str, np.ndarray], dealer_names: Dict[int, str]):
+        self.version = version
+        self.columns = columns
+        self.dealer_names = dealer_names
+        self.size = len(columns["id"])
+        self.built_at = datetime.utcnow()
+        self._numeric: Dict[str, np.ndarray] = {}
+        self._factorized: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+        self._listing_ins: Optional[List[ListingIn]] = None
+
+    def numeric(self, name: str) -> np.ndarray:
+        arr = self._numeric.get(name)
+        if arr is None:
+            arr = np.array(
+                [np.nan if v is None else v for v in self.columns[name]], dtype=np.float64
+            )
+            self._numeric[name] = arr
+        return arr
+
+    def factorized(self, name: str) -> Tuple[np.ndarray, List[Any]]:
+        """
+        (codes, categories) de una columna: categories[codes[i]] es el valor
+        de la fila i. Sirve para evaluar una condición una vez por valor distinto.
+        """
+        cached = self._factorized.get(name)
+        if cached is None:
+            index: Dict[Any, int] = {}
+            codes = np.fromiter(
+                (index.setdefault(v, len(index)) for v in self.columns[name]),
+                dtype=np.int64,
+                count=self.size,
+            )
+            cached = (codes, list(index))
+            self._factorized[name] = cached
+        return cached
+
+    def record(self, pos: int) -> SimpleNamespace:
+        """Fila `pos` como objeto con atributos (igual que un Listing)."""
+        return SimpleNamespace(**{name: self.columns[name][pos] for name in LISTING_COLUMNS})
+
+    def listing_ins(self) -> List[ListingIn]:
+        """Todas las filas como ListingIn (se construyen una vez por versión)."""
+        if self._listing_ins is None:
+            self._listing_ins = [to_listing_in(self.record(i)) for i in range(self.size)]
+        return self._listing_ins
+
+    def appended(self, version: int, rows: List[Dict[str, Any]], dealer_names: Dict[int, str]) -> "ListingSnapshot":
+        """
+        Nuevo snapshot con `rows` añadidas al final (no modifica este). Las
+        filas cuyo id ya está se saltean: un _build que corrió entre el
+        COMMIT en la BD y su after_commit ya las leyó.
+        """
+        if rows:
+            present = np.isin([r["id"] for r in rows], self.columns["id"].astype(np.int64))
+            rows = [r for r, seen in zip(rows, present) if not seen]
+        rows = sorted(rows, key=lambda r: r["id"])
+        columns = {
+            name: np.concatenate([self.columns[name], _object_array([r[name] for r in rows])])
+            for name in LISTING_COLUMNS
+        }
+        names = dict(self.dealer_names)
+        names.update(dealer_names)
+        return ListingSnapshot(version, columns, names)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "rows": self.size,
+            "dealers": len(self.dealer_names),
+            "built_at": self.built_at,
+        }
+
+
+def _object_array(values: List[Any]) -> np.ndarray:
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def to_listing_in(row: Any) -> ListingIn:
+    data = {name: getattr(row, name) for name in ListingIn.model_fields if name not in ("id", "extra")}
+    return ListingIn(id=str(row.id), extra=None, **data)
+
+
+# ---------------------------
+# Estado del proceso
+# ---------------------------
+
+_lock = threading.Lock()
+_version = 0
+_snapshot: Optional[ListingSnapshot] = None
+
+
+def current_version() -> int:
+    """Versión actual de la tabla listings (cambia con cada escritura)."""
+    return _version
+
+
+def _build(db: Session, version: int) -> ListingSnapshot:
+    rows = (
+        db.query(*Listing.__table__.columns)
+        .order_by(Listing.id)
+        .all()
+    )
+    columns = {
+        name: _object_array([r[i] for r in rows])
+        for i, name in enumerate(LISTING_COLUMNS)
+    }
+    dealer_names = {dealer_id: name for dealer_id, name in db.query(Dealer.id, Dealer.name).all()}
+    return ListingSnapshot(version, columns, dealer_names)
+
+
+def get_snapshot(db: Session) -> ListingSnapshot:
+    """
+    Devuelve el snapshot vigente, reconstruyéndolo si alguna escritura
+    lo dejó desactualizado.
+    """
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and snap.version == _version:
+        return snap
+
+    with _lock:
+        snap = _snapshot
+        if snap is None or snap.version != _version:
+            # la versión se lee antes de consultar: si entra otra escritura
+            # mientras tanto, el siguiente get_snapshot vuelve a reconstruir.
+            # Un writer que ya hizo COMMIT pero cuyo after_commit espera el
+            # lock puede quedar incluido en este build con la versión vieja;
+            # al aplicarlo, appended() no vuelve a sumar esas filas.
+            snap = _build(db, _version)
+            _snapshot = snap
+        return snap
+
+
+def invalidate() -> None:
+    """Marca el snapshot como desactualizado (p. ej. tras escrituras en bloque)."""
+    global _version
+    with _lock:
+        _version += 1
+
+
+def _apply_commit(inserted: List[Dict[str, Any]], dealers: Dict[int, str], changed: bool) -> None:
+    global _version, _snapshot
+    with _lock:
+        snap = _snapshot
+        up_to_date = snap is not None and snap.version == _version
+        _version += 1
+        if up_to_date and not changed:
+            _snapshot = snap.appended(_version, inserted, dealers)
+
+
+# ---------------------------
+# Eventos de escritura
+# ---------------------------
+
+_PENDING_KEY = "listing_snapshot_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_writes(session: Session, flush_context) -> None:
+    # En after_flush las colecciones new/dirty/deleted aún reflejan el flush
+    # y los objetos nuevos ya tienen id: se copian sus valores aquí porque
+    # en after_commit ya están expirados.
+    pending = session.info.get(_PENDING_KEY)
+    for obj in session.new:
+        if isinstance(obj, Listing):
+            pending = pending or session.info.setdefault(_PENDING_KEY, _new_pending())
+            pending["inserted"].append({name: getattr(obj, name) for name in LISTING_COLUMNS})
+        elif isinstance(obj, Dealer):
+            pending = pending or session.info.setdefault(_PENDING_KEY, _new_pending())
+            pending["dealers"][obj.id] = obj.name
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Listing, Dealer)):
+            pending = pending or session.info.setdefault(_PENDING_KEY, _new_pending())
+            pending["changed"] = True
+
+
+def _new_pending() -> Dict[str, Any]:
+    return {"inserted": [], "dealers": {}, "changed": False}
+
+
+def record_inserts(session: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Registra filas insertadas por fuera del ORM (insert() de Core, que no
+    pasa por after_flush) en la transacción de `session`: al hacer commit
+    se añaden al snapshot como cualquier insert; con rollback se descartan.
+    Cada fila necesita el id y puede omitir columnas (quedan en None).
+    """
+    pending = session.info.setdefault(_PENDING_KEY, _new_pending())
+    pending["inserted"].extend({name: row.get(name) for name in LISTING_COLUMNS} for row in rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _on_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        _apply_commit(pending["inserted"], pending["dealers"], pending["changed"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _on_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,145 @@
+"""
+Cache de resultados de /match/.
+
+La clave es un hash canónico de (filters, weights, body_style_preference,
+limit_results); cada entrada guarda la versión de la tabla listings con la
+que se calculó (listing_snapshot.current_version()) y se borra cuando esa
+versión cambia. LRU con tamaño máximo y TTL.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services.listing_snapshot import current_version
+
+
+def match_cache_key(
+    filters: MatchFilters,
+    weights: MatchWeights,
+    body_style_preference: Optional[str],
+    limit_results: int,
+) -> str:
+    """
+    Hash canónico de un request: el orden de las claves y de la lista de
+    conditions no importa, y la preferencia de carrocería se compara sin
+    mayúsculas (igual que en el scoring).
+    """
+    f = filters.model_dump()
+    if f.get("conditions"):
+        f["conditions"] = sorted(set(f["conditions"]))
+    payload = {
+        "filters": f,
+        "weights": weights.model_dump(),
+        "body_style_preference": body_style_preference.lower() if body_style_preference else None,
+        "limit_results": max(limit_results, 0),
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MatchCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[int, float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # versión contra la que se barrieron las entradas por última vez
+        self._swept_version: Optional[int] = None
+
+    def _drop_stale(self, version: int) -> None:
+        """
+        Borra todas las entradas de otra versión (no solo la que se consulta):
+        si no, siguen ocupando memoria hasta salir por LRU, y en ranking_cache
+        cada una retiene un ListingSnapshot viejo completo. Llamar con _lock.
+        """
+        if version == self._swept_version:
+            return
+        stale = [key for key, (entry_version, _, _) in self._entries.items() if entry_version != version]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        self._swept_version = version
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        version = current_version()
+        now = time.monotonic()
+        with self._lock:
+            self._drop_stale(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                _, stored_at, results = entry
+                if now - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return results
+            self.misses += 1
+            return None
+
+    def put(self, key: str, version: int, results: List[Dict[str, Any]]) -> None:
+        if self.max_entries <= 0:
+            return
+        current = current_version()
+        with self._lock:
+            self._drop_stale(current)
+            if version != current:
+                # entró una escritura mientras se calculaba: ya no sirve
+                self.invalidations += 1
+                return
+            self._entries[key] = (version, time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        # la versión se toma antes de calcular: si entra una escritura
+        # mientras tanto, put() no la guarda
+        version = current_version()
+        results = compute()
+        self.put(key, version, results)
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._swept_version = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "listings_version": current_version(),
+        }
+
+
+match_cache = MatchCache(
+    max_entries=settings.MATCH_CACHE_SIZE,
+    ttl_seconds=settings.MATCH_CACHE_TTL,
+)
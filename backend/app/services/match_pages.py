@@ -0,0 +1,123 @@
+"""
+Paginación por cursor (keyset) de /match/.
+
+El cursor es opaco para el cliente: base64url de un JSON con la versión de
+la tabla listings, un prefijo del hash del request y el último
+(score, listing_id) entregado. La página siguiente retoma justo después de
+ese par con una búsqueda binaria sobre el ranking completo, que se calcula
+una vez por (request, versión) y se guarda un rato en ranking_cache. La
+primera página sale de ese mismo ranking.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.schemas.match import MatchRequest
+from app.services.ahp import RankedListings, rank_all_listings
+from app.services.listing_snapshot import current_version
+from app.services.match_cache import MatchCache, match_cache_key
+
+# Caracteres del hash del request que viajan en el cursor
+_CURSOR_KEY_CHARS = 16
+
+
+class InvalidCursor(ValueError):
+    """El cursor está mal formado o no corresponde a este request."""
+
+
+class StaleCursor(Exception):
+    """Los listings cambiaron desde que se emitió el cursor."""
+
+
+# Rankings completos (RankedListings) por hash del request sin límite
+ranking_cache = MatchCache(
+    max_entries=settings.MATCH_PAGE_CACHE_SIZE,
+    ttl_seconds=settings.MATCH_PAGE_TTL,
+)
+
+
+def ranking_key(req: MatchRequest) -> str:
+    """Hash del request sin limit_results: todas sus páginas lo comparten."""
+    return match_cache_key(req.filters, req.weights, req.body_style_preference, 0)
+
+
+def encode_cursor(key: str, version: int, score: float, listing_id: int) -> str:
+    payload = {"v": version, "k": key[:_CURSOR_KEY_CHARS], "s": score, "id": listing_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {
+            "v": int(data["v"]),
+            "k": str(data["k"]),
+            "s": float(data["s"]),
+            "id": int(data["id"]),
+        }
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError):
+        raise InvalidCursor("cursor inválido")
+
+
+def first_page(db: Session, req: MatchRequest) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Primera página (de tamaño req.limit_results; <= 0 = todo) y su cursor.
+    Sale del mismo ranking que usa next_page: así las páginas siguientes
+    retoman sobre el mismo orden y no repiten ni saltan empates.
+    """
+    ranked = _ranking(db, req)
+    return _page(ranked, ranking_key(req), 0, req.limit_results)
+
+
+def next_page(db: Session, req: MatchRequest) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Página que sigue a req.cursor (de tamaño req.limit_results; <= 0 = el
+    resto). Devuelve (results, next_cursor).
+    """
+    data = decode_cursor(req.cursor)
+    key = ranking_key(req)
+    if data["k"] != key[:_CURSOR_KEY_CHARS]:
+        raise InvalidCursor("el cursor no corresponde a estos filtros/pesos")
+    if data["v"] != current_version():
+        raise StaleCursor()
+
+    ranked = _ranking(db, req)
+    if ranked.version != data["v"]:
+        # entró una escritura entre el chequeo y el cálculo
+        raise StaleCursor()
+
+    start = ranked.index_after(data["s"], data["id"])
+    return _page(ranked, key, start, req.limit_results)
+
+
+def _ranking(db: Session, req: MatchRequest) -> RankedListings:
+    return ranking_cache.get_or_compute(
+        ranking_key(req),
+        lambda: rank_all_listings(
+            db=db,
+            filters=req.filters,
+            weights=req.weights,
+            body_style_preference=req.body_style_preference,
+        ),
+    )
+
+
+def _page(
+    ranked: RankedListings,
+    key: str,
+    start: int,
+    size: int,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    results = ranked.page(start, size)
+    next_cursor = None
+    if size > 0 and start + size < len(ranked):
+        last = results[-1]
+        next_cursor = encode_cursor(key, ranked.version, last["score"], last["listing_id"])
+    return results, next_cursor
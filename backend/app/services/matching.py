@@ -1,5 +1,17 @@
-from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.models.listing import Listing
 from app.schemas.listing import ListingIn, ListingWithScore, MatchFilters
+from app.services.filter_compiler import compile_filters
+from app.services.listing_snapshot import ListingSnapshot, get_snapshot, to_listing_in
+from app.services.parallel_scoring import Shard, map_shards, parallel_enabled, split
+from app.services.topk import STREAM_BATCH_SIZE, TopK, record_stream_run
 
 # Grupos y subcriterios (AHP jerárquico)
 CRITERIA_STRUCTURE = {
@@ -127,7 +139,9 @@ def _passes_filters(l: ListingIn, filters: MatchFilters | None) -> bool:
 
 
 def _filter_listings(listings: List[ListingIn], filters: MatchFilters | None) -> List[ListingIn]:
-    return [l for l in listings if _passes_filters(l, filters)]
+    # Equivalente a aplicar _passes_filters a cada listing, con el filtro
+    # compilado una sola vez
+    return compile_filters(filters, sample=listings).filter(listings)
 
 
 # ---------------------------
@@ -238,143 +252,510 @@ def _score_drivetrain_snow(l: ListingIn) -> float:
 # Motor principal
 # ---------------------------
 
+# Subcriterios en orden fijo (filas de la matriz del plan de pesos)
+SUBCRITERIA: Tuple[str, ...] = tuple(sub for subs in CRITERIA_STRUCTURE.values() for sub in subs)
+
+
+@dataclass(frozen=True)
+class WeightPlan:
+    """
+    Pesos ya resueltos para un vector de importancias. Inmutable y hashable.
+
+    `matrix` (len(SUBCRITERIA) x (grupos + 1)) tiene en cada columna de
+    grupo el peso global de sus subcriterios y en la última todos los pesos,
+    así que sub_scores @ matrix da las contribuciones por grupo y el total.
+    """
+
+    weights_groups: Tuple[Tuple[str, float], ...]
+    weights_sub_global: Tuple[Tuple[str, float], ...]
+    matrix: np.ndarray = field(compare=False, hash=False, repr=False)
+
+    @property
+    def groups(self) -> Tuple[str, ...]:
+        return tuple(CRITERIA_STRUCTURE.keys())
+
+    @property
+    def total_weights(self) -> np.ndarray:
+        return self.matrix[:, -1]
+
+
+def _importance_key(
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+) -> Tuple[tuple, tuple]:
+    """
+    Completa las importancias con los valores por defecto (sin modificar
+    los dicts del caller) y las devuelve como tuplas canónicas.
+    """
+    main = dict(criteria_importance_main or _default_main_importance())
+    # Asegurar que tengamos clave para cada grupo definido
+    for g in CRITERIA_STRUCTURE.keys():
+        main.setdefault(g, 3)  # importancia media por defecto
+    extra = sorted(k for k in main if k not in CRITERIA_STRUCTURE)
+    main_key = tuple((g, main[g]) for g in list(CRITERIA_STRUCTURE.keys()) + extra)
+
+    # Importancias de subcriterios: lo que falte sale de los defaults
+    user_sub = criteria_importance_sub or {}
+    default_sub = _default_sub_importance()
+    sub_key = []
+    for group, sub_list in CRITERIA_STRUCTURE.items():
+        merged = dict(default_sub[group])
+        if user_sub:
+            merged.update(user_sub.get(group, {}))
+        sub_key.append((group, tuple((sub, merged.get(sub, 3)) for sub in sub_list)))
+
+    return main_key, tuple(sub_key)
+
+
+@lru_cache(maxsize=256)
+def _build_weight_plan(main_key: tuple, sub_key: tuple) -> WeightPlan:
+    weights_groups = _normalize(dict(main_key))
+
+    # Pesos globales por subcriterio = peso_grupo * peso_sub_local
+    weights_sub_global: Dict[str, float] = {}
+    for group, subs in sub_key:
+        g_weight = weights_groups.get(group, 0.0)
+        for sub, w_local in _normalize(dict(subs)).items():
+            weights_sub_global[sub] = g_weight * w_local
+
+    groups = list(CRITERIA_STRUCTURE.keys())
+    matrix = np.zeros((len(SUBCRITERIA), len(groups) + 1))
+    for i, sub in enumerate(SUBCRITERIA):
+        w = weights_sub_global.get(sub, 0.0)
+        for j, group in enumerate(groups):
+            if sub in CRITERIA_STRUCTURE[group]:
+                matrix[i, j] = w
+        matrix[i, -1] = w
+    matrix.setflags(write=False)
+
+    return WeightPlan(
+        weights_groups=tuple(weights_groups.items()),
+        weights_sub_global=tuple(weights_sub_global.items()),
+        matrix=matrix,
+    )
+
+
+def weight_plan(
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+) -> WeightPlan:
+    """
+    Plan de pesos para estas importancias 1–5 (cacheado por vector de
+    importancias; no modifica los dicts recibidos).
+    """
+    return _build_weight_plan(*_importance_key(criteria_importance_main, criteria_importance_sub))
+
+
+# Atributos numéricos que se normalizan con min/max de los candidatos
+_BOUNDED_ATTRS = ("price", "miles", "year", "fuel_efficiency", "accidents_count", "recalls_open")
+
+
+def _compute_bounds(listings: List[ListingIn]) -> Dict[str, Tuple[float, float]]:
+    return {attr: _get_min_max(listings, attr) for attr in _BOUNDED_ATTRS}
+
+
+def _sub_scores(
+    l: ListingIn,
+    bounds: Dict[str, Tuple[float, float]],
+    required_rows: int | None,
+) -> List[float]:
+    """
+    Score 0–1 de cada subcriterio para un listing, en el orden de SUBCRITERIA.
+    Solo lee atributos, así que también acepta filas de la BD.
+    """
+    price_min, price_max = bounds["price"]
+    miles_min, miles_max = bounds["miles"]
+    year_min, year_max = bounds["year"]
+    fe_min, fe_max = bounds["fuel_efficiency"]
+    acc_min, acc_max = bounds["accidents_count"]
+    rec_min, rec_max = bounds["recalls_open"]
+
+    sub_scores: Dict[str, float] = {}
+
+    # --- C1: Económico ---
+    sub_scores["price"] = _score_numeric_cost(float(l.price), price_min, price_max)
+
+    if l.fuel_efficiency is not None and fe_min != fe_max:
+        sub_scores["fuel_efficiency"] = _score_numeric_benefit(
+            float(l.fuel_efficiency), fe_min, fe_max
+        )
+    else:
+        sub_scores["fuel_efficiency"] = 0.5
+
+    # --- C2: Estado / Desgaste ---
+    sub_scores["miles"] = _score_numeric_cost(float(l.miles), miles_min, miles_max)
+    sub_scores["year"] = _score_numeric_benefit(float(l.year), year_min, year_max)
+    sub_scores["age_category"] = _score_age_category(l.age_category)
+    sub_scores["mechanical_state"] = _score_rating_0_5(l.mechanical_state)
+
+    # --- C3: Riesgo legal / historial ---
+    sub_scores["title_condition"] = _score_title_condition(l.title_condition)
+
+    if l.accidents_count is not None and acc_min != acc_max:
+        sub_scores["accidents_count"] = _score_numeric_cost(
+            float(l.accidents_count), acc_min, acc_max
+        )
+    else:
+        # si no hay accidentes reportados, le damos un buen score
+        sub_scores["accidents_count"] = 1.0 if (l.accidents_count or 0) == 0 else 0.7
+
+    sub_scores["odometer_issue"] = _score_bool_negative(l.odometer_issue)
+
+    if l.recalls_open is not None and rec_min != rec_max:
+        sub_scores["recalls_open"] = _score_numeric_cost(
+            float(l.recalls_open), rec_min, rec_max
+        )
+    else:
+        sub_scores["recalls_open"] = 1.0 if (l.recalls_open or 0) == 0 else 0.7
+
+    # --- C4: Adecuación al uso / características ---
+    sub_scores["seating_fit_score"] = _score_seating_fit(l, required_rows)
+    sub_scores["drivetrain_snow_score"] = _score_drivetrain_snow(l)
+    sub_scores["safety_score"] = _score_rating_0_5(l.safety_score)
+    sub_scores["comfort_tech_score"] = _score_comfort_0_1(l.comfort_tech_score)
+
+    return [sub_scores[sub] for sub in SUBCRITERIA]
+
+
+def _build_result(
+    l: ListingIn,
+    score: float,
+    sub_scores: np.ndarray,
+    contributions: np.ndarray,
+    plan: WeightPlan,
+) -> ListingWithScore:
+    # Contribución por grupo (para explicación), ya calculada en el producto
+    # sub_scores @ plan.matrix
+    group_scores = {
+        group: float(contributions[j]) * 100.0  # contribución en puntos
+        for j, group in enumerate(plan.groups)
+    }
+
+    return ListingWithScore(
+        listing=l,
+        score=score,
+        sub_scores=dict(zip(SUBCRITERIA, sub_scores.tolist())),
+        group_scores=group_scores,
+        weights_sub=dict(plan.weights_sub_global),
+        weights_groups=dict(plan.weights_groups),
+    )
+
+
+def _score_block(
+    items: List[Any],
+    vectors: List[List[float]],
+    plan: WeightPlan,
+    top: TopK,
+    copy_rows: bool = False,
+) -> None:
+    """
+    Puntúa un bloque de listings con un solo producto de matrices y los
+    pasa al heap: score global = round(Σ peso_sub_global * sub_score * 100, 2).
+    Con copy_rows el heap guarda copias de cada fila en vez de vistas, para
+    no retener el bloque entero (modo streaming y shards en paralelo).
+    """
+    if not items:
+        return
+    scores = np.asarray(vectors, dtype=np.float64)
+    products = scores @ plan.matrix
+    totals = np.round(products[:, -1] * 100.0, 2).tolist()
+    for i, item in enumerate(items):
+        if copy_rows:
+            top.push(totals[i], (item, scores[i].copy(), products[i].copy()))
+        else:
+            top.push(totals[i], (item, scores[i], products[i]))
+
+
 def compute_ahp_scores(
     listings: List[ListingIn],
     filters: MatchFilters | None,
     criteria_importance_main: Dict[str, int] | None,
     criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int = 0,
 ) -> List[ListingWithScore]:
+    """
+    Filtra, puntúa y ordena los listings de mayor a menor score.
+    Con limit_results > 0 solo se construyen los resultados del top-K
+    (heap de tamaño k) en vez de la lista completa.
+    """
 
     # 1) Filtros duros
     filtered_listings = _filter_listings(listings, filters)
-    if not filtered_listings:
-        return []
+    return _rank_filtered(
+        filtered_listings,
+        filters,
+        criteria_importance_main,
+        criteria_importance_sub,
+        limit_results,
+    )
 
-    # 2) Importancias principales (grupos)
-    if not criteria_importance_main:
-        criteria_importance_main = _default_main_importance()
 
-    # Asegurar que tengamos clave para cada grupo definido
-    for g in CRITERIA_STRUCTURE.keys():
-        if g not in criteria_importance_main:
-            criteria_importance_main[g] = 3  # importancia media por defecto
+def _rank_filtered(
+    filtered_listings: List[ListingIn],
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int,
+) -> List[ListingWithScore]:
+    plan, ranked = _rank_raw(
+        filtered_listings, filters, criteria_importance_main, criteria_importance_sub, limit_results
+    )
 
-    weights_groups = _normalize(criteria_importance_main)
+    # 7) Construir la explicación por grupo
+    return [
+        _build_result(l, score, sub_scores, contributions, plan)
+        for score, (l, sub_scores, contributions) in ranked
+    ]
 
-    # 3) Importancias de subcriterios
-    if not criteria_importance_sub:
-        criteria_importance_sub = _default_sub_importance()
-    else:
-        # asegurar que todos los subcriterios tengan algún valor
-        default_sub = _default_sub_importance()
-        for g, subs in default_sub.items():
-            if g not in criteria_importance_sub:
-                criteria_importance_sub[g] = subs
-            else:
-                for sk, sval in subs.items():
-                    if sk not in criteria_importance_sub[g]:
-                        criteria_importance_sub[g][sk] = sval
-
-    # Normalizar subcriterios dentro de cada grupo
-    weights_sub_local: Dict[str, Dict[str, float]] = {}
-    for group, sub_list in CRITERIA_STRUCTURE.items():
-        important_dict: Dict[str, int] = {}
-        for sub in sub_list:
-            important_dict[sub] = criteria_importance_sub.get(group, {}).get(sub, 3)
-        weights_sub_local[group] = _normalize(important_dict)
 
-    # 4) Pesos globales por subcriterio = peso_grupo * peso_sub_local
-    weights_sub_global: Dict[str, float] = {}
-    for group, sub_dict in weights_sub_local.items():
-        g_weight = weights_groups.get(group, 0.0)
-        for sub, w_local in sub_dict.items():
-            weights_sub_global[sub] = g_weight * w_local
+def _rank_raw(
+    filtered_listings: List[ListingIn],
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int,
+) -> Tuple[WeightPlan, List[Tuple[float, Tuple[ListingIn, np.ndarray, np.ndarray]]]]:
+    """
+    Puntúa y ordena sin construir ListingWithScore: devuelve el plan de
+    pesos y (score, (listing, sub_scores, contribuciones)) del top-K.
+    """
+    # 2-4) Plan de pesos (cacheado por vector de importancias)
+    plan = weight_plan(criteria_importance_main, criteria_importance_sub)
+    if not filtered_listings:
+        return plan, []
 
     # 5) Pre-calcular min/max para numéricos
-    price_min, price_max = _get_min_max(filtered_listings, "price")
-    miles_min, miles_max = _get_min_max(filtered_listings, "miles")
-    year_min, year_max = _get_min_max(filtered_listings, "year")
-    fe_min, fe_max = _get_min_max(filtered_listings, "fuel_efficiency")
-    acc_min, acc_max = _get_min_max(filtered_listings, "accidents_count")
-    rec_min, rec_max = _get_min_max(filtered_listings, "recalls_open")
+    bounds = _compute_bounds(filtered_listings)
+    required_rows = filters.required_rows if filters else None
 
-    results: List[ListingWithScore] = []
+    # 6) Score global por listing (una fila del producto con la matriz
+    #    del plan); se conservan los k mejores
+    top = TopK(limit_results)
+    vectors = [_sub_scores(l, bounds, required_rows) for l in filtered_listings]
+    _score_block(filtered_listings, vectors, plan, top)
 
-    for l in filtered_listings:
-        sub_scores: Dict[str, float] = {}
+    return plan, top.items()
 
-        # --- C1: Económico ---
-        sub_scores["price"] = _score_numeric_cost(float(l.price), price_min, price_max)
 
-        if l.fuel_efficiency is not None and fe_min != fe_max:
-            sub_scores["fuel_efficiency"] = _score_numeric_benefit(
-                float(l.fuel_efficiency), fe_min, fe_max
-            )
-        else:
-            sub_scores["fuel_efficiency"] = 0.5
+def compute_ahp_scores_compact(
+    listings: List[ListingIn],
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int = 0,
+) -> Tuple[WeightPlan, List[Tuple[ListingIn, float, Dict[str, float]]]]:
+    """
+    Como compute_ahp_scores pero sin el detalle por item: devuelve el plan
+    de pesos una sola vez y (listing, score, group_scores) por resultado.
+    """
+    plan, ranked = _rank_raw(
+        _filter_listings(listings, filters),
+        filters,
+        criteria_importance_main,
+        criteria_importance_sub,
+        limit_results,
+    )
+    groups = plan.groups
+    results = []
+    for score, (l, _, contributions) in ranked:
+        group_scores = {g: c * 100.0 for g, c in zip(groups, contributions.tolist())}
+        results.append((l, score, group_scores))
+    return plan, results
 
-        # --- C2: Estado / Desgaste ---
-        sub_scores["miles"] = _score_numeric_cost(float(l.miles), miles_min, miles_max)
-        sub_scores["year"] = _score_numeric_benefit(float(l.year), year_min, year_max)
-        sub_scores["age_category"] = _score_age_category(l.age_category)
-        sub_scores["mechanical_state"] = _score_rating_0_5(l.mechanical_state)
 
-        # --- C3: Riesgo legal / historial ---
-        sub_scores["title_condition"] = _score_title_condition(l.title_condition)
+# ---------------------------
+# Modo streaming desde la BD
+# ---------------------------
 
-        if l.accidents_count is not None and acc_min != acc_max:
-            sub_scores["accidents_count"] = _score_numeric_cost(
-                float(l.accidents_count), acc_min, acc_max
-            )
-        else:
-            # si no hay accidentes reportados, le damos un buen score
-            sub_scores["accidents_count"] = 1.0 if (l.accidents_count or 0) == 0 else 0.7
+def _allowed_sql(col, values: List[str], upper: bool = False):
+    """col IS NULL OR lower(col) IN (...) (o upper, para tracción)."""
+    if upper:
+        return or_(col.is_(None), func.upper(col).in_({v.upper() for v in values}))
+    return or_(col.is_(None), func.lower(col).in_({v.lower() for v in values}))
 
-        sub_scores["odometer_issue"] = _score_bool_negative(l.odometer_issue)
 
-        if l.recalls_open is not None and rec_min != rec_max:
-            sub_scores["recalls_open"] = _score_numeric_cost(
-                float(l.recalls_open), rec_min, rec_max
-            )
-        else:
-            sub_scores["recalls_open"] = 1.0 if (l.recalls_open or 0) == 0 else 0.7
-
-        # --- C4: Adecuación al uso / características ---
-        required_rows = filters.required_rows if filters else None
-        sub_scores["seating_fit_score"] = _score_seating_fit(l, required_rows)
-        sub_scores["drivetrain_snow_score"] = _score_drivetrain_snow(l)
-        sub_scores["safety_score"] = _score_rating_0_5(l.safety_score)
-        sub_scores["comfort_tech_score"] = _score_comfort_0_1(l.comfort_tech_score)
-
-        # 6) Score global = Σ (peso_sub_global * sub_score)
-        total = 0.0
-        for sub_name, s_val in sub_scores.items():
-            w = weights_sub_global.get(sub_name, 0.0)
-            total += w * s_val
-
-        score_global = total * 100.0
-
-        # 7) Contribución por grupo (para explicación)
-        group_scores: Dict[str, float] = {}
-        for group, subs in CRITERIA_STRUCTURE.items():
-            g_sum = 0.0
-            for sub in subs:
-                w = weights_sub_global.get(sub, 0.0)
-                s = sub_scores.get(sub, 0.5)
-                g_sum += w * s
-            group_scores[group] = g_sum * 100.0  # contribución en puntos
-
-        results.append(
-            ListingWithScore(
-                listing=l,
-                score=round(score_global, 2),
-                sub_scores=sub_scores,
-                group_scores=group_scores,
-                weights_sub=weights_sub_global,
-                weights_groups=weights_groups,
-            )
+def _filters_sql(filters: MatchFilters | None) -> List[Any]:
+    """
+    Traduce MatchFilters a condiciones SQL con la misma semántica que
+    _passes_filters (un valor NULL en la BD no descarta el listing).
+    """
+    if filters is None:
+        return []
+
+    conds: List[Any] = []
+
+    if filters.age_categories_allowed:
+        conds.append(_allowed_sql(Listing.age_category, filters.age_categories_allowed))
+    if filters.min_year is not None:
+        conds.append(Listing.year >= filters.min_year)
+    if filters.max_year is not None:
+        conds.append(Listing.year <= filters.max_year)
+    if filters.required_rows is not None:
+        conds.append(or_(Listing.rows.is_(None), Listing.rows >= filters.required_rows))
+    if filters.required_drivetrains:
+        conds.append(_allowed_sql(Listing.drivetrain, filters.required_drivetrains, upper=True))
+    if filters.allowed_makes:
+        conds.append(_allowed_sql(Listing.make, filters.allowed_makes))
+    if filters.allowed_models:
+        conds.append(_allowed_sql(Listing.model, filters.allowed_models))
+    if filters.allowed_trims:
+        conds.append(_allowed_sql(Listing.trim, filters.allowed_trims))
+
+    return conds
+
+
+def stream_ahp_scores(
+    db: Session,
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int = 20,
+) -> List[ListingWithScore]:
+    """
+    Igual que compute_ahp_scores pero leyendo los listings de la BD:
+    min/max en una sola query agregada y luego las filas por lotes
+    (yield_per), reteniendo solo los k mejores. Memoria O(k).
+    """
+    conds = _filters_sql(filters)
+
+    aggregates = []
+    for attr in _BOUNDED_ATTRS:
+        col = getattr(Listing, attr)
+        aggregates += [func.min(col), func.max(col)]
+    agg = db.query(*aggregates).filter(*conds).one()
+
+    bounds: Dict[str, Tuple[float, float]] = {}
+    for i, attr in enumerate(_BOUNDED_ATTRS):
+        vmin, vmax = agg[2 * i], agg[2 * i + 1]
+        bounds[attr] = (0.0, 0.0) if vmin is None else (float(vmin), float(vmax))
+
+    plan = weight_plan(criteria_importance_main, criteria_importance_sub)
+    required_rows = filters.required_rows if filters else None
+
+    # Filas como tuplas con nombre (sin objetos ORM)
+    # Por id: a igual score gana el de menor id, igual que rank_inventory
+    query = (
+        db.query(*Listing.__table__.columns)
+        .filter(*conds)
+        .order_by(Listing.id)
+        .yield_per(STREAM_BATCH_SIZE)
+    )
+
+    # Se puntúa por bloques de STREAM_BATCH_SIZE; el heap solo retiene
+    # referencias a los bloques de sus k elementos
+    top = TopK(limit_results)
+    rows: List[Any] = []
+    vectors: List[List[float]] = []
+    for row in query:
+        rows.append(row)
+        vectors.append(_sub_scores(row, bounds, required_rows))
+        if len(rows) >= STREAM_BATCH_SIZE:
+            _score_block(rows, vectors, plan, top, copy_rows=True)
+            rows, vectors = [], []
+    _score_block(rows, vectors, plan, top, copy_rows=True)
+
+    record_stream_run("matching", top.seen, top.peak)
+
+    return [
+        _build_result(to_listing_in(row), score, sub_scores, contributions, plan)
+        for score, (row, sub_scores, contributions) in top.items()
+    ]
+
+
+# ---------------------------
+# Inventario guardado (snapshot)
+# ---------------------------
+
+def rank_inventory(
+    db: Session,
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int = 20,
+) -> List[ListingWithScore]:
+    """
+    Puntúa el inventario guardado leyendo el snapshot en memoria
+    (sin recargar la tabla listings). Los filtros se aplican con la
+    máscara vectorizada sobre las columnas del snapshot.
+    """
+    snap = get_snapshot(db)
+    mask = compile_filters(filters).mask(snap)
+    if parallel_enabled(int(mask.sum())):
+        return _rank_inventory_parallel(
+            snap, mask, filters, criteria_importance_main, criteria_importance_sub, limit_results
         )
 
-    # Ordenar por score final
-    results.sort(key=lambda x: x.score, reverse=True)
-    return results
+    listing_ins = snap.listing_ins()
+    positions = np.flatnonzero(mask)
+    return _rank_filtered(
+        [listing_ins[i] for i in positions],
+        filters,
+        criteria_importance_main,
+        criteria_importance_sub,
+        limit_results=limit_results,
+    )
+
+
+# Atributos que lee _sub_scores
+_SCORED_ATTRS: Tuple[str, ...] = _BOUNDED_ATTRS + (
+    "age_category",
+    "mechanical_state",
+    "title_condition",
+    "odometer_issue",
+    "rows",
+    "drivetrain",
+    "safety_score",
+    "comfort_tech_score",
+)
+
+
+def _rank_inventory_parallel(
+    snap: ListingSnapshot,
+    mask: np.ndarray,
+    filters: MatchFilters | None,
+    criteria_importance_main: Dict[str, int] | None,
+    criteria_importance_sub: Dict[str, Dict[str, int]] | None,
+    limit_results: int,
+) -> List[ListingWithScore]:
+    """
+    rank_inventory repartido entre procesos: los min/max se calculan aquí
+    sobre todos los candidatos, cada shard devuelve su top-K y se mezclan
+    con el mismo desempate que TopK (a igual score, la fila anterior).
+    """
+    plan = weight_plan(criteria_importance_main, criteria_importance_sub)
+    bounds = {}
+    for attr in _BOUNDED_ATTRS:
+        values = snap.numeric(attr)[mask]
+        values = values[~np.isnan(values)]
+        bounds[attr] = (float(values.min()), float(values.max())) if len(values) else (0.0, 0.0)
+    required_rows = filters.required_rows if filters else None
+
+    parts = map_shards(
+        _score_inventory_shard, split(snap, mask, _SCORED_ATTRS), bounds, required_rows, plan, limit_results
+    )
+    merged = sorted((row for part in parts for row in part), key=lambda r: (-r[0], r[1]))
+    if limit_results > 0:
+        merged = merged[:limit_results]
+
+    return [
+        _build_result(to_listing_in(snap.record(pos)), score, sub_scores, contributions, plan)
+        for score, pos, sub_scores, contributions in merged
+    ]
+
+
+def _score_inventory_shard(
+    shard: Shard,
+    bounds: Dict[str, Tuple[float, float]],
+    required_rows: int | None,
+    plan: WeightPlan,
+    limit_results: int,
+) -> List[Tuple[float, int, np.ndarray, np.ndarray]]:
+    """En un worker: top-K del shard como (score, fila, sub_scores, contribuciones)."""
+    view = shard.open()
+    rows = view.records(_SCORED_ATTRS)
+    positions = view.positions.tolist()
+
+    top = TopK(limit_results)
+    vectors = [_sub_scores(l, bounds, required_rows) for l in rows]
+    _score_block(positions, vectors, plan, top, copy_rows=True)
+    return [(score, pos, sub, prod) for score, (pos, sub, prod) in top.items()]
@@ -0,0 +1,259 @@
+"""
+Scoring en paralelo sobre el snapshot de listings (opcional).
+
+Para requests con cientos de miles de candidatos, el scoring se reparte
+entre los procesos de un ProcessPoolExecutor persistente:
+
+- Las columnas que leen los scorers (no todo el snapshot) se publican una
+  vez por versión en un bloque de memoria compartida (float64, una fila
+  por columna; los textos como códigos). Las categorías de los textos van
+  pickleadas al final del mismo bloque: cada worker las lee una vez por
+  versión, al mapearlo. No se picklean filas.
+- Cada tarea recibe solo el descriptor del bloque (nombres y tipos), un
+  rango de filas y la máscara de candidatos de ese rango en bits.
+- El proceso principal calcula antes los min/max globales y, al final,
+  mezcla los top-K de cada shard.
+
+Se activa con PARALLEL_SCORING_WORKERS > 0 y solo si hay al menos
+PARALLEL_SCORING_MIN_ROWS candidatos (por debajo no compensa el costo
+de coordinar procesos).
+"""
+
+import atexit
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.listing import Listing
+from app.services.listing_snapshot import LISTING_COLUMNS, ListingSnapshot
+
+# Tipo de cada columna según el modelo: define cómo se codifica en float64
+_PY_TYPES = {int: "int", float: "float", bool: "bool", str: "str"}
+
+
+def parallel_enabled(n_candidates: int) -> bool:
+    return (
+        settings.PARALLEL_SCORING_WORKERS > 0
+        and n_candidates >= settings.PARALLEL_SCORING_MIN_ROWS
+    )
+
+
+# ---------------------------
+# Columnas en memoria compartida
+# ---------------------------
+
+@dataclass(frozen=True)
+class SharedColumns:
+    """
+    Descriptor (pickleable) de un bloque publicado. Viaja en cada Shard, así
+    que no lleva datos: las categorías están en el bloque, tras las columnas.
+    """
+
+    shm_name: str
+    n_rows: int
+    columns: Tuple[str, ...]
+    kinds: Dict[str, str]
+    categories_size: int
+
+
+def _column_kind(name: str) -> str:
+    try:
+        py_type = Listing.__table__.columns[name].type.python_type
+    except NotImplementedError:
+        return "str"
+    return _PY_TYPES.get(py_type, "str")
+
+
+def _publish(snap: ListingSnapshot, columns: Tuple[str, ...]) -> Tuple[shared_memory.SharedMemory, SharedColumns]:
+    n = snap.size
+    encoded = np.empty((len(columns), n), dtype=np.float64)
+    kinds: Dict[str, str] = {}
+    categories: Dict[str, List[Any]] = {}
+    for i, name in enumerate(columns):
+        kind = _column_kind(name)
+        kinds[name] = kind
+        if kind == "str":
+            codes, cats = snap.factorized(name)
+            encoded[i] = codes
+            categories[name] = cats
+        else:
+            encoded[i] = snap.numeric(name)
+    pickled = pickle.dumps(categories, protocol=pickle.HIGHEST_PROTOCOL)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(encoded.nbytes + len(pickled), 8))
+    np.ndarray(encoded.shape, dtype=np.float64, buffer=shm.buf)[:] = encoded
+    shm.buf[encoded.nbytes:encoded.nbytes + len(pickled)] = pickled
+    return shm, SharedColumns(shm.name, n, columns, kinds, len(pickled))
+
+
+_lock = threading.Lock()
+# (versión, bloque, descriptor) publicados; se conserva el anterior una
+# generación más por si algún request en curso todavía lo usa
+_published: List[Tuple[int, shared_memory.SharedMemory, SharedColumns]] = []
+
+
+def shared_columns(snap: ListingSnapshot, columns: Sequence[str]) -> SharedColumns:
+    """
+    Descriptor de un bloque de `snap` con al menos `columns`, publicándolo
+    si hace falta (con las columnas ya publicadas de esa versión, para que
+    los distintos scorers compartan un solo bloque).
+    """
+    with _lock:
+        wanted = set(columns)
+        for version, _, desc in _published:
+            if version == snap.version:
+                if wanted <= set(desc.columns):
+                    return desc
+                wanted.update(desc.columns)
+        shm, desc = _publish(snap, tuple(name for name in LISTING_COLUMNS if name in wanted))
+        _published.append((snap.version, shm, desc))
+        while len(_published) > 2:
+            _, old, _ = _published.pop(0)
+            old.close()
+            old.unlink()
+        return desc
+
+
+# ---------------------------
+# Pool de procesos
+# ---------------------------
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            # spawn: no se heredan hilos ni conexiones abiertas del servidor
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PARALLEL_SCORING_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+@atexit.register
+def shutdown() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+        while _published:
+            _, shm, _ = _published.pop()
+            shm.close()
+            shm.unlink()
+
+
+# ---------------------------
+# Shards
+# ---------------------------
+
+@dataclass(frozen=True)
+class Shard:
+    """Rango de filas [lo, hi) y su máscara de candidatos en bits."""
+
+    desc: SharedColumns
+    lo: int
+    hi: int
+    mask_bits: bytes
+
+    def open(self) -> "ShardView":
+        return ShardView(self)
+
+
+def split(snap: ListingSnapshot, mask: np.ndarray, columns: Sequence[str]) -> List[Shard]:
+    """
+    Parte las filas en rangos con la misma cantidad de candidatos. Los
+    workers solo pueden leer `columns` (las que usa el scorer).
+    """
+    desc = shared_columns(snap, columns)
+    positions = np.flatnonzero(mask)
+    n_shards = max(1, min(settings.PARALLEL_SCORING_WORKERS, len(positions)))
+    cuts = [0]
+    cuts += [int(positions[len(positions) * i // n_shards]) for i in range(1, n_shards)]
+    cuts.append(snap.size)
+
+    shards = []
+    for lo, hi in zip(cuts, cuts[1:]):
+        if hi > lo:
+            shards.append(Shard(desc, lo, hi, np.packbits(mask[lo:hi]).tobytes()))
+    return shards
+
+
+def map_shards(fn: Callable[..., Any], shards: Sequence[Shard], *args: Any) -> List[Any]:
+    """fn(shard, *args) en el pool; resultados en el orden de los shards."""
+    executor = _get_executor()
+    futures = [executor.submit(fn, shard, *args) for shard in shards]
+    return [f.result() for f in futures]
+
+
+# ---------------------------
+# Lado del worker
+# ---------------------------
+
+# Bloque mapeado en este proceso y sus categorías (solo el último: las
+# versiones viejas se sueltan)
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray, Dict[str, List[Any]]]] = {}
+
+
+def _attach(desc: SharedColumns) -> Tuple[np.ndarray, Dict[str, List[Any]]]:
+    entry = _attached.get(desc.shm_name)
+    if entry is None:
+        for old, _, _ in _attached.values():
+            old.close()
+        _attached.clear()
+        # los workers (spawn) comparten el resource tracker del proceso
+        # principal, que es quien hace unlink del bloque
+        shm = shared_memory.SharedMemory(name=desc.shm_name)
+        block = np.ndarray((len(desc.columns), desc.n_rows), dtype=np.float64, buffer=shm.buf)
+        start = block.nbytes
+        categories = pickle.loads(shm.buf[start:start + desc.categories_size])
+        entry = (shm, block, categories)
+        _attached[desc.shm_name] = entry
+    return entry[1], entry[2]
+
+
+class ShardView:
+    """Columnas de los candidatos de un shard, leídas del bloque compartido."""
+
+    def __init__(self, shard: Shard):
+        self.desc = shard.desc
+        self._block, self._categories = _attach(shard.desc)
+        selected = np.unpackbits(
+            np.frombuffer(shard.mask_bits, dtype=np.uint8), count=shard.hi - shard.lo
+        ).astype(bool)
+        # posiciones (filas del snapshot) de los candidatos, en orden
+        self.positions = shard.lo + np.flatnonzero(selected)
+        self._index = {name: i for i, name in enumerate(shard.desc.columns)}
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Columna como float64 (None -> NaN), igual que ListingSnapshot.numeric."""
+        return self._block[self._index[name], self.positions]
+
+    def values(self, name: str) -> List[Any]:
+        """Columna con los valores Python originales (int/float/bool/str/None)."""
+        raw = self.numeric(name)
+        kind = self.desc.kinds[name]
+        if kind == "str":
+            cats = self._categories[name]
+            return [cats[int(c)] for c in raw]
+        if kind == "int":
+            return [None if v != v else int(v) for v in raw.tolist()]
+        if kind == "bool":
+            return [None if v != v else bool(v) for v in raw.tolist()]
+        return [None if v != v else v for v in raw.tolist()]
+
+    def records(self, names: Sequence[str]) -> List[SimpleNamespace]:
+        """Una fila por candidato con los atributos `names`."""
+        cols = [self.values(name) for name in names]
+        return [SimpleNamespace(**dict(zip(names, row))) for row in zip(*cols)]
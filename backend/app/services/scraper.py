@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from typing import List, Callable, Dict
-from urllib.parse import urlparse
+import logging
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, List, Callable, Dict, Optional
+from urllib.parse import urljoin, urlparse
 
-import requests
 from requests.exceptions import RequestException
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.listing import Listing
+from app.services import http_cache, http_client
+from app.services.listing_ingest import upsert_listings
+
+try:
+    import lxml  # noqa: F401  (backend más rápido de BeautifulSoup)
+except ImportError:  # opcional
+    lxml = None
+
+logger = logging.getLogger(__name__)
 
 # User-Agent para evitar bloqueos básicos
 DEFAULT_HEADERS = {
@@ -66,6 +80,8 @@ def parse_cars_com_listings(soup: BeautifulSoup) -> List[Listing]:
             continue
 
         title_text = title_el.get_text(strip=True)
+        # link al detalle (relativo; scraper.fetch_listings lo resuelve)
+        source_url = title_el.get("href") if title_el.name == "a" else None
 
         # Helpers de parseo
         def parse_int(text: str, default: int = 0) -> int:
@@ -107,6 +123,7 @@ def parse_cars_com_listings(soup: BeautifulSoup) -> List[Listing]:
             make=make,
             model=model,
             trim=None,
+            source_url=source_url,
         )
         listings.append(listing)
 
@@ -278,11 +295,62 @@ def _listing_from_ld_json(data: dict) -> Listing | None:
             make=make,
             model=model,
             trim=None,
+            vin=data.get("vehicleIdentificationNumber") or None,
         )
     except Exception:
         return None
 
 
+# ============================================================
+#   PARSEO PARCIAL DE CARS.COM
+# ============================================================
+
+# Solo las tarjetas de resultados (con todo lo que tienen adentro): es lo
+# único que mira parse_cars_com_listings.
+_CARS_COM_CARDS = SoupStrainer("div", class_=["vehicle-card", "shop-srp-listings__listing"])
+
+_LD_JSON_SCRIPT = re.compile(
+    r"<script\b[^>]*\btype\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def _detail_source(listings: List[Listing], path: str) -> List[Listing]:
+    """En una página de detalle el aviso es la página misma."""
+    for l in listings:
+        l.source_url = l.source_url or path
+    return listings
+
+
+def cars_com_strainer(path: str) -> Optional[SoupStrainer]:
+    # el fallback del detalle busca texto en toda la página: ahí no se recorta
+    if "vehicledetail" in path:
+        return None
+    return _CARS_COM_CARDS
+
+
+def cars_com_fast_path(html: str, path: str) -> Optional[List[Listing]]:
+    """
+    Detalle de cars.com con JSON-LD de tipo Vehicle: se sacan los
+    <script type="application/ld+json"> con una regex y se leen sin armar
+    el DOM. Mismo resultado que parse_cars_com_detail; None si la página
+    no trae un Vehicle (entonces va el parseo normal).
+    """
+    if "vehicledetail" not in path:
+        return None
+    for match in _LD_JSON_SCRIPT.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except Exception:
+            continue
+        for item in data if isinstance(data, list) else [data]:
+            if isinstance(item, dict):
+                listing = _listing_from_ld_json(item)
+                if listing:
+                    return _detail_source([listing], path)
+    return None
+
+
 # ============================================================
 #   PARSER GENÉRICO / REGISTRO DE DOMINIOS
 # ============================================================
@@ -298,6 +366,14 @@ def parse_generic_page(soup: BeautifulSoup) -> List[Listing]:
 
 PARSERS_BY_DOMAIN: Dict[str, Callable[[BeautifulSoup, str], List[Listing]]] = {}
 
+# Opcionales, por dominio (mismas claves que PARSERS_BY_DOMAIN):
+# - strainer(path): qué partes del HTML hacen falta para ese tipo de
+#   página; el árbol se arma solo con ellas (None = página entera);
+# - fast_path(html, path): listings sacados del texto sin armar ningún
+#   árbol, o None si no alcanza y hay que parsear.
+STRAINERS_BY_DOMAIN: Dict[str, Callable[[str], Optional[SoupStrainer]]] = {}
+FAST_PATHS_BY_DOMAIN: Dict[str, Callable[[str, str], Optional[List[Listing]]]] = {}
+
 
 def _register_default_parsers():
     """
@@ -307,12 +383,14 @@ def _register_default_parsers():
     def cars_parser(soup: BeautifulSoup, path: str) -> List[Listing]:
         # Si el path contiene 'vehicledetail' asumimos página de detalle
         if "vehicledetail" in path:
-            return parse_cars_com_detail(soup)
+            return _detail_source(parse_cars_com_detail(soup), path)
         # Si no, lo tratamos como página de resultados
         return parse_cars_com_listings(soup)
 
     # Para cars.com
     PARSERS_BY_DOMAIN["cars.com"] = cars_parser
+    STRAINERS_BY_DOMAIN["cars.com"] = cars_com_strainer
+    FAST_PATHS_BY_DOMAIN["cars.com"] = cars_com_fast_path
 
     # Genérico (fallback)
     PARSERS_BY_DOMAIN["*"] = lambda s, p: parse_generic_page(s)
@@ -322,14 +400,93 @@ _register_default_parsers()
 
 
 # ============================================================
-#   FUNCIÓN PÚBLICA: SCRAPE + GUARDAR
+#   DESCARGA (SIN BD) E IMPORTACIÓN CONCURRENTE
 # ============================================================
 
-def scrape_and_save_listings(db: Session, url: str) -> List[Listing]:
+def _domain_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def _site_key(domain: str) -> str:
+    """Clave del dominio en los registros (www.cars.com usa la de cars.com); "*" si no hay."""
+    if domain in PARSERS_BY_DOMAIN:
+        return domain
+    if domain.startswith("www.") and domain[len("www."):] in PARSERS_BY_DOMAIN:
+        return domain[len("www."):]
+    return "*"
+
+
+def html_backend() -> str:
+    """Backend de BeautifulSoup: SCRAPER_HTML_PARSER, o lxml si está instalado."""
+    if settings.SCRAPER_HTML_PARSER:
+        return settings.SCRAPER_HTML_PARSER
+    return "lxml" if lxml is not None else "html.parser"
+
+
+def make_soup(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """BeautifulSoup con html_backend(); si ese backend no está instalado, html.parser."""
+    backend = html_backend()
+    try:
+        return BeautifulSoup(html, backend, parse_only=parse_only)
+    except FeatureNotFound:
+        logger.warning("Backend de HTML %r no disponible, se usa html.parser", backend)
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+
+def parse_page(html: str, domain: str, path: str) -> List[Listing]:
     """
-    Llama al scraper para una URL y guarda los listings en la BD.
-    - Selecciona parser específico según el dominio (cars.com, etc.)
-    - Ignora URLs inválidas o errores de red.
+    Listings de una página ya descargada. Prueba el camino rápido del
+    dominio (sin DOM) y si no alcanza arma el árbol solo con las partes
+    que indica su strainer, con el backend más rápido disponible.
+    Devuelve [] si el parser falla.
+    """
+    key = _site_key(domain)
+    parser = PARSERS_BY_DOMAIN.get(key, lambda s, p: [])
+    try:
+        fast_path = FAST_PATHS_BY_DOMAIN.get(key)
+        if fast_path is not None:
+            listings = fast_path(html, path)
+            if listings is not None:
+                return listings
+
+        strainer = STRAINERS_BY_DOMAIN.get(key)
+        parse_only = strainer(path) if strainer is not None else None
+        soup = make_soup(html, parse_only)
+        return parser(soup, path)
+    except Exception:
+        return []
+
+
+# columnas que se guardan en el cache de páginas (todas menos el id)
+_CACHED_FIELDS = [c.key for c in Listing.__table__.columns if c.key != "id"]
+
+
+def _listing_dicts(listings: List[Listing]) -> List[Dict[str, Any]]:
+    return [{f: getattr(l, f) for f in _CACHED_FIELDS} for l in listings]
+
+
+def _from_cache(page: http_cache.CachedPage, domain: str, path: str) -> List[Listing]:
+    """Listings de una entrada del cache; si no se guardaron (o son de otra versión), se parsea el cuerpo."""
+    if page.parsed is None:
+        listings = parse_page(page.body.decode("utf-8"), domain, path)
+        http_cache.store(
+            page.url, page.body, page.content_hash, page.etag, page.last_modified,
+            _listing_dicts(listings),
+        )
+        return listings
+    return [Listing(**row) for row in page.parsed]
+
+
+def fetch_listings(url: str) -> List[Listing]:
+    """
+    Descarga una URL y la parsea con el parser de su dominio, sin tocar la
+    BD (se puede llamar desde cualquier hilo). Devuelve [] si la URL es
+    inválida, hay error de red o el parser falla.
+
+    Pasa por el cache de páginas (app/services/http_cache.py): GET
+    condicional, y sin volver a parsear si la página no cambió. Los
+    listings salen con su origen (source_domain, source_url absoluta)
+    para app/services/listing_ingest.
     """
     if not _is_valid_url(url):
         return []
@@ -338,32 +495,114 @@ def scrape_and_save_listings(db: Session, url: str) -> List[Listing]:
     domain = parsed.netloc.lower()
     path = parsed.path or "/"
 
-    # Elegir parser según dominio; si no hay, usar genérico
-    parser = PARSERS_BY_DOMAIN.get(domain)
-    if parser is None:
-        parser = PARSERS_BY_DOMAIN.get("*", lambda s, p: [])
+    listings = _fetch(url, domain, path)
+    source_domain = domain[len("www."):] if domain.startswith("www.") else domain
+    for l in listings:
+        l.source_domain = source_domain
+        if l.source_url:
+            l.source_url = urljoin(url, l.source_url)
+    return listings
+
+
+def _fetch(url: str, domain: str, path: str) -> List[Listing]:
+    """fetch_listings sin el origen: cache, descarga y parseo."""
+    cached = http_cache.lookup(url)
+    if http_cache.offline():
+        if cached is None:
+            return []
+        http_cache.hit(cached, "offline")
+        return _from_cache(cached, domain, path)
+
+    headers = dict(DEFAULT_HEADERS)
+    if cached is not None:
+        headers.update(cached.conditional_headers())
 
     try:
-        resp = requests.get(url, headers=DEFAULT_HEADERS, timeout=15)
+        resp = http_client.get(url, headers=headers)
+        if cached is not None and resp.status_code == 304:
+            http_cache.hit(cached, "revalidated")
+            return _from_cache(cached, domain, path)
         resp.raise_for_status()
     except RequestException:
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    # el cuerpo se guarda ya decodificado (utf-8), así el cache no depende
+    # de la detección de encoding de requests
+    text = resp.text
+    body = text.encode("utf-8")
+    content_hash = hashlib.sha256(body).hexdigest()
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+
+    if cached is not None and cached.content_hash == content_hash and cached.parsed is not None:
+        http_cache.hit(cached, "unchanged")
+        http_cache.store(url, body, content_hash, etag, last_modified, cached.parsed)
+        return [Listing(**row) for row in cached.parsed]
+
+    listings = parse_page(text, domain, path)
+    http_cache.store(url, body, content_hash, etag, last_modified, _listing_dicts(listings))
+    return listings
 
-    try:
-        scraped = parser(soup, path)
-    except Exception:
-        scraped = []
 
-    if not scraped:
-        return []
+def scrape_urls(
+    urls: List[str],
+    max_workers: Optional[int] = None,
+    per_domain: Optional[int] = None,
+) -> List[List[Listing]]:
+    """
+    Descarga y parsea varias URLs en un pool de hilos, con dos topes:
+    max_workers descargas en total y per_domain contra un mismo dominio
+    (para no martillar cars.com). Devuelve una lista de listings por URL,
+    en el mismo orden que `urls`.
+
+    Cada dominio se reparte en a lo sumo per_domain "carriles" que van
+    sacando URLs de su cola; así ningún hilo del pool queda bloqueado
+    esperando turno de un dominio mientras otro tiene trabajo.
+    """
+    max_workers = max(1, max_workers or settings.SCRAPER_MAX_CONCURRENCY)
+    per_domain = max(1, per_domain or settings.SCRAPER_PER_DOMAIN_CONCURRENCY)
+    results: List[List[Listing]] = [[] for _ in urls]
+
+    queues: Dict[str, Deque[int]] = {}
+    for i, url in enumerate(urls):
+        queues.setdefault(_domain_of(url), deque()).append(i)
+
+    def lane(queue: Deque[int]) -> None:
+        while True:
+            try:
+                i = queue.popleft()  # popleft es atómico entre hilos
+            except IndexError:
+                return
+            results[i] = fetch_listings(urls[i])
+
+    # carriles intercalados por dominio: todos los dominios arrancan pronto
+    lanes = [
+        queue
+        for k in range(per_domain)
+        for queue in queues.values()
+        if k < len(queue)
+    ]
+    if len(lanes) <= 1 or max_workers == 1:
+        for queue in lanes:
+            lane(queue)
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(lanes))) as pool:
+        for future in [pool.submit(lane, queue) for queue in lanes]:
+            future.result()
+    return results
 
-    for l in scraped:
-        db.add(l)
-    db.commit()
 
-    for l in scraped:
-        db.refresh(l)
+# ============================================================
+#   FUNCIÓN PÚBLICA: SCRAPE + GUARDAR
+# ============================================================
 
-    return scraped
+def scrape_and_save_listings(db: Session, url: str) -> List[Listing]:
+    """
+    Llama al scraper para una URL y guarda los listings en la BD.
+    - Selecciona parser específico según el dominio (cars.com, etc.)
+    - Ignora URLs inválidas o errores de red.
+    - Los avisos ya importados se actualizan en vez de duplicarse
+      (ver app/services/listing_ingest.py).
+    """
+    return upsert_listings(db, fetch_listings(url)).listings
@@ -0,0 +1,93 @@
+import heapq
+import threading
+from typing import Any, Dict, List, Tuple
+
+from app.core.query_metrics import counter_lines, gauge_lines
+
+# Tamaño de lote para leer filas con yield_per en los modos streaming
+STREAM_BATCH_SIZE = 1000
+
+# Métricas de los modos streaming, por motor:
+#   runs, rows_scanned, last_peak_rows_held, max_peak_rows_held
+STREAM_METRICS: Dict[str, Dict[str, int]] = {}
+_metrics_lock = threading.Lock()
+
+
+class TopK:
+    """
+    Mantiene los k mejores elementos vistos con un min-heap de tamaño k.
+    Los empates de clave se resuelven por orden de llegada (el primero
+    gana), igual que un list.sort(reverse=True) estable.
+    Si k <= 0 guarda todos (sin límite).
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[Any, int, Any]] = []
+        self._seq = 0
+        self.peak = 0
+
+    def push(self, key: Any, item: Any) -> None:
+        # -seq: entre claves iguales, el más reciente es el "menor" y sale antes
+        entry = (key, -self._seq, item)
+        self._seq += 1
+
+        if self.k <= 0:
+            # sin límite no hace falta mantener el heap: se ordena al final
+            self._heap.append(entry)
+            self.peak = len(self._heap)
+        elif len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            self.peak = max(self.peak, len(self._heap))
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    @property
+    def seen(self) -> int:
+        return self._seq
+
+    def items(self) -> List[Tuple[Any, Any]]:
+        """(key, item) de mayor a menor clave."""
+        # (key, -seq) es único, así que nunca se llega a comparar el item
+        ordered = sorted(self._heap, reverse=True)
+        return [(key, item) for key, _, item in ordered]
+
+
+def record_stream_run(engine: str, rows_scanned: int, peak_rows_held: int) -> None:
+    """
+    Registra una ejecución streaming: filas leídas y pico de filas retenidas.
+    """
+    with _metrics_lock:
+        m = STREAM_METRICS.setdefault(
+            engine,
+            {"runs": 0, "rows_scanned": 0, "last_peak_rows_held": 0, "max_peak_rows_held": 0},
+        )
+        m["runs"] += 1
+        m["rows_scanned"] += rows_scanned
+        m["last_peak_rows_held"] = peak_rows_held
+        m["max_peak_rows_held"] = max(m["max_peak_rows_held"], peak_rows_held)
+
+
+def render() -> str:
+    """STREAM_METRICS en formato de texto de Prometheus (GET /metrics)."""
+    with _metrics_lock:
+        items = sorted((engine, dict(m)) for engine, m in STREAM_METRICS.items())
+
+    lines: List[str] = []
+    lines += counter_lines(
+        "match_stream_runs_total", "Ejecuciones del ranking streaming, por motor.",
+        [({"engine": engine}, m["runs"]) for engine, m in items],
+    )
+    lines += counter_lines(
+        "match_stream_rows_scanned_total", "Filas leídas por el ranking streaming, por motor.",
+        [({"engine": engine}, m["rows_scanned"]) for engine, m in items],
+    )
+    lines += gauge_lines(
+        "match_stream_peak_rows_held", "Pico de filas retenidas en la última ejecución streaming, por motor.",
+        [({"engine": engine}, m["last_peak_rows_held"]) for engine, m in items],
+    )
+    lines += gauge_lines(
+        "match_stream_max_peak_rows_held", "Mayor pico de filas retenidas desde el arranque, por motor.",
+        [({"engine": engine}, m["max_peak_rows_held"]) for engine, m in items],
+    )
+    return "\n".join(lines) + "\n"
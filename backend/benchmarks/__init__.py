@@ -0,0 +1,8 @@
+"""
+Benchmarks del backend. Se ejecutan desde la carpeta backend/, por ejemplo:
+
+    python -m benchmarks.bench_filters
+
+La suite completa (BD sintética de benchmarks/datagen.py, resultados en
+JSON) es benchmarks/suite.py; benchmarks/compare.py compara dos corridas.
+"""
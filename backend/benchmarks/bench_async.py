@@ -0,0 +1,194 @@
+"""
+Throughput de las rutas de lectura async (AsyncSession + aiosqlite) contra
+las mismas rutas como `def` sync (threadpool de Starlette + Session).
+
+Cada variante corre en su propio proceso uvicorn; el cliente (httpx) abre
+50/200/500 conexiones concurrentes. Usa la BD de DATABASE_URL, que debería
+tener listings y leads (p. ej. generada con los scripts de seed).
+
+    python -m benchmarks.bench_async [requests_por_nivel]
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api import routes_leads, routes_listings
+from app.api.routes_match import _to_response
+from app.core.database import get_db
+from app.schemas.lead import LeadAdminPage, LeadDetailOut
+from app.schemas.listing import ListingPage
+from app.schemas.match import MatchRequest, MatchResponse
+from app.services.match_cache import match_cache, match_cache_key
+from app.services.match_pages import first_page
+
+CONCURRENCY_LEVELS = (50, 200, 500)
+
+# ---------------------------
+# Variante sync (referencia)
+# ---------------------------
+
+sync_app = FastAPI()
+
+
+@sync_app.get("/")
+def _root():
+    return {"ok": True}
+
+
+@sync_app.get("/leads/admin", response_model=LeadAdminPage)
+def _sync_leads_admin(
+    db: Session = Depends(get_db),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+):
+    total = db.scalar(select(func.count()).select_from(routes_leads.Lead))
+    pages = (total + limit - 1) // limit if total > 0 else 1
+    page = min(page, pages)
+    rows = db.execute(
+        routes_leads.lead_admin_rows_statement().offset((page - 1) * limit).limit(limit)
+    ).all()
+    return LeadAdminPage(
+        items=[routes_leads.lead_admin_out(*row) for row in rows],
+        total=total,
+        page=page,
+        pages=pages,
+    )
+
+
+@sync_app.get("/leads/{lead_id}/detail", response_model=LeadDetailOut)
+def _sync_lead_detail(lead_id: int, db: Session = Depends(get_db)):
+    row = db.execute(routes_leads.lead_detail_statement(lead_id)).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Lead no existe")
+    return routes_leads.lead_detail_out(*row)
+
+
+@sync_app.get("/listings/", response_model=ListingPage, response_model_exclude_unset=True)
+def _sync_listings(db: Session = Depends(get_db)):
+    names = list(routes_listings.LISTING_ITEM_FIELDS)
+    limit = routes_listings.LISTINGS_PAGE_DEFAULT
+    listings = db.execute(routes_listings.listing_page_statement(names, limit)).scalars().all()
+    return routes_listings.listing_page(listings, names, limit)
+
+
+@sync_app.post("/match/", response_model=MatchResponse)
+def _sync_match(req: MatchRequest, db: Session = Depends(get_db)):
+    key = match_cache_key(req.filters, req.weights, req.body_style_preference, req.limit_results)
+    results, next_cursor = match_cache.get_or_compute(key, lambda: first_page(db, req))
+    return _to_response(results, next_cursor)
+
+
+# ---------------------------
+# Carga
+# ---------------------------
+
+_MATCH_BODY = {"filters": {"min_year": 2012}, "weights": {}, "limit_results": 20}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(app_path: str, port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--port", str(port), "--log-level", "critical"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{app_path} no arrancó")
+
+
+async def _load(base_url: str, method: str, path: str, body: Optional[dict], concurrency: int, total: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                t0 = time.perf_counter()
+                try:
+                    r = await client.request(method, path, json=body)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - t0)
+                if not ok:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main(total: int = 2000) -> None:
+    from app.core.database import SessionLocal
+    from app.models.lead import Lead
+
+    db = SessionLocal()
+    lead_id = db.query(Lead.id).order_by(Lead.id).limit(1).scalar() or 1
+    db.close()
+
+    scenarios = [
+        ("GET /leads/admin", "GET", "/leads/admin?page=1&limit=20", None),
+        ("GET /leads/{id}/detail", "GET", f"/leads/{lead_id}/detail", None),
+        ("GET /listings/", "GET", "/listings/", None),
+        ("POST /match/", "POST", "/match/", _MATCH_BODY),
+    ]
+    variants = [("sync", "benchmarks.bench_async:sync_app"), ("async", "app.main:app")]
+
+    print(f"{'ruta':24} {'clientes':>8} {'variante':>8} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'err':>5}")
+    for label, app_path in variants:
+        port = _free_port()
+        proc = _start_server(app_path, port)
+        try:
+            for name, method, path, body in scenarios:
+                # calentamiento: snapshot, cache de /match/, conexiones del pool
+                asyncio.run(_load(f"http://127.0.0.1:{port}", method, path, body, 10, 50))
+                for concurrency in CONCURRENCY_LEVELS:
+                    res = asyncio.run(
+                        _load(f"http://127.0.0.1:{port}", method, path, body, concurrency, max(total, concurrency))
+                    )
+                    print(
+                        f"{name:24} {concurrency:8d} {label:>8} {res['rps']:9.1f} "
+                        f"{res['p50_ms']:9.1f} {res['p99_ms']:9.1f} {res['errors']:5d}"
+                    )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,113 @@
+"""
+Micro-benchmark: matching._passes_filters (lista a lista) contra el
+filtro compilado de services/filter_compiler.py.
+
+    python -m benchmarks.bench_filters [n_listings]
+"""
+
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.schemas.listing import ListingIn, MatchFilters
+from app.services.filter_compiler import compile_filters
+from app.services.matching import _passes_filters
+
+MAKES = ["Honda", "Toyota", "Kia", "Ford", "Chevrolet", "Nissan", "Subaru", "Mazda"]
+MODELS = ["Pilot", "Highlander", "Sorento", "Explorer", "Tahoe", "Rogue", "Outback", "CX-5"]
+TRIMS = ["LE", "EX", "EX-L", "XLT", "SE", None]
+DRIVETRAINS = ["AWD", "FWD", "RWD", "4x4", None]
+AGES = ["new", "used", "cpo", None]
+
+
+def make_listings(n: int, seed: int = 42):
+    rnd = random.Random(seed)
+    return [
+        ListingIn(
+            id=str(i),
+            price=rnd.randint(5000, 60000),
+            miles=rnd.randint(0, 200000),
+            year=rnd.randint(2005, 2025),
+            age_category=rnd.choice(AGES),
+            drivetrain=rnd.choice(DRIVETRAINS),
+            rows=rnd.choice([2, 3, None]),
+            make=rnd.choice(MAKES),
+            model=rnd.choice(MODELS),
+            trim=rnd.choice(TRIMS),
+        )
+        for i in range(n)
+    ]
+
+
+class _ArraySnapshot:
+    """
+    Mínimo necesario de ListingSnapshot para CompiledFilter.mask().
+    Las columnas se convierten al construirlo: en el snapshot real es un
+    costo por versión de la tabla, no por request.
+    """
+
+    def __init__(self, listings):
+        self.size = len(listings)
+        self._numeric = {
+            name: np.array(
+                [np.nan if getattr(l, name) is None else getattr(l, name) for l in listings],
+                dtype=np.float64,
+            )
+            for name in ("year", "rows")
+        }
+        self._factorized = {}
+        for name in ("age_category", "drivetrain", "make", "model", "trim"):
+            index = {}
+            codes = np.array([index.setdefault(getattr(l, name), len(index)) for l in listings])
+            self._factorized[name] = (codes, list(index))
+
+    def numeric(self, name):
+        return self._numeric[name]
+
+    def factorized(self, name):
+        return self._factorized[name]
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(n: int = 100_000) -> None:
+    listings = make_listings(n)
+    filters = MatchFilters(
+        age_categories_allowed=["Used", "CPO"],
+        min_year=2012,
+        required_rows=3,
+        required_drivetrains=["awd", "4X4"],
+        allowed_makes=["honda", "toyota", "kia"],
+    )
+
+    baseline = [l for l in listings if _passes_filters(l, filters)]
+    compiled = compile_filters(filters, sample=listings)
+    assert compiled.filter(listings) == baseline
+
+    snap = _ArraySnapshot(listings)
+    mask = compiled.mask(snap)
+    assert [listings[i] for i in np.flatnonzero(mask)] == baseline
+
+    t_base = _best_of(lambda: [l for l in listings if _passes_filters(l, filters)])
+    t_compile = _best_of(lambda: compile_filters(filters, sample=listings))
+    t_compiled = _best_of(lambda: compiled.filter(listings))
+    t_mask = _best_of(lambda: compiled.mask(snap))
+
+    print(f"listings: {n}  pasan: {len(baseline)}  orden: {compiled.order}")
+    print(f"_passes_filters   : {t_base * 1000:9.2f} ms")
+    print(f"compile_filters   : {t_compile * 1000:9.2f} ms")
+    print(f"compilado (test)  : {t_compiled * 1000:9.2f} ms  ({t_base / t_compiled:.1f}x)")
+    print(f"máscara vectorial : {t_mask * 1000:9.2f} ms  ({t_base / t_mask:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
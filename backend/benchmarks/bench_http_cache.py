@@ -0,0 +1,76 @@
+"""
+Cache de páginas del scraper (app/services/http_cache.py) contra el
+servidor local de benchmarks/stub_server.py, con un archivo de cache
+temporal:
+
+- frío: descarga y parseo de todas las URLs;
+- 304: el servidor valida el ETag, no hay cuerpo ni parseo;
+- mismo hash: servidor sin ETag/Last-Modified, cuerpo idéntico, sin parseo;
+- offline: servidor apagado, todo sale del cache;
+- tope de tamaño: con un tope chico quedan solo las entradas recientes.
+
+    python -m benchmarks.bench_http_cache [urls]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from app.core.config import settings
+from app.services import http_cache
+from app.services.scraper import scrape_urls
+from benchmarks import stub_server
+
+
+def _summary(rows):
+    return [[(l.year, l.make, l.model, l.price, l.miles) for l in listings] for listings in rows]
+
+
+def _run(label, urls, server=None):
+    statuses = dict(server.statuses) if server else {}
+    t0 = time.perf_counter()
+    rows = scrape_urls(urls)
+    elapsed = time.perf_counter() - t0
+    if server:
+        statuses = {k: v - statuses.get(k, 0) for k, v in server.statuses.items() if v - statuses.get(k, 0)}
+    print(f"{label:14} {elapsed * 1000:9.1f} ms  respuestas: {statuses or '-'}")
+    return rows
+
+
+def main(n: int = 40) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.SCRAPER_CACHE_PATH = os.path.join(tmp, "cache.db")
+        settings.SCRAPER_CACHE_MODE = "on"
+        paths = [f"/vehicledetail/{i}/" if i % 2 else f"/shopping/results/?page={i}" for i in range(n)]
+
+        with stub_server.serve() as server:
+            stub_server.use_cars_com_parser(server.url)
+            urls = [server.url + p for p in paths]
+            print(f"{n} URLs")
+            cold = _run("frío", urls, server)
+            assert _summary(_run("304", urls, server)) == _summary(cold)
+
+        with stub_server.serve(validators=False) as server:
+            # otro puerto: se copian las entradas bajo las URLs nuevas
+            stub_server.use_cars_com_parser(server.url)
+            urls = [server.url + p for p in paths]
+            _run("sin validar", urls, server)
+            assert _summary(_run("mismo hash", urls, server)) == _summary(cold)
+
+        settings.SCRAPER_CACHE_MODE = "offline"
+        assert _summary(_run("offline", urls)) == _summary(cold)
+        print(http_cache.info())
+
+        settings.SCRAPER_CACHE_MODE = "on"
+        entries = http_cache.info()["entries"]
+        settings.SCRAPER_CACHE_MAX_BYTES = http_cache.info()["bytes"] // 4
+        with stub_server.serve() as server:
+            stub_server.use_cars_com_parser(server.url)
+            scrape_urls([server.url + paths[0]])
+        print(f"tope {settings.SCRAPER_CACHE_MAX_BYTES} bytes: {entries} -> {http_cache.info()['entries']} entradas")
+        http_cache.close()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,57 @@
+"""
+Cliente HTTP del scraper (app/services/http_client.py) contra el
+servidor local de benchmarks/stub_server.py:
+
+- conexiones nuevas y tiempo de N páginas con requests.get suelto
+  (una conexión por página) contra la sesión compartida (keep-alive);
+- reintentos: 503 y 429 con Retry-After encolados en el stub, y cuánto
+  se esperó; al final, los contadores por host.
+
+    python -m benchmarks.bench_http_client [páginas]
+"""
+
+import sys
+import time
+
+import requests
+
+from app.services import http_client
+from app.services.scraper import DEFAULT_HEADERS
+from benchmarks import stub_server
+
+
+def _pages(server, n, fetch):
+    before = server.connections
+    t0 = time.perf_counter()
+    for i in range(n):
+        fetch(f"{server.url}/vehicledetail/{i}/").raise_for_status()
+    return time.perf_counter() - t0, server.connections - before
+
+
+def main(n: int = 200) -> None:
+    http_client.reset_stats()
+    with stub_server.serve() as server:
+        bare_s, bare_conns = _pages(server, n, lambda url: requests.get(url, headers=DEFAULT_HEADERS, timeout=15))
+        pooled_s, pooled_conns = _pages(server, n, lambda url: http_client.get(url, headers=DEFAULT_HEADERS))
+        print(f"{n} páginas")
+        print(f"{'requests.get':20} {bare_s * 1000:8.1f} ms  {bare_conns:4} conexiones")
+        print(f"{'sesión compartida':20} {pooled_s * 1000:8.1f} ms  {pooled_conns:4} conexiones")
+
+        path = "/shopping/results/"
+        server.script(path, (503, {}), (429, {"Retry-After": "1"}), (502, {}))
+        t0 = time.perf_counter()
+        resp = http_client.get(server.url + path, max_retries=3)
+        waited = time.perf_counter() - t0
+        assert resp.status_code == 200
+        print(f"503, 429 (Retry-After: 1), 502 -> {resp.status_code} en {waited:.2f}s")
+
+        server.script(path, *[(503, {})] * 3)
+        resp = http_client.get(server.url + path, max_retries=2)
+        print(f"3 x 503 con max_retries=2 -> {resp.status_code}")
+
+    for host, stats in http_client.host_stats().items():
+        print(host, stats)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,72 @@
+"""
+Importación de URLs (POST /listings/from-urls) contra el servidor local
+de benchmarks/stub_server.py con latencia simulada: una URL detrás de
+otra contra scraper.scrape_urls con topes global y por dominio. Usa dos
+"dominios" (127.0.0.1 y localhost) para que se vean los dos topes, y
+comprueba que los resultados salen iguales y en el mismo orden.
+
+    python -m benchmarks.bench_import [urls] [latencia_s]
+"""
+
+import sys
+import time
+
+from app.core.config import settings
+from app.services import http_client
+from app.services.scraper import fetch_listings, scrape_urls
+from benchmarks import stub_server
+
+
+def _urls(base_urls, n):
+    urls = []
+    for i in range(n):
+        base = base_urls[i % len(base_urls)]
+        path = f"/vehicledetail/{i}/" if i % 2 else f"/shopping/results/?page={i}"
+        urls.append(base + path)
+    return urls
+
+
+def _summary(rows):
+    return [[(l.year, l.make, l.model, l.price, l.miles) for l in listings] for listings in rows]
+
+
+def main(n: int = 40, delay: float = 0.2) -> None:
+    # sin cache de páginas: cada corrida descarga y parsea de verdad
+    settings.SCRAPER_CACHE_MODE = "off"
+    with stub_server.serve(delay) as server:
+        port = server.server_address[1]
+        bases = [server.url, f"http://localhost:{port}"]
+        for base in bases:
+            stub_server.use_cars_com_parser(base)
+        urls = _urls(bases, n)
+
+        t0 = time.perf_counter()
+        serial = [fetch_listings(url) for url in urls]
+        serial_s = time.perf_counter() - t0
+        print(f"{n} URLs, latencia {delay}s")
+        print(f"{'secuencial':28} {serial_s:7.2f}s")
+
+        for max_workers, per_domain in ((4, 1), (8, 2), (16, 4)):
+            # el pool de conexiones del cliente también limita por host
+            settings.SCRAPER_PER_DOMAIN_CONCURRENCY = per_domain
+            http_client.close()
+            server.max_in_flight.clear()
+            server.max_total_in_flight = 0
+            t0 = time.perf_counter()
+            rows = scrape_urls(urls, max_workers=max_workers, per_domain=per_domain)
+            elapsed = time.perf_counter() - t0
+            assert _summary(rows) == _summary(serial), "resultados distintos al secuencial"
+            per_host = max(server.max_in_flight.values())
+            assert per_host <= per_domain and server.max_total_in_flight <= max_workers
+            print(
+                f"{f'total={max_workers} dominio={per_domain}':28} {elapsed:7.2f}s"
+                f"  x{serial_s / elapsed:5.1f}  simultáneos: {server.max_total_in_flight}"
+                f" (máx. por dominio {per_host})"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 40,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 0.2,
+    )
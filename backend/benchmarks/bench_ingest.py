@@ -0,0 +1,76 @@
+"""
+Escritura de una página de listings: el camino anterior (add por fila,
+commit y refresh por fila) contra listing_ingest.bulk_insert_listings
+(INSERT ... RETURNING en lotes), sobre una BD SQLite temporal, con el
+número de sentencias de cada uno.
+
+    python -m benchmarks.bench_ingest [filas ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.listing import Listing
+from app.services import listing_snapshot
+from app.services.listing_ingest import bulk_insert_listings
+from benchmarks import datagen
+
+
+def _rows(n):
+    rnd = random.Random("bench_ingest")
+    rows = []
+    for i in range(n):
+        row = datagen._listing(rnd, i + 1, 1)
+        row.pop("id")
+        row["dealer_id"] = None
+        rows.append(row)
+    return rows
+
+
+def _orm(db, rows):
+    listings = [Listing(**row) for row in rows]
+    db.add_all(listings)
+    db.commit()
+    for l in listings:
+        db.refresh(l)
+    return [l.id for l in listings]
+
+
+def _bulk(db, rows):
+    ids = bulk_insert_listings(db, rows)
+    db.commit()
+    return ids
+
+
+def main(sizes) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'ingest.db')}")
+        Base.metadata.create_all(engine)
+        statements = [0]
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.__setitem__(0, statements[0] + 1))
+
+        print(f"{'filas':>8} {'camino':10} {'ms':>9} {'sentencias':>11}")
+        for n in sizes:
+            rows = _rows(n)
+            for label, write in (("orm", _orm), ("bulk", _bulk)):
+                with Session(engine) as db:
+                    statements[0] = 0
+                    t0 = time.perf_counter()
+                    ids = write(db, rows)
+                    elapsed = time.perf_counter() - t0
+                    assert len(ids) == n and ids == sorted(ids)
+                    print(f"{n:8} {label:10} {elapsed * 1000:9.1f} {statements[0]:11}")
+        engine.dispose()
+        # el snapshot del proceso vio inserts de otra BD
+        listing_snapshot.invalidate()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [100, 1000, 10000])
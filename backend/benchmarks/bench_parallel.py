@@ -0,0 +1,64 @@
+"""
+Scoring serial contra el reparto en procesos (services/parallel_scoring.py)
+sobre el snapshot de la BD de DATABASE_URL, para el motor "snapshot" de
+/match/ y para matching.rank_inventory (POST /match/ahp?source=inventory).
+Comprueba además que el top-K sale idéntico.
+
+    python -m benchmarks.bench_parallel [workers ...]
+"""
+
+import os
+import sys
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.schemas.listing import MatchFilters as InventoryFilters
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services import parallel_scoring
+from app.services.ahp import rank_listings_with_ahp
+from app.services.listing_snapshot import get_snapshot
+from app.services.matching import rank_inventory
+
+REPEAT = 3
+
+
+def _best(fn) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(worker_counts) -> None:
+    db = SessionLocal()
+    snap = get_snapshot(db)
+    scenarios = [
+        ("match engine=snapshot", lambda: rank_listings_with_ahp(
+            db, MatchFilters(), MatchWeights(), "SUV", 20, engine="snapshot"
+        )),
+        ("rank_inventory", lambda: rank_inventory(db, InventoryFilters(), None, None, 20)),
+    ]
+    print(f"{snap.size} listings, {os.cpu_count()} CPUs")
+    print(f"{'escenario':24} {'workers':>8} {'ms':>9} {'speedup':>8}")
+
+    settings.PARALLEL_SCORING_MIN_ROWS = 0
+    for name, fn in scenarios:
+        settings.PARALLEL_SCORING_WORKERS = 0
+        expected = fn()
+        serial = _best(fn)
+        print(f"{name:24} {'serial':>8} {serial * 1000:9.1f} {1.0:8.2f}")
+        for workers in worker_counts:
+            parallel_scoring.shutdown()
+            settings.PARALLEL_SCORING_WORKERS = workers
+            fn()  # arranque del pool y publicación del bloque compartido
+            assert fn() == expected, f"{name}: el resultado en paralelo difiere"
+            elapsed = _best(fn)
+            print(f"{name:24} {workers:8d} {elapsed * 1000:9.1f} {serial / elapsed:8.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [2, 4])
@@ -0,0 +1,86 @@
+"""
+Parseo de las páginas guardadas de cars.com (benchmarks/fixtures/) por
+modo y backend de BeautifulSoup:
+
+- completo: el árbol de toda la página (lo que hacía el scraper);
+- parcial: solo las partes del strainer del dominio (SoupStrainer);
+- rápido: JSON-LD leído sin DOM (solo detalles que lo traen);
+- parse_page: lo que usa el scraper, que elige entre los anteriores.
+
+Comprueba que todos los modos devuelven los mismos listings. Las
+páginas se repiten `copias` veces para acercarse al tamaño real de una
+página de resultados (varios MB).
+
+    python -m benchmarks.bench_parsing [copias]
+"""
+
+import gc
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from app.services import scraper
+from benchmarks.suite import FIXTURES_DIR, PARSER_FIXTURES
+
+REPEAT = 5
+
+
+def _best_ms(fn) -> float:
+    best = float("inf")
+    gc.collect()  # que no se cobre aquí la basura de los árboles anteriores
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _summary(listings):
+    return [(l.year, l.make, l.model, l.trim, l.price, l.miles) for l in listings]
+
+
+def _inflate(html: str, copies: int) -> str:
+    """Repite el <body> `copias` veces (páginas de resultados largas)."""
+    if copies <= 1 or "<body" not in html:
+        return html
+    start = html.index(">", html.index("<body")) + 1
+    end = html.rindex("</body>")
+    return html[:start] + html[start:end] * copies + html[end:]
+
+
+def main(copies: int = 1) -> None:
+    backends = ["html.parser"] + (["lxml"] if scraper.lxml is not None else [])
+    parser = scraper.PARSERS_BY_DOMAIN["cars.com"]
+    print(f"backends: {', '.join(backends)} (por defecto: {scraper.html_backend()}); copias: {copies}")
+    print(f"{'página':16} {'KB':>6} {'modo':24} {'ms':>8} {'x':>6}")
+
+    for fixture, path in PARSER_FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            html = _inflate(f.read(), copies if "vehicledetail" not in path else 1)
+        name = fixture[len("cars_com_"):-len(".html")]
+        strainer = scraper.cars_com_strainer(path)
+
+        modes = []
+        for backend in backends:
+            modes.append((f"completo {backend}", lambda b=backend: parser(BeautifulSoup(html, b), path)))
+            if strainer is not None:
+                modes.append((f"parcial {backend}", lambda b=backend: parser(
+                    BeautifulSoup(html, b, parse_only=strainer), path
+                )))
+        if scraper.cars_com_fast_path(html, path) is not None:
+            modes.append(("rápido (sin DOM)", lambda: scraper.cars_com_fast_path(html, path)))
+        modes.append(("parse_page", lambda: scraper.parse_page(html, "cars.com", path)))
+
+        expected = _summary(modes[0][1]())
+        base_ms = None
+        for label, fn in modes:
+            assert _summary(fn()) == expected, f"{name} {label}: listings distintos"
+            ms = _best_ms(fn)
+            base_ms = base_ms or ms
+            print(f"{name:16} {len(html) // 1024:6} {label:24} {ms:8.2f} {base_ms / ms:6.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
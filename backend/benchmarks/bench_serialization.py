@@ -0,0 +1,124 @@
+"""
+Costo de serializar las respuestas de listas grandes, por cada N filas:
+camino Pydantic (modelo por fila + validación de response_model + JSON)
+contra el camino rápido de app/core/fast_json.py (dicts planos + orjson
+o json). Los datos salen de benchmarks/datagen.py, sin BD.
+
+    python -m benchmarks.bench_serialization [filas]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.api import routes_leads, routes_listings, routes_match
+from app.core import fast_json
+from app.services.ahp import _result_row
+from benchmarks import datagen
+
+REPEAT = 5
+
+
+def _response_field(router, path: str, method: str):
+    for route in router.routes:
+        if route.path == path and method in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def _pydantic_body(field, content: Any) -> bytes:
+    """Lo que hace FastAPI con el valor devuelto por la ruta."""
+    value = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(value).body
+
+
+def _best_ms(fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _data(n: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    rnd = random.Random("bench_serialization")
+    listings = [datagen._listing(rnd, i, 50) for i in range(1, n + 1)]
+    leads = [datagen._lead_and_events(rnd, i, n, 1)[0] for i in range(1, n + 1)]
+    return listings, leads
+
+
+def main(n: int = 10_000) -> None:
+    listings, leads = _data(n)
+    by_id = {l["id"]: l for l in listings}
+
+    # /match/: dicts del motor -> MatchResponse
+    match_rows = []
+    for i, l in enumerate(listings):
+        row = _result_row(SimpleNamespace(**l), 1.0 - i / n, "Demo Dealer")
+        row["score"] = 1.0 - i / n
+        row["score_100"] = int(round(row["score"] * 100))
+        match_rows.append(row)
+    match_field = _response_field(routes_match.router, "/match/", "POST")
+
+    # /listings/: filas ORM (todas las columnas) -> ListingPage
+    listing_objs = [SimpleNamespace(**l) for l in listings]
+    listings_field = _response_field(routes_listings.router, "/listings/", "GET")
+
+    # /leads/admin: filas del JOIN (entidades o tuplas) -> LeadAdminPage
+    entity_rows = []
+    tuple_rows = []
+    for lead in leads:
+        listing = by_id.get(lead["listing_id"])
+        entity_rows.append((SimpleNamespace(**lead), SimpleNamespace(**listing), "Demo Dealer"))
+        tuple_rows.append(tuple(lead[k] for k in (
+            "id", "buyer_name", "buyer_email", "buyer_phone", "buyer_notes",
+            "listing_id", "status", "created_at",
+        )) + (listing["id"], listing["year"], listing["make"], listing["model"], listing["trim"], "Demo Dealer"))
+    leads_field = _response_field(routes_leads.router, "/leads/admin", "GET")
+
+    def page(items):
+        return {"items": items, "total": len(items), "page": 1, "pages": 1}
+
+    scenarios = [
+        (
+            "/match/",
+            lambda: _pydantic_body(match_field, routes_match._to_response(match_rows)),
+            lambda: fast_json.FastJSONResponse(routes_match._to_response_dict(match_rows)).body,
+        ),
+        (
+            "/listings/",
+            lambda: _pydantic_body(
+                listings_field, routes_listings.listing_page(listing_objs, routes_listings.LISTING_ITEM_FIELDS, n)
+            ),
+            lambda: fast_json.FastJSONResponse(
+                routes_listings.listing_page(listing_objs, routes_listings.LISTING_ITEM_FIELDS, n)
+            ).body,
+        ),
+        (
+            "/leads/admin",
+            lambda: _pydantic_body(
+                leads_field, page([routes_leads.lead_admin_out(*row) for row in entity_rows])
+            ),
+            lambda: fast_json.FastJSONResponse(
+                page([routes_leads.lead_admin_dict(row) for row in tuple_rows])
+            ).body,
+        ),
+    ]
+
+    encoder = "orjson" if fast_json.orjson is not None else "json"
+    print(f"{n} filas, encoder rápido: {encoder}")
+    print(f"{'endpoint':32} {'pydantic ms':>12} {'rápido ms':>10} {'x':>6}")
+    for name, slow, fast in scenarios:
+        slow_ms, fast_ms = _best_ms(slow), _best_ms(fast)
+        print(f"{name:32} {slow_ms:12.1f} {fast_ms:10.1f} {slow_ms / fast_ms:6.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,50 @@
+"""
+Compara dos resultados JSON de benchmarks/suite.py (mediana por escenario).
+
+    python -m benchmarks.compare results/base.json results/nuevo.json [--threshold 0.1]
+
+Marca con "!" los escenarios que empeoran más que el umbral.
+"""
+
+import argparse
+import json
+from typing import Any, Dict
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _label(meta: Dict[str, Any]) -> str:
+    commit = (meta.get("commit") or "?")[:10]
+    return f"{commit}{'+' if meta.get('dirty') else ''} (scale={meta.get('scale')})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1, help="empeora si new/base > 1 + umbral")
+    args = parser.parse_args()
+
+    base, new = _load(args.base), _load(args.new)
+    print(f"base: {_label(base['meta'])}")
+    print(f"new:  {_label(new['meta'])}")
+    if base["meta"].get("scale") != new["meta"].get("scale"):
+        print("ojo: las escalas no coinciden")
+
+    print(f"\n{'escenario':52} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        a = base["results"].get(name, {}).get("median_ms")
+        b = new["results"].get(name, {}).get("median_ms")
+        if a is None or b is None:
+            print(f"{name:52} {a if a is not None else '-':>10} {b if b is not None else '-':>10} {'-':>7}")
+            continue
+        ratio = b / a if a else float("inf")
+        flag = " !" if ratio > 1 + args.threshold else ""
+        print(f"{name:52} {a:10.2f} {b:10.2f} {ratio:7.2f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
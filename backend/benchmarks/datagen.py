@@ -0,0 +1,332 @@
+"""
+Generador determinista de inventario sintético para los benchmarks.
+
+Crea una BD SQLite con dealers, listings, leads y lead_events con
+distribuciones razonables (precio según modelo, antigüedad y millas;
+pocos modelos muy demandados; historial de eventos por lead). Misma
+semilla y misma escala => mismas filas.
+
+    python -m benchmarks.datagen 100k [--seed 42] [--path bench.db]
+"""
+
+import argparse
+import os
+import random
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base, ensure_indexes
+from app.models.dealer import Dealer
+from app.models.lead import Lead
+from app.models.lead_event import LeadEvent
+from app.models.listing import Listing
+
+# Escalas con nombre -> cantidad de listings
+SCALES: Dict[str, int] = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Fecha fija: los created_at no dependen del día en que se genera
+END_DATE = datetime(2025, 6, 30, 18, 0, 0)
+MODEL_YEAR = END_DATE.year
+
+BATCH_SIZE = 10_000
+
+# make, model, precio nuevo, filas, tracciones posibles, mpg
+CATALOG = [
+    ("Toyota", "RAV4", 31000, 2, ("AWD", "FWD"), 30.0),
+    ("Toyota", "Highlander", 40000, 3, ("AWD", "FWD"), 24.0),
+    ("Toyota", "Camry", 27000, 2, ("FWD",), 32.0),
+    ("Toyota", "Tacoma", 33000, 2, ("4x4", "RWD"), 21.0),
+    ("Honda", "CR-V", 30000, 2, ("AWD", "FWD"), 30.0),
+    ("Honda", "Pilot", 39000, 3, ("AWD", "FWD"), 22.0),
+    ("Honda", "Civic", 24000, 2, ("FWD",), 35.0),
+    ("Honda", "Odyssey", 38000, 3, ("FWD",), 22.0),
+    ("Ford", "F-150", 42000, 2, ("4x4", "RWD"), 20.0),
+    ("Ford", "Explorer", 38000, 3, ("AWD", "RWD"), 23.0),
+    ("Ford", "Escape", 28000, 2, ("AWD", "FWD"), 28.0),
+    ("Chevrolet", "Tahoe", 55000, 3, ("4x4", "RWD"), 18.0),
+    ("Chevrolet", "Equinox", 27000, 2, ("AWD", "FWD"), 28.0),
+    ("Chevrolet", "Silverado", 43000, 2, ("4x4", "RWD"), 19.0),
+    ("Kia", "Sorento", 32000, 3, ("AWD", "FWD"), 25.0),
+    ("Kia", "Telluride", 38000, 3, ("AWD", "FWD"), 23.0),
+    ("Hyundai", "Santa Fe", 31000, 2, ("AWD", "FWD"), 26.0),
+    ("Hyundai", "Palisade", 38000, 3, ("AWD", "FWD"), 22.0),
+    ("Subaru", "Outback", 30000, 2, ("AWD",), 28.0),
+    ("Subaru", "Ascent", 36000, 3, ("AWD",), 23.0),
+    ("Nissan", "Rogue", 29000, 2, ("AWD", "FWD"), 31.0),
+    ("Nissan", "Pathfinder", 37000, 3, ("4x4", "FWD"), 23.0),
+    ("Mazda", "CX-5", 29000, 2, ("AWD",), 28.0),
+    ("Mazda", "CX-90", 40000, 3, ("AWD",), 25.0),
+    ("Jeep", "Grand Cherokee", 42000, 2, ("4x4",), 22.0),
+    ("Volkswagen", "Atlas", 37000, 3, ("AWD", "FWD"), 22.0),
+]
+TRIMS = ["Base", "LE", "SE", "XLE", "EX", "EX-L", "Sport", "Limited", "Touring", None]
+
+CITIES = [
+    ("Wichita", "KS"), ("Topeka", "KS"), ("Kansas City", "MO"), ("Omaha", "NE"),
+    ("Denver", "CO"), ("Tulsa", "OK"), ("Dallas", "TX"), ("Austin", "TX"),
+    ("Phoenix", "AZ"), ("Des Moines", "IA"), ("Lincoln", "NE"), ("St. Louis", "MO"),
+]
+DEALER_SUFFIXES = ["Motors", "Auto Group", "Cars", "Autoplex", "Auto Sales", "Automotive"]
+
+FIRST_NAMES = [
+    "Ana", "Luis", "María", "José", "Carmen", "Jorge", "Lucía", "Pedro", "Sofía", "Diego",
+    "Emma", "Liam", "Olivia", "Noah", "Ava", "Ethan", "Mia", "Lucas", "Chloe", "Mateo",
+]
+LAST_NAMES = [
+    "García", "Martínez", "López", "Hernández", "González", "Pérez", "Sánchez", "Ramírez",
+    "Smith", "Johnson", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor",
+]
+NOTES = [
+    None, None, "¿Sigue disponible?", "Busco financiamiento", "¿Aceptan permuta?",
+    "Prefiero contacto por email", "¿Tiene historial de servicio?", "Quiero agendar prueba de manejo",
+]
+
+# estado final del lead -> acciones de su timeline (después de "created")
+LEAD_FLOWS = [
+    ("new", []),
+    ("sent_to_dealer", ["sent_to_dealer"]),
+    ("contacted", ["sent_to_dealer", "status_changed"]),
+    ("closed", ["sent_to_dealer", "status_changed", "status_changed"]),
+    ("lost", ["sent_to_dealer", "status_changed"]),
+]
+LEAD_FLOW_WEIGHTS = [30, 30, 20, 10, 10]
+
+
+def scale_rows(n_listings: int) -> Dict[str, int]:
+    """Cantidad de filas de cada tabla para una escala."""
+    return {
+        "dealers": max(5, n_listings // 200),
+        "listings": n_listings,
+        "leads": max(10, n_listings // 5),
+    }
+
+
+def parse_scale(scale: str) -> int:
+    """'10k' -> 10000; también acepta números."""
+    key = scale.lower()
+    if key in SCALES:
+        return SCALES[key]
+    return int(key.replace("_", ""))
+
+
+def default_path(n_listings: int, seed: int) -> str:
+    return os.path.join(DATA_DIR, f"bench_{n_listings}_{seed}.db")
+
+
+# ---------------------------
+# Filas
+# ---------------------------
+
+def _dealers(rnd: random.Random, n: int) -> Iterator[Dict[str, Any]]:
+    for i in range(1, n + 1):
+        city, state = rnd.choice(CITIES)
+        brand = rnd.choice(CATALOG)[0]
+        name = f"{city} {brand} {rnd.choice(DEALER_SUFFIXES)}"
+        slug = name.lower().replace(" ", "").replace(".", "")
+        yield {
+            "id": i,
+            "name": name,
+            "email": f"sales{i}@{slug}.com",
+            "phone": f"555-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}",
+            "city": city,
+            "state": state,
+            "website": f"https://www.{slug}.com",
+            "notes": None,
+        }
+
+
+def _listing(rnd: random.Random, listing_id: int, n_dealers: int) -> Dict[str, Any]:
+    make, model, msrp, rows, drivetrains, mpg = rnd.choice(CATALOG)
+    age = min(int(rnd.expovariate(1 / 4.5)), 17)
+    year = MODEL_YEAR - age
+
+    if age == 0 and rnd.random() < 0.6:
+        miles = rnd.randint(0, 50)
+        age_category = "new"
+    else:
+        # ~12k millas/año con dispersión lognormal
+        miles = int(max(age, 0.3) * 12_000 * rnd.lognormvariate(0, 0.35))
+        age_category = "cpo" if age <= 5 and rnd.random() < 0.15 else "used"
+
+    title = rnd.choices(["clean", "rebuilt", "salvage", None], [88, 5, 3, 4])[0]
+    accidents = rnd.choices([0, 1, 2, 3, None], [62, 20, 7, 2, 9])[0]
+
+    # depreciación por año y por milla, más ruido del mercado
+    price = msrp * (0.86 ** age) - miles * 0.04
+    price *= rnd.uniform(0.9, 1.1)
+    if title in ("rebuilt", "salvage"):
+        price *= 0.65
+    price = max(1500, int(price) // 10 * 10)
+
+    return {
+        "id": listing_id,
+        "dealer_id": rnd.randint(1, n_dealers) if rnd.random() < 0.95 else None,
+        "price": price,
+        "miles": miles,
+        "year": year,
+        "age_category": age_category,
+        "title_condition": title,
+        "accidents_count": accidents,
+        "odometer_issue": rnd.choices([False, True, None], [85, 2, 13])[0],
+        "recalls_open": rnd.choices([0, 1, 2, None], [70, 15, 5, 10])[0],
+        "fuel_efficiency": round(mpg * rnd.uniform(0.92, 1.05), 1) if rnd.random() < 0.85 else None,
+        "mechanical_state": round(max(0.0, min(5.0, 5 - age * 0.18 + rnd.gauss(0, 0.5))), 1)
+        if rnd.random() < 0.7 else None,
+        "safety_score": rnd.choice([3.5, 4.0, 4.5, 5.0]) if rnd.random() < 0.8 else None,
+        "drivetrain": rnd.choice(drivetrains),
+        "seats": 7 if rows == 3 else 5,
+        "rows": rows,
+        "comfort_tech_score": round(min(1.0, max(0.0, 0.9 - age * 0.04 + rnd.gauss(0, 0.1))), 2)
+        if rnd.random() < 0.75 else None,
+        "make": make,
+        "model": model,
+        "trim": rnd.choice(TRIMS),
+    }
+
+
+def _ascii(text: str) -> str:
+    # los emails se validan con EmailStr: sin acentos en la parte local
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+
+def _popular_listing(rnd: random.Random, n_listings: int) -> int:
+    # pocos listings concentran muchos leads (cola larga)
+    return min(n_listings, int(n_listings ** rnd.random())) if rnd.random() < 0.3 else rnd.randint(1, n_listings)
+
+
+def _lead_and_events(
+    rnd: random.Random, lead_id: int, n_listings: int, next_event_id: int
+) -> Any:
+    first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+    created_at = END_DATE - timedelta(seconds=int(rnd.random() * 365 * 86400))
+    status, actions = rnd.choices(LEAD_FLOWS, LEAD_FLOW_WEIGHTS)[0]
+
+    lead = {
+        "id": lead_id,
+        "buyer_name": f"{first} {last}",
+        "buyer_email": f"{_ascii(first)}.{_ascii(last)}{lead_id}@example.com",
+        "buyer_phone": f"555-{rnd.randint(100, 999)}-{rnd.randint(1000, 9999)}" if rnd.random() < 0.7 else None,
+        "buyer_notes": rnd.choice(NOTES),
+        "listing_id": _popular_listing(rnd, n_listings),
+        "status": status,
+        "created_at": created_at,
+    }
+
+    events = []
+    ts = created_at
+    for action in ["created"] + actions:
+        events.append({
+            "id": next_event_id + len(events),
+            "lead_id": lead_id,
+            "action": action,
+            "description": f"Lead {action.replace('_', ' ')}",
+            "timestamp": ts,
+        })
+        ts += timedelta(minutes=int(rnd.expovariate(1 / 600)) + 1)
+    return lead, events
+
+
+# ---------------------------
+# Escritura
+# ---------------------------
+
+def _insert_batches(engine: Engine, table, rows: Iterator[Dict[str, Any]]) -> int:
+    total = 0
+    batch: List[Dict[str, Any]] = []
+    with engine.begin() as conn:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(insert(table), batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+            total += len(batch)
+    return total
+
+
+def generate(path: str, n_listings: int, seed: int = 42) -> Dict[str, int]:
+    """
+    (Re)crea la BD SQLite en `path` y devuelve la cantidad de filas por
+    tabla. Cada tabla usa su propio Random derivado de la semilla, así
+    cambiar una distribución no altera las demás tablas.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        os.remove(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    ensure_indexes(engine)
+
+    sizes = scale_rows(n_listings)
+    counts = {}
+    counts["dealers"] = _insert_batches(
+        engine, Dealer.__table__, _dealers(random.Random(f"{seed}:dealers"), sizes["dealers"])
+    )
+
+    rnd = random.Random(f"{seed}:listings")
+    counts["listings"] = _insert_batches(
+        engine,
+        Listing.__table__,
+        (_listing(rnd, i, sizes["dealers"]) for i in range(1, n_listings + 1)),
+    )
+
+    rnd = random.Random(f"{seed}:leads")
+    leads: List[Dict[str, Any]] = []
+    events: List[Dict[str, Any]] = []
+    counts["leads"] = counts["lead_events"] = 0
+    for lead_id in range(1, sizes["leads"] + 1):
+        lead, lead_events = _lead_and_events(rnd, lead_id, n_listings, counts["lead_events"] + len(events) + 1)
+        leads.append(lead)
+        events.extend(lead_events)
+        if len(leads) >= BATCH_SIZE:
+            counts["leads"] += _insert_batches(engine, Lead.__table__, iter(leads))
+            counts["lead_events"] += _insert_batches(engine, LeadEvent.__table__, iter(events))
+            leads, events = [], []
+    counts["leads"] += _insert_batches(engine, Lead.__table__, iter(leads))
+    counts["lead_events"] += _insert_batches(engine, LeadEvent.__table__, iter(events))
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    return counts
+
+
+def ensure_database(n_listings: int, seed: int = 42, path: str = "") -> str:
+    """Ruta de la BD de esa escala/semilla, generándola solo si no existe."""
+    path = path or default_path(n_listings, seed)
+    if not os.path.exists(path):
+        generate(path, n_listings, seed)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("scale", help=f"cantidad de listings ({', '.join(SCALES)} o un número)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--path", default="", help="BD de salida (por defecto benchmarks/data/)")
+    args = parser.parse_args()
+
+    n = parse_scale(args.scale)
+    path = args.path or default_path(n, args.seed)
+    counts = generate(path, n, args.seed)
+    print(path)
+    for table, count in counts.items():
+        print(f"  {table:12} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Servidor HTTP local que sirve las páginas de cars.com guardadas en
+benchmarks/fixtures/, para medir y probar el scraper sin salir a la red.
+
+    with stub_server.serve(delay=0.2) as server:
+        stub_server.use_cars_com_parser(server.url)
+        scrape_urls([f"{server.url}/shopping/results/?page=1", ...])
+
+Paths con "vehicledetail" -> cars_com_vdp_ldjson.html; el resto ->
+cars_com_srp.html. `delay` simula la latencia de cars.com por request.
+El servidor cuenta requests, conexiones TCP abiertas (habla HTTP/1.1
+con keep-alive) y el máximo de requests simultáneos, en total y por Host
+(127.0.0.1:puerto y localhost:puerto cuentan como dos dominios para el
+scraper). Con script() se encolan respuestas de error para un path:
+
+    server.script("/shopping/results/", (503, {}), (429, {"Retry-After": "1"}))
+
+Las páginas llevan ETag (hash del archivo) y Last-Modified y responden
+304 a un If-None-Match que coincida; con `validators=False` no mandan
+ninguno de los dos (servidor que no soporta GET condicional).
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, Iterator, Tuple
+from urllib.parse import urlparse
+
+from app.services.scraper import FAST_PATHS_BY_DOMAIN, PARSERS_BY_DOMAIN, STRAINERS_BY_DOMAIN
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LAST_MODIFIED = "Mon, 05 Oct 2026 12:00:00 GMT"
+
+
+def _fixture(path: str) -> bytes:
+    name = "cars_com_vdp_ldjson.html" if "vehicledetail" in path else "cars_com_srp.html"
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, validators: bool = True):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.validators = validators
+        self.statuses: Counter = Counter()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.in_flight: Counter = Counter()      # Host -> requests en curso
+        self.max_in_flight: Counter = Counter()  # Host -> máximo simultáneo
+        self.max_total_in_flight = 0
+        self.connections = 0
+        # path -> respuestas (status, headers) a devolver antes de la página
+        self.scripts: Dict[str, Deque[Tuple[int, Dict[str, str]]]] = {}
+
+    def script(self, path: str, *responses: Tuple[int, Dict[str, str]]) -> None:
+        with self.lock:
+            self.scripts.setdefault(path, deque()).extend(responses)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StubServer
+    protocol_version = "HTTP/1.1"
+    # cabeceras y cuerpo van en dos send(): sin esto, Nagle + ACK retardado
+    # suman ~40 ms a cada respuesta sobre una conexión reutilizada
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        host = self.headers.get("Host", "")
+        with server.lock:
+            server.requests += 1
+            server.in_flight[host] += 1
+            server.max_in_flight[host] = max(server.max_in_flight[host], server.in_flight[host])
+            server.max_total_in_flight = max(server.max_total_in_flight, sum(server.in_flight.values()))
+            scripted = server.scripts.get(self.path)
+            status, headers = scripted.popleft() if scripted else (200, {})
+        try:
+            if server.delay:
+                time.sleep(server.delay)
+            body = _fixture(self.path) if status == 200 else b"error"
+            if status == 200 and server.validators:
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+                headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+                if self.headers.get("If-None-Match") == etag:
+                    status, body = 304, b""
+            with server.lock:
+                server.statuses[status] += 1
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight[host] -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serve(delay: float = 0.0, validators: bool = True) -> Iterator[StubServer]:
+    """Levanta el servidor en un puerto libre; `server.url` es la base."""
+    server = StubServer(delay, validators)
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def use_cars_com_parser(base_url: str) -> None:
+    """Que las URLs del stub se parseen como cars.com (el registro va por dominio)."""
+    host = urlparse(base_url).netloc.lower()
+    for registry in (PARSERS_BY_DOMAIN, STRAINERS_BY_DOMAIN, FAST_PATHS_BY_DOMAIN):
+        registry[host] = registry["cars.com"]
@@ -0,0 +1,303 @@
+"""
+Suite de benchmarks de los caminos calientes: scoring (/match/ y
+matching.compute_ahp_scores), GET /listings/, rutas de leads y parsers
+de cars.com.
+
+Usa una BD generada por benchmarks/datagen.py (se crea la primera vez y
+se reutiliza) y escribe los tiempos en JSON para comparar entre commits
+con benchmarks/compare.py:
+
+    python -m benchmarks.suite --scale 10k --out results/base.json
+    python -m benchmarks.suite --scale 100k --only "match|leads" --repeat 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app.api import routes_leads, routes_listings
+from app.core.database import _async_url, ensure_columns
+from app.models.dealer import Dealer
+from app.models.lead import Lead
+from app.models.lead_event import LeadEvent
+from app.models.listing import Listing
+from app.schemas.listing import MatchFilters as InventoryFilters
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services import listing_snapshot
+from app.services.ahp import rank_listings_with_ahp
+from app.services.matching import compute_ahp_scores
+from app.services.scraper import PARSERS_BY_DOMAIN, parse_page
+from benchmarks import datagen
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# fixture -> path de la URL (el parser de cars.com elige detalle/resultados por el path)
+PARSER_FIXTURES = {
+    "cars_com_srp.html": "/shopping/results/",
+    "cars_com_vdp_ldjson.html": "/vehicledetail/123/",
+    "cars_com_vdp_plain.html": "/vehicledetail/123/",
+}
+
+
+@dataclass
+class Context:
+    db: Session
+    async_db: AsyncSession
+    loop: asyncio.AbstractEventLoop
+    ids: Dict[str, int] = field(default_factory=dict)
+
+
+# (nombre, setup): setup(ctx) prepara los datos y devuelve la llamada a medir
+SCENARIOS: List[Tuple[str, Callable[[Context], Callable[[], Any]]]] = []
+
+
+def scenario(name: str):
+    def register(setup: Callable[[Context], Callable[[], Any]]):
+        SCENARIOS.append((name, setup))
+        return setup
+    return register
+
+
+# ---------------------------
+# Escenarios
+# ---------------------------
+
+_MATCH_CASES = {
+    "broad": (MatchFilters(), MatchWeights()),
+    "narrow": (
+        MatchFilters(min_year=2018, max_price=30000, max_miles=60000),
+        MatchWeights(price=5, mileage=3, year=3, awd=4),
+    ),
+}
+
+for _engine in ("python", "numpy", "sql", "stream", "snapshot"):
+    for _case, (_filters, _weights) in _MATCH_CASES.items():
+        @scenario(f"match.rank_listings_with_ahp[{_engine},{_case}]")
+        def _setup(ctx: Context, engine=_engine, filters=_filters, weights=_weights):
+            return lambda: rank_listings_with_ahp(ctx.db, filters, weights, "SUV", 20, engine=engine)
+
+
+@scenario("matching.compute_ahp_scores[top20]")
+def _compute_top(ctx: Context):
+    listings = listing_snapshot.get_snapshot(ctx.db).listing_ins()
+    filters = InventoryFilters(min_year=2015, required_rows=3)
+    return lambda: compute_ahp_scores(listings, filters, None, None, limit_results=20)
+
+
+@scenario("matching.compute_ahp_scores[all]")
+def _compute_all(ctx: Context):
+    listings = listing_snapshot.get_snapshot(ctx.db).listing_ins()
+    return lambda: compute_ahp_scores(listings, None, None, None)
+
+
+@scenario("listings.list_listings[page]")
+def _listings_page(ctx: Context):
+    return lambda: ctx.loop.run_until_complete(routes_listings.list_listings(
+        db=ctx.async_db, limit=100, cursor=None, fields=None,
+        min_price=None, max_price=30000, min_year=2015, max_year=None,
+        max_miles=None, make=None, model=None, dealer_id=None,
+    ))
+
+
+@scenario("leads.list_leads_admin[first]")
+def _admin_first(ctx: Context):
+    return lambda: ctx.loop.run_until_complete(
+        routes_leads.list_leads_admin(db=ctx.async_db, page=1, limit=20)
+    )
+
+
+@scenario("leads.list_leads_admin[last]")
+def _admin_last(ctx: Context):
+    # OFFSET profundo: la última página
+    return lambda: ctx.loop.run_until_complete(
+        routes_leads.list_leads_admin(db=ctx.async_db, page=10**9, limit=20)
+    )
+
+
+@scenario("leads.get_dealer_leads")
+def _dealer_leads(ctx: Context):
+    return lambda: routes_leads.get_dealer_leads(dealer_id=ctx.ids["busiest_dealer"], db=ctx.db)
+
+
+@scenario("leads.get_leads_summary")
+def _summary(ctx: Context):
+    return lambda: routes_leads.get_leads_summary(db=ctx.db)
+
+
+for _fixture, _path in PARSER_FIXTURES.items():
+    @scenario(f"scraper.cars_com[{_fixture[len('cars_com_'):-len('.html')]}]")
+    def _setup(ctx: Context, fixture=_fixture, path=_path):
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            html = f.read()
+        parser = PARSERS_BY_DOMAIN["cars.com"]
+        # incluye el armado del árbol: es la mayor parte del costo
+        return lambda: parser(BeautifulSoup(html, "html.parser"), path)
+
+    @scenario(f"scraper.parse_page[{_fixture[len('cars_com_'):-len('.html')]}]")
+    def _setup(ctx: Context, fixture=_fixture, path=_path):
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            html = f.read()
+        # lo que usa el scraper: camino rápido, strainer y backend configurado
+        return lambda: parse_page(html, "cars.com", path)
+
+
+# ---------------------------
+# Ejecución
+# ---------------------------
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    result = fn()  # calentamiento (snapshot, caches, planes de SQLite)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+        "max_ms": round(times[-1], 3),
+        "result_size": _size(result),
+    }
+
+
+def _size(result: Any) -> Any:
+    """Filas devueltas (listas y páginas); None para el resto."""
+    items = result.get("items") if isinstance(result, dict) else getattr(result, "items", None)
+    if isinstance(items, list):
+        return len(items)
+    if isinstance(result, list):
+        return len(result)
+    return None
+
+
+def _git_commit() -> Dict[str, Any]:
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=cwd, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def _sample_ids(db: Session) -> Dict[str, int]:
+    busiest = db.execute(
+        select(Listing.dealer_id)
+        .where(Listing.dealer_id.is_not(None))
+        .group_by(Listing.dealer_id)
+        .order_by(func.count().desc(), Listing.dealer_id)
+        .limit(1)
+    ).scalar()
+    return {"busiest_dealer": busiest or 1}
+
+
+def _row_counts(db: Session) -> Dict[str, int]:
+    return {
+        table.name: db.scalar(select(func.count()).select_from(table))
+        for table in (Dealer.__table__, Listing.__table__, Lead.__table__, LeadEvent.__table__)
+    }
+
+
+def run(db_path: str, only: str = "", repeat: int = 5) -> Dict[str, Any]:
+    """{"rows": filas por tabla, "results": métricas por escenario}."""
+    url = f"sqlite:///{db_path}"
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    # BDs generadas antes de que el modelo sumara columnas
+    ensure_columns(engine)
+    async_engine = create_async_engine(_async_url(url))
+    loop = asyncio.new_event_loop()
+    ctx = Context(
+        db=Session(bind=engine),
+        async_db=AsyncSession(async_engine, expire_on_commit=False),
+        loop=loop,
+    )
+    ctx.ids = _sample_ids(ctx.db)
+    rows = _row_counts(ctx.db)
+    # el snapshot es por proceso: que no quede uno de otra BD
+    listing_snapshot.invalidate()
+
+    pattern = re.compile(only) if only else None
+    results: Dict[str, Any] = {}
+    try:
+        for name, setup in SCENARIOS:
+            if pattern and not pattern.search(name):
+                continue
+            try:
+                results[name] = _measure(setup(ctx), repeat)
+            except Exception as exc:
+                results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+                ctx.db.rollback()
+            print(f"{name:52} {results[name].get('median_ms', '-'):>10} ms", file=sys.stderr)
+    finally:
+        ctx.db.close()
+        loop.run_until_complete(ctx.async_db.close())
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+        engine.dispose()
+    return {"rows": rows, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks de scoring, leads y scraping")
+    parser.add_argument("--scale", default="10k", help=f"listings: {', '.join(datagen.SCALES)} o un número")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default="", help="BD ya generada (por defecto benchmarks/data/)")
+    parser.add_argument("--only", default="", help="regex sobre el nombre de los escenarios")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    n = datagen.parse_scale(args.scale)
+    db_path = datagen.ensure_database(n, args.seed, args.db)
+
+    report = {
+        "meta": {
+            **_git_commit(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scale": n,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+    }
+    measured = run(db_path, args.only, args.repeat)
+    report["meta"]["rows"] = measured["rows"]
+    report["results"] = measured["results"]
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
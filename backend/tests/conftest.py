@@ -0,0 +1,83 @@
+"""
+Fixtures de los tests.
+
+La BD es un SQLite temporal generado con benchmarks/datagen.py (misma
+semilla siempre). DATABASE_URL se fija acá, antes de importar la app:
+app.core.database crea el engine al importarse.
+"""
+
+import os
+import shutil
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="autofinder-tests-")
+DB_PATH = os.path.join(_TMP_DIR, "test.db")
+TEST_LISTINGS = 3000
+
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["SCRAPER_CACHE_PATH"] = os.path.join(_TMP_DIR, "scraper_cache.db")
+os.environ["SCRAPER_CACHE_MODE"] = "off"
+
+from benchmarks import datagen  # noqa: E402
+
+datagen.generate(DB_PATH, TEST_LISTINGS, seed=42)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import http_client, listing_snapshot  # noqa: E402
+from app.services.match_cache import match_cache  # noqa: E402
+from app.services.match_pages import ranking_cache  # noqa: E402
+from app.services.scraper import FAST_PATHS_BY_DOMAIN, PARSERS_BY_DOMAIN, STRAINERS_BY_DOMAIN  # noqa: E402
+from benchmarks import stub_server  # noqa: E402
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches():
+    """Cada test calcula de cero: sin resultados cacheados de otro test."""
+    match_cache.clear()
+    ranking_cache.clear()
+    listing_snapshot.invalidate()
+    yield
+
+
+@pytest.fixture
+def stub():
+    """Stub de cars.com, accesible como dos dominios (127.0.0.1 y localhost)."""
+    with stub_server.serve(delay=0.05) as server:
+        server.alt_url = server.url.replace("127.0.0.1", "localhost")
+        for base in (server.url, server.alt_url):
+            stub_server.use_cars_com_parser(base)
+        # sesión nueva: el pool toma los topes de settings del test
+        http_client.close()
+        try:
+            yield server
+        finally:
+            http_client.close()
+            for base in (server.url, server.alt_url):
+                host = base.split("//", 1)[1]
+                for registry in (PARSERS_BY_DOMAIN, STRAINERS_BY_DOMAIN, FAST_PATHS_BY_DOMAIN):
+                    registry.pop(host, None)
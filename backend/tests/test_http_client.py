@@ -0,0 +1,55 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import http_client
+
+PATH = "/shopping/results/"
+
+
+@pytest.fixture(autouse=True)
+def _fast_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPER_BACKOFF_BASE", 0.01)
+    http_client.reset_stats()
+
+
+def _host(stub):
+    return stub.url.split("//", 1)[1]
+
+
+def test_connections_are_reused(stub):
+    for _ in range(5):
+        assert http_client.get(stub.url + PATH).status_code == 200
+    assert stub.connections == 1
+
+
+def test_retries_429_and_5xx_then_succeeds(stub):
+    stub.script(PATH, (503, {}), (429, {"Retry-After": "0"}))
+
+    resp = http_client.get(stub.url + PATH)
+
+    assert resp.status_code == 200
+    stats = http_client.host_stats()[_host(stub)]
+    assert stats["requests"] == 3
+    assert stats["retries"] == 2
+
+
+def test_returns_last_error_when_retries_run_out(stub):
+    stub.script(PATH, (503, {}), (503, {}), (503, {}))
+
+    resp = http_client.get(stub.url + PATH, max_retries=1)
+
+    assert resp.status_code == 503
+    assert http_client.host_stats()[_host(stub)]["retries"] == 1
+
+
+def test_retry_after_is_honored(stub, monkeypatch):
+    waits = []
+    # solo el time de http_client: el stub también duerme (su delay)
+    monkeypatch.setattr(http_client, "time", SimpleNamespace(sleep=waits.append, perf_counter=time.perf_counter))
+    stub.script(PATH, (429, {"Retry-After": "7"}))
+
+    assert http_client.get(stub.url + PATH).status_code == 200
+    assert waits == [7.0]
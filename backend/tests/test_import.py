@@ -0,0 +1,30 @@
+from app.core.config import settings
+from app.services.scraper import scrape_urls
+
+
+def test_reimport_inserts_nothing(client, stub):
+    urls = [f"{stub.url}/shopping/results/?page={i}" for i in range(1, 4)]
+    urls.append(f"{stub.url}/vehicledetail/abc123/")
+
+    first = client.post("/listings/from-urls", json={"urls": urls}).json()
+    assert first["inserted"] > 0
+
+    second = client.post("/listings/from-urls", json={"urls": urls}).json()
+    assert second["inserted"] == 0
+    assert second["updated"] == 0
+    assert second["unchanged"] == len(first["listings"])
+
+
+def test_scrape_urls_respects_concurrency_caps(stub, monkeypatch):
+    monkeypatch.setattr(settings, "SCRAPER_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(settings, "SCRAPER_PER_DOMAIN_CONCURRENCY", 2)
+    urls = [f"{base}/shopping/results/?page={i}" for i in range(8) for base in (stub.url, stub.alt_url)]
+
+    results = scrape_urls(urls)
+
+    assert all(results)
+    assert stub.requests == len(urls)
+    assert max(stub.max_in_flight.values()) <= 2
+    assert stub.max_total_in_flight <= 3
+    # hubo paralelismo de verdad (si no, los topes no prueban nada)
+    assert stub.max_total_in_flight >= 2
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.database import engine, ensure_indexes
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services.ahp import MATCH_ENGINES, rank_listings_with_ahp
+
+# Índices de filtros de Listing (los que pueden cambiar el plan de /match/)
+FILTER_INDEXES = (
+    "ix_listings_year_price_miles",
+    "ix_listings_price_miles",
+    "ix_listings_make_model_year",
+    "ix_listings_dealer_id",
+)
+
+REQUESTS = [
+    (MatchFilters(min_year=2020, max_year=2021), MatchWeights(price=0, mileage=0, year=5, third_row=0, awd=0, condition=0, body_style=0), None),
+    (MatchFilters(max_price=30000, max_miles=80000), MatchWeights(), "SUV"),
+    (MatchFilters(), MatchWeights(third_row=5, awd=5), None),
+]
+
+
+def _rankings(db):
+    return {
+        (engine_name, i): [
+            (r["listing_id"], r["score"])
+            for r in rank_listings_with_ahp(db, filters, weights, body_style, 50, engine=engine_name)
+        ]
+        for engine_name in MATCH_ENGINES
+        for i, (filters, weights, body_style) in enumerate(REQUESTS)
+    }
+
+
+def _indexes(db) -> set:
+    rows = db.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).all()
+    return {r[0] for r in rows}
+
+
+def _plan(db) -> str:
+    # EXPLAIN no abre transacción de lectura: sin la consulta a sqlite_master
+    # de antes, SQLite puede planificar con un esquema viejo
+    rows = db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id, price, miles, year FROM listings "
+        "WHERE year >= 2020 AND year <= 2021"
+    )).all()
+    return " ".join(str(r[-1]) for r in rows)
+
+
+@pytest.fixture
+def without_filter_indexes():
+    with engine.begin() as conn:
+        for name in FILTER_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        ensure_indexes(engine)
+
+
+def test_indexes_do_not_change_match_results(db, without_filter_indexes):
+    assert not _indexes(db) & set(FILTER_INDEXES)
+    assert "ix_listings_year_price_miles" not in _plan(db)
+    before = _rankings(db)
+    db.close()
+
+    ensure_indexes(engine)
+    assert set(FILTER_INDEXES) <= _indexes(db)
+    assert "ix_listings_year_price_miles" in _plan(db)
+    after = _rankings(db)
+
+    assert after == before
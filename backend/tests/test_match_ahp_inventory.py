@@ -0,0 +1,60 @@
+from app.schemas.listing import MatchFilters
+from app.services.listing_snapshot import get_snapshot
+from app.services.matching import compute_ahp_scores
+from app.services.topk import STREAM_METRICS
+
+BODY = {
+    "filters": {"min_year": 2018, "required_rows": 3},
+    "criteria_importance_main": {"economic": 5, "condition": 3, "risk": 2, "fit": 4},
+}
+
+
+def test_inventory_matches_scoring_the_listings_directly(client, db):
+    resp = client.post("/match/ahp", params={"source": "inventory", "limit": 15}, json=BODY)
+    assert resp.status_code == 200, resp.text
+    results = resp.json()["results"]
+
+    expected = compute_ahp_scores(
+        get_snapshot(db).listing_ins(),
+        MatchFilters(**BODY["filters"]),
+        BODY["criteria_importance_main"],
+        None,
+        15,
+    )
+    assert len(results) == 15
+    assert [r["listing"]["id"] for r in results] == [r.listing.id for r in expected]
+    assert [r["score"] for r in results] == [r.score for r in expected]
+
+
+def test_inventory_compact(client):
+    detail = client.post("/match/ahp", params={"source": "inventory", "limit": 5}, json=BODY).json()
+    compact = client.post(
+        "/match/ahp", params={"source": "inventory", "limit": 5, "detail": "false"}, json=BODY
+    ).json()
+
+    assert [r["id"] for r in compact["results"]] == [r["listing"]["id"] for r in detail["results"]]
+    assert compact["weights_groups"] == detail["results"][0]["weights_groups"]
+
+
+def test_inventory_rejects_listings_in_body(client):
+    resp = client.post(
+        "/match/ahp",
+        params={"source": "inventory"},
+        json={**BODY, "listings": [{"id": "x", "make": "Honda", "model": "Pilot", "year": 2020}]},
+    )
+    assert resp.status_code == 400
+
+
+def test_stream_matches_snapshot_and_holds_only_the_top_k(client):
+    params = {"source": "inventory", "limit": 10}
+    snapshot = client.post("/match/ahp", params=params, json=BODY).json()["results"]
+    streamed = client.post("/match/ahp", params={**params, "stream": "true"}, json=BODY).json()["results"]
+
+    assert [r["listing"]["id"] for r in streamed] == [r["listing"]["id"] for r in snapshot]
+    assert [r["score"] for r in streamed] == [r["score"] for r in snapshot]
+    assert STREAM_METRICS["matching"]["last_peak_rows_held"] <= 10
+
+
+def test_stream_requires_inventory(client):
+    resp = client.post("/match/ahp", params={"stream": "true"}, json={"listings": []})
+    assert resp.status_code == 400
@@ -0,0 +1,45 @@
+import pytest
+
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services.ahp import MATCH_ENGINES, rank_listings_with_ahp
+
+# Casos con muchos empates: con solo el año pesando, todos los listings
+# del mismo año empatan en score
+CASES = {
+    "year_only": (
+        MatchFilters(min_year=2020, max_year=2021),
+        MatchWeights(price=0, mileage=0, year=5, third_row=0, awd=0, condition=0, body_style=0),
+        None,
+    ),
+    "flags_only": (
+        MatchFilters(),
+        MatchWeights(price=0, mileage=0, year=0, third_row=3, awd=3, condition=0, body_style=2),
+        "SUV",
+    ),
+    "default": (MatchFilters(max_price=30000), MatchWeights(), "SUV"),
+}
+
+
+def _ranking(db, engine, filters, weights, body_style, limit):
+    results = rank_listings_with_ahp(db, filters, weights, body_style, limit, engine=engine)
+    return [r["listing_id"] for r in results], [r["score"] for r in results]
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+@pytest.mark.parametrize("limit", [0, 20])
+def test_engines_return_same_order_with_ties(db, case, limit):
+    filters, weights, body_style = CASES[case]
+    expected_ids, expected_scores = _ranking(db, "python", filters, weights, body_style, limit)
+    assert expected_ids
+
+    for engine in MATCH_ENGINES:
+        ids, scores = _ranking(db, engine, filters, weights, body_style, limit)
+        assert ids == expected_ids, engine
+        assert scores == pytest.approx(expected_scores), engine
+
+
+def test_ties_are_broken_by_id(db):
+    filters, weights, body_style = CASES["year_only"]
+    results = rank_listings_with_ahp(db, filters, weights, body_style, 0, engine="python")
+    keys = [(-r["score"], r["listing_id"]) for r in results]
+    assert keys == sorted(keys)
@@ -0,0 +1,39 @@
+import pytest
+
+# Muchos empates: con solo el año pesando, todos los listings del mismo
+# año tienen el mismo score
+TIE_HEAVY = {
+    "filters": {"min_year": 2020, "max_year": 2021},
+    "weights": {"price": 0, "mileage": 0, "year": 5, "third_row": 0, "awd": 0, "condition": 0, "body_style": 0},
+}
+DEFAULT = {"filters": {"max_price": 30000}, "weights": {}, "body_style_preference": "SUV"}
+
+
+def _all_pages(client, body, page_size):
+    ids = []
+    cursor = None
+    while True:
+        resp = client.post("/match/", json={**body, "limit_results": page_size, "cursor": cursor})
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        ids.extend(r["listing_id"] for r in data["results"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("body", [TIE_HEAVY, DEFAULT], ids=["ties", "default"])
+@pytest.mark.parametrize("page_size", [5, 37])
+def test_pages_join_to_full_ranking(client, body, page_size):
+    full = client.post("/match/", json={**body, "limit_results": 0}).json()
+    expected = [r["listing_id"] for r in full["results"]]
+    assert len(expected) > page_size
+
+    assert _all_pages(client, body, page_size) == expected
+
+
+def test_first_page_matches_full_ranking_prefix(client):
+    full = client.post("/match/", json={**TIE_HEAVY, "limit_results": 0}).json()
+    page = client.post("/match/", json={**TIE_HEAVY, "limit_results": 5}).json()
+    assert page["results"] == full["results"][:5]
+    assert page["next_cursor"]
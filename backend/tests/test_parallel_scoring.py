@@ -0,0 +1,47 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.schemas.listing import MatchFilters as InventoryFilters
+from app.schemas.match import MatchFilters, MatchWeights
+from app.services import parallel_scoring
+from app.services.ahp import rank_listings_with_ahp
+from app.services.listing_snapshot import get_snapshot
+from app.services.matching import _SCORED_ATTRS, rank_inventory
+
+
+@pytest.fixture
+def two_workers(monkeypatch):
+    monkeypatch.setattr(settings, "PARALLEL_SCORING_MIN_ROWS", 0)
+    monkeypatch.setattr(settings, "PARALLEL_SCORING_WORKERS", 2)
+    parallel_scoring.shutdown()
+    yield
+    parallel_scoring.shutdown()
+
+
+def _serial(monkeypatch, fn):
+    with monkeypatch.context() as m:
+        m.setattr(settings, "PARALLEL_SCORING_WORKERS", 0)
+        return fn()
+
+
+def test_parallel_matches_serial(db, monkeypatch, two_workers):
+    scenarios = [
+        lambda: rank_listings_with_ahp(db, MatchFilters(), MatchWeights(), "SUV", 20, engine="snapshot"),
+        lambda: rank_inventory(db, InventoryFilters(), None, None, 20),
+    ]
+    for fn in scenarios:
+        assert fn() == _serial(monkeypatch, fn)
+
+
+def test_shards_carry_only_the_descriptor(db, two_workers):
+    snap = get_snapshot(db)
+    shards = parallel_scoring.split(snap, np.ones(snap.size, dtype=bool), _SCORED_ATTRS)
+
+    desc = shards[0].desc
+    assert set(desc.columns) == set(_SCORED_ATTRS)
+    assert "source_url" not in desc.columns
+    # el payload de cada tarea no crece con las categorías
+    assert all(len(pickle.dumps(s)) < 4096 for s in shards)
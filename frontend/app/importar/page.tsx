@@ -13,10 +13,19 @@ type ImportResult = {
   trim?: string | null;
 };
 
+// Respuesta de POST /listings/from-urls: conteos y todos los listings de
+// la importación (nuevos, actualizados e iguales)
+type ImportResponse = {
+  inserted: number;
+  updated: number;
+  unchanged: number;
+  listings: ImportResult[];
+};
+
 export default function ImportarPage() {
   const [urlsText, setUrlsText] = useState("");
   const [loading, setLoading] = useState(false);
-  const [results, setResults] = useState<ImportResult[] | null>(null);
+  const [results, setResults] = useState<ImportResponse | null>(null);
   const [error, setError] = useState<string | null>(null);
 
   const handleSubmit = async (e: React.FormEvent) => {
@@ -53,7 +62,7 @@ export default function ImportarPage() {
         throw new Error(`Error ${res.status}: ${txt}`);
       }
 
-      const data = await res.json();
+      const data: ImportResponse = await res.json();
       setResults(data);
     } catch (err: any) {
       setError(err.message || "Error inesperado");
@@ -137,12 +146,15 @@ export default function ImportarPage() {
         >
           <h2>Resultados de la importación</h2>
           <p style={{ fontSize: "0.9rem", color: "#555" }}>
-            Se importaron <strong>{results.length}</strong> autos desde las URLs proporcionadas.
+            Se encontraron <strong>{results.listings.length}</strong> autos en las URLs
+            proporcionadas: <strong>{results.inserted}</strong> nuevos,{" "}
+            <strong>{results.updated}</strong> actualizados y{" "}
+            <strong>{results.unchanged}</strong> sin cambios (ya estaban importados).
           </p>
 
-          {results.length > 0 && (
+          {results.listings.length > 0 && (
             <div style={{ display: "grid", gap: "0.5rem" }}>
-              {results.map((r) => (
+              {results.listings.map((r) => (
                 <div
                   key={r.id}
                   style={{